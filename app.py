@@ -1,147 +1,210 @@
 import os
 import pandas as pd
-import requests
-from datetime import datetime, timedelta
+from datetime import datetime
 import calendar
-from flask import Flask, render_template, request, send_file, jsonify
-import tempfile
+from flask import Flask, Response, render_template, request, send_file, jsonify, url_for
 import json
+import io
+import tempfile
+
+import hebrew_holidays
+import instrumentation
+import schedule_engine
+import syllabus_io
+from job_queue import JobQueue, QueueFullError
+from result_store import ResultStore
 
 app = Flask(__name__)
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
-def get_hebrew_holidays(year):
-    """Fetch Hebrew holidays from hebcal.com API"""
-    try:
-        url = f"https://www.hebcal.com/hebcal"
-        params = {
-            'v': 1,
-            'cfg': 'json',
-            'maj': 'on',
-            'mod': 'on',
-            'nh': 'on',
-            'd': 'on',
-            'lg': 's',
-            'year': year,
-            'start': f"{year}-01-01",
-            'end': f"{year}-12-31"
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        holidays = set()
-        
-        for item in data.get('items', []):
-            if item.get('category') in ['holiday', 'roshchodesh']:
-                date_str = item.get('date')
-                if date_str:
-                    # Convert from YYYY-MM-DD format
-                    holiday_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-                    holidays.add(holiday_date)
-        
-        return holidays
-    except Exception as e:
-        print(f"Error fetching Hebrew holidays: {e}")
-        return set()
+# Uploads scheduled in memory (direct, async and default modes) are capped at this size
+MAX_UPLOAD_BYTES = int(os.environ.get('SYLLABUS_MAX_UPLOAD_MB', 16)) * 1024 * 1024
 
-def is_working_day(date, holidays):
-    """Check if a date is a working day (Sunday-Thursday, not a holiday)"""
-    # Sunday = 6, Monday = 0, Tuesday = 1, Wednesday = 2, Thursday = 3
-    # Friday = 4, Saturday = 5
-    weekday = date.weekday()
+# Streaming mode spools to disk and keeps memory flat, so the request itself may be much larger (0 = no limit)
+MAX_STREAM_UPLOAD_MB = int(os.environ.get('SYLLABUS_MAX_STREAM_UPLOAD_MB', 1024))
+app.config['MAX_CONTENT_LENGTH'] = MAX_STREAM_UPLOAD_MB * 1024 * 1024 if MAX_STREAM_UPLOAD_MB > 0 else None
+
+# Rows read at a time when /upload streams a large syllabus (mode=stream)
+STREAM_CHUNK_ROWS = int(os.environ.get('SYLLABUS_STREAM_CHUNK_ROWS', 50000))
+
+# Background workers for /upload in job mode; caps concurrent and queued schedule jobs
+job_queue = JobQueue(
+    max_workers=int(os.environ.get('SYLLABUS_JOB_WORKERS', 4)),
+    max_pending=int(os.environ.get('SYLLABUS_JOB_QUEUE_SIZE', 64))
+)
+
+# Generated schedules are kept in memory (LRU, size and age limited) until downloaded
+result_store = ResultStore(
+    max_entries=int(os.environ.get('SYLLABUS_RESULT_STORE_ENTRIES', 256)),
+    max_bytes=int(os.environ.get('SYLLABUS_RESULT_STORE_MB', 64)) * 1024 * 1024,
+    ttl=int(os.environ.get('SYLLABUS_RESULT_TTL', 3600))
+)
+
+def load_holidays(years):
+    """Fetch Hebrew holidays for several years concurrently"""
+
+    def report(year, e):
+        print(f"Error fetching Hebrew holidays for {year}: {e}")
+
+    return set(hebrew_holidays.load_holiday_names(years, 'all_holidays', on_error=report))
+
+def calculate_schedule(syllabus_df, start_date, add_break, break_days, consider_holidays):
+    """Calculate the course schedule based on the syllabus"""
     
-    # Friday (4) and Saturday (5) are non-working days
-    if weekday in [4, 5]:
-        return False
+    # Topics are scheduled grouped and sorted by Main Topic, like groupby
+    grouped_df = syllabus_df[syllabus_df['Main Topic'].notna()].sort_values('Main Topic', kind='stable')
     
-    # Check if it's a holiday
-    if date in holidays:
-        return False
+    return schedule_engine.schedule_with_holidays(
+        grouped_df, start_date, add_break, break_days,
+        load_holidays if consider_holidays else None
+    )
+
+class UploadError(Exception):
+    """A problem with the uploaded syllabus or form data, reported to the client as a 400"""
+
+def parse_schedule_options(form):
+    """Read (start_date, add_break, break_days, consider_holidays) from the upload form"""
+    start_date_str = form.get('start_date')
+    add_break = form.get('add_break') == 'true'
+    break_days = int(form.get('break_days', 0))
+    consider_holidays = form.get('consider_holidays') == 'true'
+    
+    if not start_date_str:
+        raise UploadError('Start date is required')
     
-    return True
+    start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
+    return start_date, add_break, break_days, consider_holidays
 
-def get_next_working_day(date, holidays):
-    """Get the next working day from a given date"""
-    current_date = date
-    while not is_working_day(current_date, holidays):
-        current_date += timedelta(days=1)
-    return current_date
+def generate_schedule(csv_data, form):
+    """Parse an uploaded syllabus, calculate its schedule and return it as CSV bytes"""
+    with instrumentation.trace(profile=instrumentation.PROFILE_ENABLED) as trace:
+        with instrumentation.span('generate_schedule'):
+            csv_bytes = build_schedule_csv(csv_data, form)
+    
+    # With SYLLABUS_PROFILE on, log the stage breakdown and the hottest functions
+    if trace.profile:
+        stages = ', '.join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in trace.stage_seconds().items())
+        print(f"Info: Schedule generated in {trace.seconds * 1000:.1f} ms ({stages})\n{trace.profile}")
+    return csv_bytes
 
-def calculate_schedule(syllabus_df, start_date, add_break, break_days, consider_holidays):
-    """Calculate the course schedule based on the syllabus"""
+def build_schedule_csv(csv_data, form):
+    """Validate the upload and form, schedule the syllabus and export it as CSV bytes"""
+    # Read the CSV, Parquet or Arrow file; required columns are validated on the header/schema
+    try:
+        syllabus_df = syllabus_io.read_syllabus(csv_data)
+    except syllabus_io.SyllabusFormatError as e:
+        raise UploadError(str(e))
     
-    # Get holidays if needed
-    holidays = set()
-    if consider_holidays:
-        # Get holidays for current year and next year
-        current_year = start_date.year
-        holidays = get_hebrew_holidays(current_year)
-        holidays.update(get_hebrew_holidays(current_year + 1))
+    # Validate data
+    if syllabus_df.empty:
+        raise UploadError('The uploaded CSV file is empty')
     
-    schedule_data = []
-    current_date = start_date
+    # Get form data for empty value handling
+    handle_empty_days = form.get('handle_empty_days') == 'true'
+    default_days = int(form.get('default_days', 1))
     
-    # Group by Main Topic
-    for main_topic, group in syllabus_df.groupby('Main Topic'):
-        topic_start_date = None
-        
-        for _, row in group.iterrows():
-            subtopic = row['Subtopic']
-            # Handle NaN values and convert to integer
-            days_value = row['Days']
-            if pd.isna(days_value):
-                raise ValueError(f"Invalid value in 'Days' column for subtopic '{subtopic}'. Please ensure all days values are numbers.")
-            days_needed = int(days_value)
-            
-            # Find the next working day to start
-            if topic_start_date is None:
-                current_date = get_next_working_day(current_date, holidays)
-                topic_start_date = current_date
-            
-            start_date_for_subtopic = current_date
-            days_allocated = 0
-            end_date = start_date_for_subtopic
-            
-            # Allocate working days for this subtopic
-            while days_allocated < days_needed:
-                if is_working_day(current_date, holidays):
-                    days_allocated += 1
-                end_date = current_date
-                current_date += timedelta(days=1)
-            
-            schedule_data.append({
-                'Main Topic': main_topic,
-                'Subtopic': subtopic,
-                'Start Date': start_date_for_subtopic.strftime('%Y-%m-%d'),
-                'End Date': end_date.strftime('%Y-%m-%d'),
-                'Duration (Days)': days_needed
-            })
+    # Check for non-numeric values in Days column
+    try:
+        syllabus_df['Days'] = pd.to_numeric(syllabus_df['Days'], errors='coerce')
+    except Exception as e:
+        raise UploadError(f'Error processing Days column: {str(e)}')
+    
+    # Handle empty values based on user preference
+    if syllabus_df['Days'].isna().any():
+        if handle_empty_days:
+            # Fill empty values with default
+            empty_count = syllabus_df['Days'].isna().sum()
+            syllabus_df['Days'] = syllabus_df['Days'].fillna(default_days)
+            print(f"Info: Filled {empty_count} empty values in Days column with {default_days} day(s) each.")
+        else:
+            raise UploadError('Found empty values in the Days column. Please enable empty value handling or fill the values manually')
+    
+    # Get form data
+    start_date, add_break, break_days, consider_holidays = parse_schedule_options(form)
+    
+    # Calculate schedule
+    schedule_df = calculate_schedule(syllabus_df, start_date, add_break, break_days, consider_holidays)
+    
+    with instrumentation.span('export_csv'):
+        return schedule_engine.schedule_to_csv(schedule_df).encode('utf-8')
+
+def generate_and_store_schedule(csv_data, form):
+    """Generate a schedule and keep it in the result store; returns the result id"""
+    return result_store.put(generate_schedule(csv_data, form))
+
+def read_csv_chunks(path, columns, handle_empty_days, default_days):
+    """Yield a syllabus CSV in chunks of STREAM_CHUNK_ROWS rows, cleaned like generate_schedule
+
+    columns maps header names to required column names (syllabus_io.csv_columns).
+    """
+    for chunk in pd.read_csv(path, usecols=list(columns), chunksize=STREAM_CHUNK_ROWS):
+        chunk = chunk.rename(columns=columns)
+        chunk['Days'] = pd.to_numeric(chunk['Days'], errors='coerce')
+        if chunk['Days'].isna().any():
+            if not handle_empty_days:
+                raise UploadError('Found empty values in the Days column. Please enable empty value handling or fill the values manually')
+            chunk['Days'] = chunk['Days'].fillna(default_days)
+        yield chunk[chunk['Main Topic'].notna()]
+
+def stream_schedule_response(file, form):
+    """Schedule an upload chunk by chunk and stream the CSV back without loading the whole syllabus"""
+    if not file.filename.lower().endswith('.csv'):
+        raise UploadError('Streaming mode accepts CSV files only')
+    
+    handle_empty_days = form.get('handle_empty_days') == 'true'
+    default_days = int(form.get('default_days', 1))
+    start_date, add_break, break_days, consider_holidays = parse_schedule_options(form)
+    
+    # Spool the upload to disk; it is read twice, one chunk at a time
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    os.close(fd)
+    try:
+        file.save(path)
+        columns = syllabus_io.csv_columns(path)
         
-        # Add break after each main topic if enabled
-        if add_break and break_days > 0:
-            current_date = get_next_working_day(current_date, holidays)
-            break_start = current_date
-            
-            # Skip break_days working days
-            break_days_allocated = 0
-            while break_days_allocated < break_days:
-                if is_working_day(current_date, holidays):
-                    break_days_allocated += 1
-                current_date += timedelta(days=1)
-            
-            break_end = current_date - timedelta(days=1)
-            
-            schedule_data.append({
-                'Main Topic': f"{main_topic} - Break",
-                'Subtopic': 'Break Period',
-                'Start Date': break_start.strftime('%Y-%m-%d'),
-                'End Date': break_end.strftime('%Y-%m-%d'),
-                'Duration (Days)': break_days
-            })
+        # First pass reads and validates every row, so data errors become a 400 before the response starts
+        try:
+            scan = schedule_engine.scan_syllabus(read_csv_chunks(path, columns, handle_empty_days, default_days))
+        except ValueError as e:
+            raise UploadError(f'Could not read the syllabus: {e}')
+        if scan.rows == 0:
+            raise UploadError('The uploaded CSV file is empty')
+        if not scan.sorted_by_topic:
+            raise UploadError('Streaming mode needs the syllabus sorted by Main Topic')
+    except syllabus_io.SyllabusFormatError as e:
+        os.remove(path)
+        raise UploadError(str(e))
+    except Exception:
+        os.remove(path)
+        raise
     
-    return pd.DataFrame(schedule_data)
+    def generate():
+        try:
+            yield from schedule_engine.stream_schedule_csv(
+                read_csv_chunks(path, columns, handle_empty_days, default_days), scan,
+                start_date, add_break, break_days,
+                load_holidays if consider_holidays else None
+            )
+        except Exception as e:
+            # Re-raise so the server aborts the response instead of ending a truncated CSV normally
+            print(f"Error: Streaming schedule stopped early: {e}")
+            raise
+    
+    response = Response(generate(), mimetype='text/csv',
+                        headers={'Content-Disposition': 'attachment; filename=course_schedule.csv'})
+    # Removed when the response is closed, even if its body is never iterated
+    response.call_on_close(lambda: remove_spooled_upload(path))
+    return response
+
+def remove_spooled_upload(path):
+    """Delete a spooled streaming upload if it is still on disk"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def send_schedule_csv(csv_bytes):
+    """Stream schedule CSV bytes to the client as a download"""
+    return send_file(io.BytesIO(csv_bytes), mimetype='text/csv', as_attachment=True, download_name='course_schedule.csv')
 
 @app.route('/')
 def index():
@@ -157,76 +220,81 @@ def upload_file():
         if file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
         
-        if not file.filename.endswith('.csv'):
-            return jsonify({'error': 'Please upload a CSV file'}), 400
+        if not file.filename.lower().endswith(syllabus_io.SUPPORTED_EXTENSIONS):
+            return jsonify({'error': 'Please upload a CSV, Parquet or Arrow file'}), 400
         
-        # Read the CSV file
-        syllabus_df = pd.read_csv(file)
+        # Streaming mode: large CSVs are scheduled and sent back chunk by chunk
+        if request.form.get('mode') == 'stream':
+            return stream_schedule_response(file, request.form.to_dict())
         
-        # Validate required columns
-        required_columns = ['Main Topic', 'Subtopic', 'Days']
-        missing_columns = [col for col in required_columns if col not in syllabus_df.columns]
-        if missing_columns:
-            return jsonify({'error': f'Missing required columns: {", ".join(missing_columns)}'}), 400
+        # Copy the upload out of the request so a worker can process it later; reading
+        # stops one byte past the in-memory cap, so an oversized file is never buffered
+        csv_data = file.read(MAX_UPLOAD_BYTES + 1) if MAX_UPLOAD_BYTES else file.read()
+        form = request.form.to_dict()
+        if MAX_UPLOAD_BYTES and len(csv_data) > MAX_UPLOAD_BYTES:
+            return jsonify({'error': f'The file is larger than {MAX_UPLOAD_BYTES // (1024 * 1024)} MB; use streaming mode for large CSV files'}), 413
         
-        # Validate data
-        if syllabus_df.empty:
-            return jsonify({'error': 'The uploaded CSV file is empty'}), 400
-        
-        # Get form data for empty value handling
-        handle_empty_days = request.form.get('handle_empty_days') == 'true'
-        default_days = int(request.form.get('default_days', 1))
-        
-        # Check for non-numeric values in Days column
-        try:
-            syllabus_df['Days'] = pd.to_numeric(syllabus_df['Days'], errors='coerce')
-        except Exception as e:
-            return jsonify({'error': f'Error processing Days column: {str(e)}'}), 400
-        
-        # Handle empty values based on user preference
-        if syllabus_df['Days'].isna().any():
-            if handle_empty_days:
-                # Fill empty values with default
-                empty_count = syllabus_df['Days'].isna().sum()
-                syllabus_df['Days'] = syllabus_df['Days'].fillna(default_days)
-                print(f"Info: Filled {empty_count} empty values in Days column with {default_days} day(s) each.")
-            else:
-                return jsonify({'error': 'Found empty values in the Days column. Please enable empty value handling or fill the values manually'}), 400
-        
-        # Get form data
-        start_date_str = request.form.get('start_date')
-        add_break = request.form.get('add_break') == 'true'
-        break_days = int(request.form.get('break_days', 0))
-        consider_holidays = request.form.get('consider_holidays') == 'true'
-        
-        if not start_date_str:
-            return jsonify({'error': 'Start date is required'}), 400
-        
-        start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
+        # Job mode: queue the work and answer right away with a job id
+        if form.get('mode') == 'async':
+            try:
+                job = job_queue.submit(generate_and_store_schedule, csv_data, form)
+            except QueueFullError as e:
+                return jsonify({'error': f'Server is busy, please retry shortly. {e}'}), 503, {'Retry-After': '5'}
+            
+            return jsonify({
+                'success': True,
+                'job_id': job.id,
+                'status': job.status,
+                'status_url': url_for('job_status', job_id=job.id)
+            }), 202
         
-        # Calculate schedule
-        schedule_df = calculate_schedule(syllabus_df, start_date, add_break, break_days, consider_holidays)
+        # Direct mode: answer with the CSV itself, no second round-trip
+        if form.get('mode') == 'direct':
+            return send_schedule_csv(generate_schedule(csv_data, form))
         
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as tmp_file:
-            schedule_df.to_csv(tmp_file.name, index=False)
-            tmp_file_path = tmp_file.name
+        result_id = generate_and_store_schedule(csv_data, form)
         
         return jsonify({
             'success': True,
             'message': 'Schedule generated successfully',
-            'file_path': tmp_file_path
+            'result_id': result_id,
+            'download_url': url_for('download_file', result_id=result_id)
         })
         
+    except UploadError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'An error occurred: {str(e)}'}), 500
 
-@app.route('/download/<path:file_path>')
-def download_file(file_path):
-    try:
-        return send_file(file_path, as_attachment=True, download_name='course_schedule.csv')
-    except Exception as e:
-        return jsonify({'error': f'Error downloading file: {str(e)}'}), 500
+@app.route('/metrics')
+def metrics():
+    """Stage timings and counters in the Prometheus text format"""
+    return Response(instrumentation.metrics.to_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired job'}), 404
+    
+    response = job.to_dict()
+    if job.status == 'done':
+        response.update({
+            'success': True,
+            'message': 'Schedule generated successfully',
+            'result_id': job.result,
+            'download_url': url_for('download_file', result_id=job.result)
+        })
+    elif job.status == 'failed' and not isinstance(job.error, UploadError):
+        response['error'] = f'An error occurred: {str(job.error)}'
+    return jsonify(response)
+
+@app.route('/download/<result_id>')
+def download_file(result_id):
+    csv_bytes = result_store.get(result_id)
+    if csv_bytes is None:
+        return jsonify({'error': 'Unknown or expired result, please generate the schedule again'}), 404
+    return send_schedule_csv(csv_bytes)
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000) 
\ No newline at end of file
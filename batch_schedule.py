@@ -0,0 +1,238 @@
+"""Generate course schedules for many syllabus files (CSV, Parquet or Arrow) in parallel.
+
+Example:
+    python batch_schedule.py syllabi/ --start-date 2025-10-26 --add-break --break-days 2 \
+        --free-day 2025-12-21:2025-12-25 --output-dir schedules/
+
+    python batch_schedule.py syllabi/ --cohorts cohorts.csv --output-dir schedules/
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+import hebrew_holidays
+import schedule_engine
+import syllabus_io
+from work_calendar import FreeDays
+
+# Set in each worker process by _init_worker
+_shared_holidays = {}
+_options = None
+
+
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def parse_free_days(values):
+    """Parse --free-day values (YYYY-MM-DD or YYYY-MM-DD:YYYY-MM-DD) into FreeDays; ranges stay intervals"""
+    ranges = []
+    for value in values:
+        first, _, last = value.partition(':')
+        start_date = parse_date(first)
+        ranges.append((start_date, parse_date(last) if last else start_date))
+    return FreeDays(ranges)
+
+
+def load_cohorts(path, free_days=()):
+    """Read a cohorts CSV (Cohort, Start Date and optional Additional Free Days, Add Break, Break Days)
+
+    Additional Free Days holds ';'-separated YYYY-MM-DD or YYYY-MM-DD:YYYY-MM-DD
+    values; the --free-day dates apply to every cohort on top of them.
+    """
+    cohorts_df = pd.read_csv(path)
+    if 'Start Date' not in cohorts_df.columns:
+        raise ValueError(f"{path}: missing required column: Start Date")
+
+    cohorts_df['Start Date'] = [parse_date(str(value).strip()) for value in cohorts_df['Start Date']]
+    cohort_free_days = cohorts_df.get('Additional Free Days', pd.Series([''] * len(cohorts_df)))
+    cohorts_df['Additional Free Days'] = [
+        parse_free_days(part.strip() for part in value.split(';') if part.strip()) | free_days
+        if isinstance(value, str) else FreeDays.coerce(free_days)
+        for value in cohort_free_days
+    ]
+    return cohorts_df
+
+
+def find_syllabus_files(inputs):
+    """Resolve directories, globs and file paths to a sorted list of syllabus files, each file once"""
+    files = set()
+    for value in inputs:
+        if os.path.isdir(value):
+            for extension in syllabus_io.SUPPORTED_EXTENSIONS:
+                files.update(glob.glob(os.path.join(value, '*' + extension)))
+        else:
+            files.update(path for path in glob.glob(value) if os.path.isfile(path))
+
+    # The same file reached through two inputs (syllabi/ and syllabi/*.csv) is scheduled once
+    unique_files = {}
+    for path in sorted(files):
+        unique_files.setdefault(os.path.realpath(path), path)
+    return sorted(unique_files.values())
+
+
+def output_path_for(path, output_dir, cohorts=False):
+    """Where the schedule of a syllabus file is written: <stem>_schedule.csv or <stem>_cohorts.csv"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(output_dir, f"{stem}_cohorts.csv" if cohorts else f"{stem}_schedule.csv")
+
+
+def output_collisions(files, output_dir, cohorts=False):
+    """Map each output path claimed by more than one input file to those files"""
+    claims = {}
+    for path in files:
+        claims.setdefault(output_path_for(path, output_dir, cohorts), []).append(path)
+    return {output_path: paths for output_path, paths in claims.items() if len(paths) > 1}
+
+
+def _init_worker(shared_holidays, options):
+    global _shared_holidays, _options
+    _shared_holidays = shared_holidays
+    _options = options
+
+
+def _load_holidays(years):
+    """Serve holidays from the calendar the parent loaded; other years go through the disk cache"""
+    holidays = set()
+    missing_years = []
+    for year in years:
+        if year in _shared_holidays:
+            holidays.update(_shared_holidays[year])
+        else:
+            missing_years.append(year)
+    if missing_years:
+        holidays.update(hebrew_holidays.load_holiday_names(missing_years, _options.rules))
+    return holidays
+
+
+def schedule_file(path):
+    """Schedule one syllabus file and write its output; returns (path, output path, rows)"""
+    syllabus_df = syllabus_io.read_syllabus(path)
+    if syllabus_df.empty:
+        raise ValueError("The syllabus file is empty")
+
+    syllabus_df['Days'] = pd.to_numeric(syllabus_df['Days'], errors='coerce').fillna(_options.default_days)
+    load_holidays = _load_holidays if _options.consider_holidays else None
+
+    if _options.cohorts_df is not None:
+        # Every cohort in one long-format file
+        schedule_df = schedule_engine.schedule_cohorts(
+            syllabus_df, _options.cohorts_df, _options.add_break, _options.break_days, load_holidays
+        )
+    else:
+        schedule_df = schedule_engine.schedule_with_holidays(
+            syllabus_df, _options.start_date, _options.add_break, _options.break_days,
+            load_holidays, _options.free_days
+        )
+    output_path = output_path_for(path, _options.output_dir, _options.cohorts_df is not None)
+    schedule_engine.schedule_to_csv(schedule_df, output_path)
+    return path, output_path, len(schedule_df)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Generate course schedules for many syllabus files in parallel")
+    parser.add_argument('inputs', nargs='+', help="Syllabus CSV, Parquet or Arrow files, directories or glob patterns")
+    parser.add_argument('--start-date', type=parse_date, help="Course start date (YYYY-MM-DD)")
+    parser.add_argument('--cohorts', metavar='CSV',
+                        help="Schedule every cohort in this CSV (Cohort, Start Date, Additional Free Days, "
+                             "Add Break, Break Days) instead of a single --start-date")
+    parser.add_argument('--output-dir', default='schedules', help="Directory for the generated schedules")
+    parser.add_argument('--add-break', action='store_true', help="Add a break after each main topic")
+    parser.add_argument('--break-days', type=int, default=2, help="Break duration in working days")
+    parser.add_argument('--no-holidays', dest='consider_holidays', action='store_false',
+                        help="Ignore Hebrew holidays (weekends are still skipped)")
+    parser.add_argument('--rules', default='free_days', choices=sorted(hebrew_holidays.HOLIDAY_RULE_SETS),
+                        help="Holiday rule set to apply")
+    parser.add_argument('--free-day', action='append', default=[], metavar='DATE[:DATE]',
+                        help="Additional free day or inclusive date range; can be repeated")
+    parser.add_argument('--default-days', type=int, default=0, help="Days used for empty 'Days' values")
+    parser.add_argument('--horizon-years', type=int, default=3,
+                        help="Years of holidays to load up front, starting with the start date's year")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Number of worker processes")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    options = parser.parse_args(argv)
+    if options.start_date is None and options.cohorts is None:
+        parser.error("one of --start-date or --cohorts is required")
+    options.free_days = parse_free_days(options.free_day)
+
+    options.cohorts_df = None
+    if options.cohorts:
+        try:
+            options.cohorts_df = load_cohorts(options.cohorts, options.free_days)
+        except (OSError, ValueError) as e:
+            print(f"Could not read cohorts: {e}", file=sys.stderr)
+            return 1
+        if options.cohorts_df.empty:
+            print("The cohorts file is empty", file=sys.stderr)
+            return 1
+        options.start_date = min(options.cohorts_df['Start Date'])
+
+    files = find_syllabus_files(options.inputs)
+    if not files:
+        print("No syllabus files found", file=sys.stderr)
+        return 1
+
+    # Outputs are named after the file stem only; refuse to let one input overwrite another's schedule
+    collisions = output_collisions(files, options.output_dir, options.cohorts_df is not None)
+    if collisions:
+        for output_path, paths in collisions.items():
+            print(f"❌ {', '.join(paths)} would all be written to {output_path}", file=sys.stderr)
+        print("Rename the files or schedule them in separate runs with different --output-dir values", file=sys.stderr)
+        return 1
+    os.makedirs(options.output_dir, exist_ok=True)
+
+    started = time.perf_counter()
+
+    # Load the holiday calendar once and hand it to every worker
+    shared_holidays = {}
+    if options.consider_holidays:
+        failed_years = set()
+
+        def warn(year, e):
+            failed_years.add(year)
+            print(f"Warning: Could not fetch Hebrew holidays for {year}: {e}", file=sys.stderr)
+
+        last_start = max(options.cohorts_df['Start Date']) if options.cohorts_df is not None else options.start_date
+        years = range(options.start_date.year, last_start.year + options.horizon_years)
+        holiday_names = hebrew_holidays.load_holiday_names(years, options.rules, on_error=warn)
+
+        # Failed years are left out so workers retry them instead of assuming no holidays
+        shared_holidays = {year: set() for year in years if year not in failed_years}
+        for holiday_date in holiday_names:
+            shared_holidays[holiday_date.year].add(holiday_date)
+
+    total_rows = 0
+    failures = []
+    with ProcessPoolExecutor(max_workers=options.workers, initializer=_init_worker,
+                             initargs=(shared_holidays, options)) as executor:
+        futures = {executor.submit(schedule_file, path): path for path in files}
+        for future in as_completed(futures):
+            try:
+                path, output_path, rows = future.result()
+                total_rows += rows
+                print(f"✅ {path} -> {output_path} ({rows} rows)")
+            except Exception as e:
+                failures.append(futures[future])
+                print(f"❌ {futures[future]}: {e}", file=sys.stderr)
+
+    elapsed = time.perf_counter() - started
+    scheduled = len(files) - len(failures)
+    print(
+        f"\nScheduled {scheduled}/{len(files)} file(s), {total_rows} rows in {elapsed:.2f}s "
+        f"({scheduled / elapsed:.1f} files/s, {total_rows / elapsed:.0f} rows/s) with {options.workers} worker(s)"
+    )
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""Local stand-in for the hebcal.com API, served from a JSON fixture.
+
+Benchmarks point SYLLABUS_HEBCAL_URL at this server so runs are offline and
+reproducible. Years missing from the fixture are answered with the nearest
+fixture year moved to the requested year. The committed fixture is
+synthesized in hebcal's format; `record` replaces it with real responses. `check` compares the local
+Hebrew calendar (hebrew_calendar.py) with the fixture; that only validates
+the calendar once the fixture holds real recorded responses.
+
+Examples:
+    python benchmarks/hebcal_fixture.py serve --port 8765
+    python benchmarks/hebcal_fixture.py record --years 2023-2028
+    python benchmarks/hebcal_fixture.py check
+    python benchmarks/hebcal_fixture.py check --live --years 2020-2035
+"""
+import os
+import sys
+import json
+import argparse
+import threading
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'hebcal.json')
+
+
+def load_fixture(path=FIXTURE_PATH):
+    """Return {year: items} from a fixture file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        fixture = json.load(f)
+    return {int(year): items for year, items in fixture['years'].items()}
+
+
+def fixture_source(path=FIXTURE_PATH):
+    """'recorded' for real hebcal.com responses, 'synthesized' for a hand-made fixture"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('source', 'recorded')
+
+
+def fixture_items(fixture, year):
+    """Items for a year; years not in the fixture reuse the nearest fixture year's dates"""
+    if year in fixture:
+        return fixture[year]
+
+    source_year = min(fixture, key=lambda fixture_year: abs(fixture_year - year))
+    items = []
+    for item in fixture[source_year]:
+        month_day = item['date'][4:10]
+        if month_day == '-02-29':
+            continue
+        items.append(dict(item, date=f"{year:04d}{month_day}"))
+    return items
+
+
+class FixtureServer:
+    """hebcal-compatible HTTP server on a background thread (127.0.0.1, free port by default)"""
+
+    def __init__(self, fixture=None, port=0):
+        self.fixture = fixture if fixture is not None else load_fixture()
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                try:
+                    year = int(query['year'][0])
+                except (KeyError, ValueError):
+                    self.send_error(400, "year is required")
+                    return
+
+                server.requests += 1
+                body = json.dumps({'title': f"Hebcal {year}", 'items': fixture_items(server.fixture, year)}).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/hebcal"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def parse_years(value):
+    first, _, last = value.partition('-')
+    return list(range(int(first), int(last or first) + 1))
+
+
+def record(years, path=FIXTURE_PATH):
+    """Record real hebcal.com responses for the given years into the fixture file"""
+    import hebrew_holidays
+
+    fixture = {str(year): hebrew_holidays.fetch_hebcal_items(year) for year in years}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'source': 'recorded',
+            'note': f"Recorded from {hebrew_holidays.HEBCAL_URL} on {datetime.now(timezone.utc).date().isoformat()}",
+            'years': fixture
+        }, f, ensure_ascii=False, indent=1)
+    print(f"Recorded {len(years)} year(s) to {path}")
+
+
+def check(fixture, live_years=None):
+    """Compare the local Hebrew calendar with the fixture (and hebcal.com for live_years)
+
+    Every rule set is compared on its filtered holiday names; returns the number of mismatches.
+    """
+    import hebrew_calendar
+    import hebrew_holidays
+
+    mismatches = 0
+    for filter_name in hebrew_holidays.HOLIDAY_RULE_SETS:
+        for year in sorted(fixture):
+            expected = hebrew_holidays.filter_holiday_names(fixture[year], filter_name)
+            actual = hebrew_holidays.filter_holiday_names(hebrew_calendar.hebcal_items(year), filter_name)
+            if actual != expected:
+                mismatches += 1
+                missing = sorted(set(expected.items()) - set(actual.items()))
+                extra = sorted(set(actual.items()) - set(expected.items()))
+                print(f"{filter_name} {year}: fixture only {missing}, local only {extra}")
+
+        if live_years:
+            for year, (missing, extra) in hebrew_holidays.cross_check(live_years, filter_name).items():
+                mismatches += 1
+                print(f"{filter_name} {year} (hebcal.com): hebcal.com only {missing}, local only {extra}")
+
+    checked = f"{len(fixture)} fixture year(s)" + (f" and {len(live_years)} hebcal.com year(s)" if live_years else "")
+    print(f"{mismatches} mismatch(es) in {checked} across {len(hebrew_holidays.HOLIDAY_RULE_SETS)} rule set(s)")
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve or record the hebcal.com fixture used by the benchmarks")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = subparsers.add_parser('serve', help="Serve the fixture over HTTP")
+    serve_parser.add_argument('--port', type=int, default=8765)
+    serve_parser.add_argument('--fixture', default=FIXTURE_PATH)
+
+    record_parser = subparsers.add_parser('record', help="Record real hebcal.com responses (needs network access)")
+    record_parser.add_argument('--years', type=parse_years, default=parse_years('2023-2028'), metavar='FIRST-LAST')
+    record_parser.add_argument('--fixture', default=FIXTURE_PATH)
+
+    check_parser = subparsers.add_parser('check', help="Validate the local Hebrew calendar against the fixture")
+    check_parser.add_argument('--fixture', default=FIXTURE_PATH)
+    check_parser.add_argument('--live', action='store_true', help="Also cross-check with hebcal.com (needs network access)")
+    check_parser.add_argument('--years', type=parse_years, default=parse_years('2023-2028'), metavar='FIRST-LAST',
+                              help="Years to cross-check with --live")
+
+    options = parser.parse_args(argv)
+    if options.command == 'record':
+        record(options.years, options.fixture)
+        return 0
+    if options.command == 'check':
+        if fixture_source(options.fixture) != 'recorded':
+            print(f"Note: {options.fixture} is synthesized, not recorded from hebcal.com; record it (or use --live) to validate the local calendar")
+        return 1 if check(load_fixture(options.fixture), options.years if options.live else None) else 0
+
+    server = FixtureServer(load_fixture(options.fixture), options.port)
+    print(f"Serving {options.fixture} at {server.url} (set SYLLABUS_HEBCAL_URL to use it)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
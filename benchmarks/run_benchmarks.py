@@ -0,0 +1,429 @@
+"""Benchmarks for the scheduling, holiday and statistics hot paths.
+
+Synthetic syllabi (10 to 1M rows, varying topic sizes, break settings and
+free-day densities) are scheduled with hebcal.com replaced by a local
+server answering from benchmarks/fixtures/hebcal.json (see hebcal_fixture.py;
+the committed fixture is synthesized, not recorded); holidays.local times the
+built-in Hebrew calendar instead. Every case records latency percentiles,
+throughput and peak traced memory, and the run is saved as JSON so results
+can be compared across commits.
+
+Examples:
+    python benchmarks/run_benchmarks.py --quick
+    python benchmarks/run_benchmarks.py --sizes 10 1000 100000 1000000 --output results.json
+    python benchmarks/run_benchmarks.py --compare before.json after.json
+"""
+import io
+import os
+import sys
+import json
+import time
+import fnmatch
+import logging
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import subprocess
+from datetime import date, datetime, timezone
+
+import numpy as np
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCHMARKS_DIR)
+
+from hebcal_fixture import FixtureServer
+from synthetic import synthetic_syllabus, synthetic_free_days, syllabus_csv
+
+START_DATE = date(2025, 1, 5)
+HOLIDAY_YEARS = list(range(2025, 2029))
+DEFAULT_SIZES = [10, 1000, 100000, 1000000]
+QUICK_SIZES = [10, 1000, 10000]
+
+
+class Targets:
+    """The application modules under test, imported once the fixture server is up"""
+
+    def __init__(self):
+        import hebrew_holidays
+        import work_calendar
+        import schedule_engine
+        import streamlit_app
+        import app as flask_app
+
+        self.hebrew_holidays = hebrew_holidays
+        self.work_calendar = work_calendar
+        self.schedule_engine = schedule_engine
+        self.streamlit_app = streamlit_app
+        self.flask_app = flask_app
+        self.flask_app.app.config['MAX_CONTENT_LENGTH'] = None
+        self.flask_app.MAX_UPLOAD_BYTES = None
+        self.client = flask_app.app.test_client()
+
+
+def _upload(targets, data, case, mode):
+    form = {
+        'start_date': START_DATE.isoformat(),
+        'add_break': 'true' if case['add_break'] else 'false',
+        'break_days': '2',
+        'consider_holidays': 'true',
+        'handle_empty_days': 'true',
+        'default_days': '1',
+        'mode': mode,
+        'file': (io.BytesIO(data), 'syllabus.csv')
+    }
+    response = targets.client.post('/upload', data=form, content_type='multipart/form-data')
+    body = response.get_data()
+    if response.status_code != 200:
+        raise RuntimeError(f"/upload answered {response.status_code}: {body[:200]!r}")
+    return body
+
+
+# Each benchmark: setup(targets, case) -> zero-argument callable, the case
+# parameters it depends on, and the largest syllabus it is run with
+def setup_streamlit_schedule(targets, case):
+    syllabus_df = case['syllabus']
+    free_days = case['free_days']
+    return lambda: targets.streamlit_app.calculate_schedule(
+        syllabus_df.copy(), START_DATE, case['add_break'], 2, True, free_days
+    )
+
+
+def setup_flask_schedule(targets, case):
+    syllabus_df = case['syllabus']
+    return lambda: targets.flask_app.calculate_schedule(syllabus_df, START_DATE, case['add_break'], 2, True)
+
+
+def _random_dates(count):
+    return np.datetime64(START_DATE, 'D') + np.random.default_rng(0).integers(0, 1000, count).astype('timedelta64[D]')
+
+
+def _working_calendar(targets, case):
+    holidays = targets.hebrew_holidays.load_holiday_names(HOLIDAY_YEARS)
+    return targets.work_calendar.WorkingCalendar(holidays, case['free_days'])
+
+
+def setup_is_working_day(targets, case):
+    working_calendar = _working_calendar(targets, case)
+    dates = _random_dates(case['rows']).astype(object)
+    return lambda: [working_calendar.is_working_day(day) for day in dates]
+
+
+def setup_offset(targets, case):
+    # The schedule's date lookup: one offset call over every row
+    working_calendar = _working_calendar(targets, case)
+    dates = _random_dates(case['rows'])
+    offsets = np.random.default_rng(1).integers(0, 10, case['rows'])
+    return lambda: working_calendar.offset(dates, offsets)
+
+
+def _schedule(targets, case):
+    schedule_df = targets.streamlit_app.calculate_schedule(
+        case['syllabus'].copy(), START_DATE, case['add_break'], 2, True, case['free_days']
+    )
+    return schedule_df, schedule_df.iloc[0]['Start Date'].date(), schedule_df.iloc[-1]['End Date'].date()
+
+
+def setup_schedule_stats(targets, case):
+    schedule_df, first_day, last_day = _schedule(targets, case)
+    return lambda: targets.streamlit_app.calculate_schedule_stats(
+        schedule_df, first_day, last_day, True, case['free_days']
+    )
+
+
+def setup_exam_dates(targets, case):
+    schedule_df, _, _ = _schedule(targets, case)
+    return lambda: targets.streamlit_app.calculate_exam_dates(schedule_df, True, case['free_days'])
+
+
+def setup_colors(targets, case):
+    schedule_df, _, _ = _schedule(targets, case)
+    # Compute the styles the way st.dataframe does before serializing them
+    return lambda: targets.streamlit_app.add_colors_to_schedule(schedule_df)._compute()
+
+
+def setup_holidays_cold(targets, case):
+    hebrew_holidays = targets.hebrew_holidays
+
+    def load_cold():
+        hebrew_holidays.holiday_cache = hebrew_holidays.HolidayCache(cache_dir=tempfile.mkdtemp())
+        return hebrew_holidays.load_holiday_names(HOLIDAY_YEARS, source='hebcal')
+    return load_cold
+
+
+def setup_holidays_warm(targets, case):
+    hebrew_holidays = targets.hebrew_holidays
+    cache_dir = tempfile.mkdtemp()
+    hebrew_holidays.holiday_cache = hebrew_holidays.HolidayCache(cache_dir=cache_dir)
+    hebrew_holidays.load_holiday_names(HOLIDAY_YEARS, source='hebcal')
+
+    def load_warm():
+        # A new process-level cache on a populated directory: disk hits only
+        hebrew_holidays.holiday_cache = hebrew_holidays.HolidayCache(cache_dir=cache_dir)
+        return hebrew_holidays.load_holiday_names(HOLIDAY_YEARS, source='hebcal')
+    return load_warm
+
+
+def setup_holidays_local(targets, case):
+    hebrew_holidays = targets.hebrew_holidays
+
+    def load_local():
+        # Computed from scratch every time, the way a fresh process sees it
+        hebrew_holidays._local_holiday_names.cache_clear()
+        return hebrew_holidays.load_holiday_names(HOLIDAY_YEARS, source='local')
+    return load_local
+
+
+def setup_upload(targets, case):
+    data = syllabus_csv(case['syllabus'])
+    return lambda: _upload(targets, data, case, 'direct')
+
+
+def setup_upload_stream(targets, case):
+    data = syllabus_csv(case['syllabus'])
+    return lambda: _upload(targets, data, case, 'stream')
+
+
+BENCHMARKS = {
+    'streamlit.calculate_schedule': (setup_streamlit_schedule, ('rows', 'topics', 'add_break', 'holiday_density'), None),
+    'flask.calculate_schedule': (setup_flask_schedule, ('rows', 'topics', 'add_break'), None),
+    'working_calendar.is_working_day': (setup_is_working_day, ('rows', 'holiday_density'), None),
+    'working_calendar.offset': (setup_offset, ('rows', 'holiday_density'), None),
+    'calculate_schedule_stats': (setup_schedule_stats, ('rows', 'topics', 'add_break', 'holiday_density'), None),
+    'calculate_exam_dates': (setup_exam_dates, ('rows', 'topics', 'add_break', 'holiday_density'), None),
+    'add_colors_to_schedule': (setup_colors, ('rows', 'topics', 'add_break'), 100000),
+    'holidays.load_cold': (setup_holidays_cold, (), None),
+    'holidays.load_warm': (setup_holidays_warm, (), None),
+    'holidays.local': (setup_holidays_local, (), None),
+    'flask.upload': (setup_upload, ('rows', 'topics', 'add_break'), None),
+    'flask.upload_stream': (setup_upload_stream, ('rows', 'topics', 'add_break'), None),
+}
+
+
+def measure(fn, min_repeats, max_repeats, min_time):
+    """Time fn after one warm-up call; returns the list of latencies in seconds"""
+    fn()
+    latencies = []
+    started = time.perf_counter()
+    while len(latencies) < max_repeats:
+        call_started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - call_started)
+        if len(latencies) >= min_repeats and time.perf_counter() - started >= min_time:
+            break
+    return latencies
+
+
+def peak_memory(fn):
+    """Peak traced memory of one call, in bytes"""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def iter_cases(options):
+    """Yield (benchmark name, case) over the requested grid, once per distinct relevant parameter set"""
+    seen = set()
+    for name, (setup, params, max_rows) in BENCHMARKS.items():
+        if not any(fnmatch.fnmatch(name, pattern) for pattern in options.benchmarks):
+            continue
+        for rows in options.sizes:
+            if max_rows is not None and rows > max_rows:
+                continue
+            for rows_per_topic in options.rows_per_topic:
+                for add_break in options.breaks:
+                    for density in options.holiday_density:
+                        case = {
+                            'rows': rows if 'rows' in params else None,
+                            'topics': -(-rows // rows_per_topic) if 'topics' in params else None,
+                            'add_break': add_break if 'add_break' in params else None,
+                            'holiday_density': density if 'holiday_density' in params else None
+                        }
+                        key = (name,) + tuple(case.values())
+                        if key in seen:
+                            continue
+                        seen.add(key)
+                        case['rows_per_topic'] = rows_per_topic
+                        yield name, case
+
+
+def run(options):
+    targets = Targets()
+    results = []
+    syllabi = {}
+
+    for name, case in iter_cases(options):
+        setup = BENCHMARKS[name][0]
+        rows = case['rows'] or 0
+        syllabus_key = (rows, case['rows_per_topic'])
+        if rows and syllabus_key not in syllabi:
+            syllabi[syllabus_key] = synthetic_syllabus(rows, case['rows_per_topic'], options.span_days)
+        run_case = dict(
+            case,
+            syllabus=syllabi.get(syllabus_key),
+            add_break=bool(case['add_break']),
+            free_days=synthetic_free_days(START_DATE, options.span_days, case['holiday_density'] or 0.0)
+        )
+
+        fn = setup(targets, run_case)
+        latencies = np.array(measure(fn, options.min_repeats, options.max_repeats, options.min_time))
+        p50 = float(np.percentile(latencies, 50))
+        result = {
+            'benchmark': name,
+            'rows': case['rows'],
+            'topics': case['topics'],
+            'add_break': case['add_break'],
+            'holiday_density': case['holiday_density'],
+            'repeats': len(latencies),
+            'latency_ms': {
+                'min': float(latencies.min() * 1000),
+                'p50': p50 * 1000,
+                'p90': float(np.percentile(latencies, 90) * 1000),
+                'p99': float(np.percentile(latencies, 99) * 1000),
+                'mean': float(latencies.mean() * 1000)
+            },
+            'throughput_rows_per_s': rows / p50 if rows and p50 else None,
+            'peak_memory_mb': None if options.no_memory else peak_memory(fn) / (1024 * 1024)
+        }
+        results.append(result)
+        print(format_result(result), flush=True)
+
+    return results
+
+
+def format_result(result):
+    label = result['benchmark']
+    details = [f"{key}={result[key]}" for key in ('rows', 'topics', 'add_break', 'holiday_density')
+               if result[key] is not None]
+    latency = result['latency_ms']
+    line = f"{label:30} {' '.join(details):55} p50 {latency['p50']:10.2f} ms  p90 {latency['p90']:10.2f} ms"
+    if result['peak_memory_mb'] is not None:
+        line += f"  peak {result['peak_memory_mb']:8.1f} MB"
+    return line
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def result_key(result):
+    return (result['benchmark'], result['rows'], result['topics'], result['add_break'], result['holiday_density'])
+
+
+def compare(baseline, current, threshold):
+    """Print p50 ratios for cases present in both runs; returns the regressed cases"""
+    baseline_results = {result_key(result): result for result in baseline['results']}
+    regressions = []
+    print(f"\nComparing {baseline['meta']['commit']} -> {current['meta']['commit']} (p50, regression above +{threshold:.0%})")
+    for result in current['results']:
+        previous = baseline_results.get(result_key(result))
+        if previous is None:
+            continue
+        old, new = previous['latency_ms']['p50'], result['latency_ms']['p50']
+        ratio = new / old if old else float('inf')
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  REGRESSION'
+            regressions.append(result)
+        elif ratio < 1 / (1 + threshold):
+            flag = '  faster'
+        details = ' '.join(f"{value}" for value in result_key(result)[1:] if value is not None)
+        print(f"{result['benchmark']:30} {details:30} {old:10.2f} -> {new:10.2f} ms  x{ratio:6.2f}{flag}")
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark the scheduling, holiday and statistics hot paths")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Syllabus sizes in rows")
+    parser.add_argument('--quick', action='store_true', help=f"Small sizes ({QUICK_SIZES}) and short timing")
+    parser.add_argument('--rows-per-topic', type=int, nargs='+', default=[10], help="Subtopics per main topic")
+    parser.add_argument('--breaks', choices=['off', 'on'], nargs='+', default=['off', 'on'], help="Break settings")
+    parser.add_argument('--holiday-density', type=float, nargs='+', default=[0.0, 0.05],
+                        help="Share of calendar days added as additional free days")
+    parser.add_argument('--span-days', type=int, default=750, help="Working days a synthetic course spans")
+    parser.add_argument('--benchmarks', nargs='+', default=['*'], metavar='PATTERN',
+                        help=f"Benchmarks to run (glob patterns): {', '.join(BENCHMARKS)}")
+    parser.add_argument('--min-repeats', type=int, default=3)
+    parser.add_argument('--max-repeats', type=int, default=30)
+    parser.add_argument('--min-time', type=float, default=0.5, help="Seconds to keep repeating each case")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the tracemalloc peak memory run")
+    parser.add_argument('--output', help="Results JSON path (default benchmarks/results/<commit>-<time>.json)")
+    parser.add_argument('--compare', nargs='+', metavar='JSON',
+                        help="Baseline results to compare against; with two files, compare them without running")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Relative p50 slowdown reported as a regression")
+    parser.add_argument('--fail-on-regression', action='store_true', help="Exit with status 1 on regressions")
+    return parser
+
+
+def load_results(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    options = build_parser().parse_args(argv)
+    if options.compare and len(options.compare) == 2:
+        regressions = compare(load_results(options.compare[0]), load_results(options.compare[1]), options.threshold)
+        return 1 if regressions and options.fail_on_regression else 0
+
+    if options.quick:
+        options.sizes = QUICK_SIZES
+        options.min_time = 0.1
+        options.max_repeats = 10
+    options.breaks = [value == 'on' for value in options.breaks]
+
+    # Offline, reproducible holidays: the local fixture server and an empty cache
+    server = FixtureServer().start()
+    os.environ['SYLLABUS_HEBCAL_URL'] = server.url
+    os.environ['SYLLABUS_HOLIDAY_CACHE_DIR'] = tempfile.mkdtemp(prefix='syllabus-bench-cache-')
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+
+    started = time.perf_counter()
+    try:
+        results = run(options)
+    finally:
+        server.stop()
+
+    import pandas
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pandas.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'duration_s': round(time.perf_counter() - started, 1),
+            'options': {key: value for key, value in vars(options).items() if key not in ('compare', 'output')}
+        },
+        'results': results
+    }
+
+    output = options.output
+    if output is None:
+        os.makedirs(os.path.join(BENCHMARKS_DIR, 'results'), exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        output = os.path.join(BENCHMARKS_DIR, 'results', f"{report['meta']['commit']}-{stamp}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+    print(f"\nSaved {len(results)} result(s) to {output}")
+
+    if options.compare:
+        regressions = compare(load_results(options.compare[0]), report, options.threshold)
+        if regressions and options.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""Synthetic syllabi and free-day sets for the benchmarks."""
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+
+def synthetic_syllabus(rows, rows_per_topic=10, span_days=750, exam_every=10, seed=0):
+    """Build a syllabus of `rows` rows in contiguous topics named in sorted order
+
+    Days are 1-5 per row; for large syllabi most rows get 0 days so the whole
+    course still spans about span_days working days (and stays inside the years
+    the hebcal fixture covers). Every exam_every-th topic is an exam topic.
+    """
+    rng = np.random.default_rng(seed)
+    topic_ids = np.arange(rows) // max(rows_per_topic, 1)
+    topic_count = int(topic_ids[-1]) + 1 if rows else 0
+    topic_names = np.array([
+        f"Topic {i:07d} Exam" if exam_every and i % exam_every == exam_every - 1 else f"Topic {i:07d}"
+        for i in range(topic_count)
+    ], dtype=object)
+
+    days = rng.integers(1, 6, rows)
+    if rows * 3 > span_days:
+        days[rng.random(rows) >= span_days / (rows * 3)] = 0
+
+    return pd.DataFrame({
+        'Main Topic': topic_names[topic_ids],
+        'Subtopic': [f"Subtopic {i}" for i in range(rows)],
+        'Days': days
+    })
+
+
+def synthetic_free_days(start_date, span_days=750, density=0.0, seed=0):
+    """Random additional free days: each calendar day in the course span with probability density"""
+    if density <= 0:
+        return set()
+    rng = np.random.default_rng(seed + 1)
+    calendar_days = int(span_days * 7 / 5 * 1.2) + 30
+    picked = np.flatnonzero(rng.random(calendar_days) < density)
+    return {start_date + timedelta(days=int(offset)) for offset in picked}
+
+
+def syllabus_csv(syllabus_df):
+    """The syllabus as uploaded CSV bytes"""
+    return syllabus_df.to_csv(index=False).encode('utf-8')
@@ -0,0 +1,289 @@
+"""Hebrew calendar computed locally: molad and dehiyyot year arithmetic plus hebcal-style holiday items.
+
+hebcal_items(year) returns the items hebcal.com answers for a Gregorian year
+with the parameters hebrew_holidays.fetch_hebcal_items sends: the diaspora
+schedule with major (maj) and modern (mod, nh) holidays. Like that query it
+has no minor holidays (min), minor fasts (mf), special Shabbatot (ss) or Rosh
+Chodesh (nx) items; holiday_items also lists the minor holidays for callers
+that want them. Titles and dates follow hebcal, so the holiday rule sets apply
+unchanged; the subcat labels are approximate and no rule set reads them.
+"""
+import functools
+from datetime import date
+
+# Months are numbered from Nisan; the year starts at Tishrei (7) and ends at Elul (6)
+NISAN, IYYAR, SIVAN, TAMUZ, AV, ELUL, TISHREI, CHESHVAN, KISLEV, TEVET, SHVAT, ADAR_I, ADAR_II = range(1, 14)
+
+MONTH_NAMES = {
+    NISAN: 'Nisan', IYYAR: 'Iyyar', SIVAN: 'Sivan', TAMUZ: 'Tamuz', AV: 'Av', ELUL: 'Elul',
+    TISHREI: 'Tishrei', CHESHVAN: 'Cheshvan', KISLEV: 'Kislev', TEVET: 'Tevet', SHVAT: "Sh'vat",
+    ADAR_I: 'Adar', ADAR_II: 'Adar II'
+}
+
+# Time is counted in parts (chalakim), 1080 to the hour
+PARTS_PER_HOUR = 1080
+PARTS_PER_DAY = 24 * PARTS_PER_HOUR
+
+# date.toordinal() of the day before 1 Tishrei AM 1 (elapsed_days counts from here)
+HEBREW_EPOCH = -1373428
+
+# Weekdays as date.weekday() numbers them
+MONDAY, TUESDAY, WEDNESDAY, THURSDAY, FRIDAY, SATURDAY, SUNDAY = range(7)
+
+
+def is_leap_year(year):
+    """Years 3, 6, 8, 11, 14, 17 and 19 of the 19-year cycle have Adar I and Adar II"""
+    return (7 * year + 1) % 19 < 7
+
+
+@functools.lru_cache(maxsize=None)
+def elapsed_days(year):
+    """Days from the epoch to Rosh Hashana of year, from the molad of Tishrei and the dehiyyot"""
+    months = (235 * year - 234) // 19
+
+    # Molad of Tishrei: BaHaRaD (day 1, 5 hours, 204 parts) plus 29d 12h 793p per month
+    parts = 204 + 793 * (months % 1080)
+    hours = 5 + 12 * months + 793 * (months // 1080) + parts // PARTS_PER_HOUR
+    day = 1 + 29 * months + hours // 24
+    parts = PARTS_PER_HOUR * (hours % 24) + parts % PARTS_PER_HOUR
+
+    # Molad zaken (at or after noon), GaTaRaD and BeTUTaKPaT postpone by a day;
+    # day % 7 counts the weekday from Sunday = 0
+    if (parts >= 18 * PARTS_PER_HOUR
+            or (day % 7 == 2 and parts >= 9 * PARTS_PER_HOUR + 204 and not is_leap_year(year))
+            or (day % 7 == 1 and parts >= 15 * PARTS_PER_HOUR + 589 and is_leap_year(year - 1))):
+        day += 1
+    # Lo ADU Rosh: Rosh Hashana never falls on Sunday, Wednesday or Friday
+    if day % 7 in (0, 3, 5):
+        day += 1
+    return day
+
+
+def new_year(year):
+    """date.toordinal() of Rosh Hashana (1 Tishrei) of year"""
+    return HEBREW_EPOCH + elapsed_days(year)
+
+
+def days_in_year(year):
+    """353-355 days in a common year, 383-385 in a leap year"""
+    return new_year(year + 1) - new_year(year)
+
+
+def month_length(year, month):
+    """Days in a Hebrew month; Cheshvan and Kislev follow the length of the year"""
+    if month in (IYYAR, TAMUZ, ELUL, TEVET, ADAR_II):
+        return 29
+    if month == ADAR_I and not is_leap_year(year):
+        return 29
+    if month == CHESHVAN and days_in_year(year) % 10 != 5:
+        return 29
+    if month == KISLEV and days_in_year(year) % 10 == 3:
+        return 29
+    return 30
+
+
+def year_months(year):
+    """The months of year in calendar order, Tishrei first"""
+    last = ADAR_II if is_leap_year(year) else ADAR_I
+    return list(range(TISHREI, last + 1)) + list(range(NISAN, TISHREI))
+
+
+@functools.lru_cache(maxsize=256)
+def _month_starts(year):
+    starts = {}
+    ordinal = new_year(year)
+    for month in year_months(year):
+        starts[month] = ordinal
+        ordinal += month_length(year, month)
+    return starts
+
+
+def to_ordinal(year, month, day):
+    """date.toordinal() of a Hebrew date (the inverse of from_date)"""
+    return _month_starts(year)[month] + day - 1
+
+
+def to_date(year, month, day):
+    """The Gregorian date of a Hebrew date"""
+    return date.fromordinal(to_ordinal(year, month, day))
+
+
+def from_date(value):
+    """The Hebrew (year, month, day) of a Gregorian date"""
+    ordinal = value.toordinal()
+    year = value.year + 3760
+    if new_year(year + 1) <= ordinal:
+        year += 1
+
+    starts = _month_starts(year)
+    month = TISHREI
+    for candidate in year_months(year):
+        if starts[candidate] > ordinal:
+            break
+        month = candidate
+    return year, month, ordinal - starts[month] + 1
+
+
+def month_name(year, month):
+    """hebcal's month name; Adar is 'Adar I' in a leap year"""
+    if month == ADAR_I and is_leap_year(year):
+        return 'Adar I'
+    return MONTH_NAMES[month]
+
+
+def _ordinal_suffix(number):
+    suffix = 'th' if 10 <= number % 100 <= 20 else {1: 'st', 2: 'nd', 3: 'rd'}.get(number % 10, 'th')
+    return f"{number}{suffix}"
+
+
+def _weekday(ordinal):
+    return (ordinal - 1) % 7
+
+
+# (month, day, title, subcat) of the holidays on a fixed Hebrew date, diaspora schedule;
+# ADAR_I here stands for Adar, which is Adar II in a leap year
+FIXED_HOLIDAYS = [
+    (TISHREI, 1, 'Rosh Hashana {year}', 'major'),
+    (TISHREI, 2, 'Rosh Hashana II', 'major'),
+    (TISHREI, 9, 'Erev Yom Kippur', 'major'),
+    (TISHREI, 10, 'Yom Kippur', 'major'),
+    (TISHREI, 14, 'Erev Sukkot', 'major'),
+    (TISHREI, 15, 'Sukkot I', 'major'),
+    (TISHREI, 16, 'Sukkot II', 'major'),
+    (TISHREI, 17, "Sukkot III (CH''M)", 'major'),
+    (TISHREI, 18, "Sukkot IV (CH''M)", 'major'),
+    (TISHREI, 19, "Sukkot V (CH''M)", 'major'),
+    (TISHREI, 20, "Sukkot VI (CH''M)", 'major'),
+    (TISHREI, 21, 'Sukkot VII (Hoshana Raba)', 'major'),
+    (TISHREI, 22, 'Shmini Atzeret', 'major'),
+    (TISHREI, 23, 'Simchat Torah', 'major'),
+    (SHVAT, 15, 'Tu BiShvat', 'minor'),
+    (ADAR_I, 13, 'Erev Purim', 'major'),
+    (ADAR_I, 14, 'Purim', 'major'),
+    (ADAR_I, 15, 'Shushan Purim', 'minor'),
+    (NISAN, 14, 'Erev Pesach', 'major'),
+    (NISAN, 15, 'Pesach I', 'major'),
+    (NISAN, 16, 'Pesach II', 'major'),
+    (NISAN, 17, "Pesach III (CH''M)", 'major'),
+    (NISAN, 18, "Pesach IV (CH''M)", 'major'),
+    (NISAN, 19, "Pesach V (CH''M)", 'major'),
+    (NISAN, 20, "Pesach VI (CH''M)", 'major'),
+    (NISAN, 21, 'Pesach VII', 'major'),
+    (NISAN, 22, 'Pesach VIII', 'major'),
+    (IYYAR, 14, 'Pesach Sheni', 'minor'),
+    (IYYAR, 18, 'Lag BaOmer', 'minor'),
+    (SIVAN, 5, 'Erev Shavuot', 'major'),
+    (SIVAN, 6, 'Shavuot I', 'major'),
+    (SIVAN, 7, 'Shavuot II', 'major'),
+    (AV, 15, "Tu B'Av", 'minor'),
+    (ELUL, 1, 'Rosh Hashana LaBehemot', 'minor')
+]
+
+# (month, day, title, first year) of modern Israeli days observed on their date
+MODERN_HOLIDAYS = [
+    (IYYAR, 28, 'Yom Yerushalayim', 5727),
+    (CHESHVAN, 29, 'Sigd', 5769)
+]
+
+
+def holiday_items(year):
+    """(ordinal, title, subcat) of every holiday of Hebrew year year (Tishrei to Elul, plus Erev Rosh Hashana)"""
+    items = [(new_year(year) - 1, 'Erev Rosh Hashana', 'major')]
+    adar = ADAR_II if is_leap_year(year) else ADAR_I
+    items.extend(
+        (to_ordinal(year, adar if month == ADAR_I else month, day), title.format(year=year), subcat)
+        for month, day, title, subcat in FIXED_HOLIDAYS
+    )
+
+    # The first Chanukah candle is lit on the evening of 24 Kislev
+    chanukah = to_ordinal(year, KISLEV, 24)
+    items.extend(
+        (chanukah + night - 1, f"Chanukah: {night} Candle{'s' if night > 1 else ''}", 'major')
+        for night in range(1, 9)
+    )
+    items.append((chanukah + 8, 'Chanukah: 8th Day', 'major'))
+
+    # Tish'a B'Av on Shabbat is observed on Sunday
+    tisha_bav = to_ordinal(year, AV, 9)
+    if _weekday(tisha_bav) == SATURDAY:
+        items.append((tisha_bav, "Erev Tish'a B'Av", 'major'))
+        items.append((tisha_bav + 1, "Tish'a B'Av (observed)", 'major'))
+    else:
+        items.append((tisha_bav - 1, "Erev Tish'a B'Av", 'major'))
+        items.append((tisha_bav, "Tish'a B'Av", 'major'))
+
+    items.extend(_modern_items(year))
+
+    # Selichot start on the Saturday night at least four days before Rosh Hashana
+    selichot = new_year(year + 1) - 4
+    selichot -= (_weekday(selichot) - SATURDAY) % 7
+    items.append((selichot, 'Leil Selichot', 'minor'))
+    return items
+
+
+def _modern_items(year):
+    """Yom HaShoah, Yom HaZikaron and Yom HaAtzma'ut, moved off Shabbat (and its eve) as in Israel"""
+    items = []
+
+    # Yom HaShoah (27 Nisan): Friday moves back to Thursday, Sunday forward to Monday
+    if year >= 5711:
+        shoah = to_ordinal(year, NISAN, 27)
+        shoah += {FRIDAY: -1, SUNDAY: 1}.get(_weekday(shoah), 0)
+        items.append((shoah, 'Yom HaShoah', 'modern'))
+
+    # Yom HaAtzma'ut (5 Iyar): Friday or Shabbat move back to Thursday and, since
+    # 5764, Monday moves to Tuesday so Yom HaZikaron does not follow Shabbat
+    if year >= 5708:
+        independence = to_ordinal(year, IYYAR, 5)
+        shift = {FRIDAY: -1, SATURDAY: -2}
+        if year >= 5764:
+            shift[MONDAY] = 1
+        independence += shift.get(_weekday(independence), 0)
+        items.append((independence - 1, 'Yom HaZikaron', 'modern'))
+        items.append((independence, "Yom HaAtzma'ut", 'modern'))
+
+    items.extend(
+        (to_ordinal(year, month, day), title, 'modern')
+        for month, day, title, first_year in MODERN_HOLIDAYS if year >= first_year
+    )
+    return items
+
+
+def hebcal_items(year, hebrew_dates=False, minor=False):
+    """The holiday items (and optionally daily Hebrew dates) of a Gregorian year in hebcal.com JSON form
+
+    minor=True adds the minor holidays, as hebcal.com does for a query with min=on.
+    """
+    first, last = date(year, 1, 1).toordinal(), date(year, 12, 31).toordinal()
+    items = [
+        (ordinal, {'title': title, 'date': date.fromordinal(ordinal).isoformat(), 'category': 'holiday', 'subcat': subcat})
+        for hebrew_year in (year + 3760, year + 3761)
+        for ordinal, title, subcat in holiday_items(hebrew_year)
+        if first <= ordinal <= last and (minor or subcat != 'minor')
+    ]
+
+    if hebrew_dates:
+        hebrew_year, month, day = from_date(date(year, 1, 1))
+        for ordinal in range(first, last + 1):
+            if day > month_length(hebrew_year, month):
+                month, day = _next_month(hebrew_year, month)
+                if month == TISHREI:
+                    hebrew_year += 1
+            items.append((ordinal, {
+                'title': f"{_ordinal_suffix(day)} of {month_name(hebrew_year, month)}, {hebrew_year}",
+                'date': date.fromordinal(ordinal).isoformat(),
+                'category': 'hebdate'
+            }))
+            day += 1
+
+    # Holidays come before the Hebrew date of the same day, as hebcal lists them
+    items.sort(key=lambda entry: (entry[0], entry[1]['category'] != 'holiday'))
+    return [item for _, item in items]
+
+
+def _next_month(year, month):
+    months = year_months(year)
+    position = months.index(month) + 1
+    if position == len(months):
+        return TISHREI, 1
+    return months[position], 1
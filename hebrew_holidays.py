@@ -0,0 +1,432 @@
+import os
+import re
+import json
+import hashlib
+import functools
+import time
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import requests
+
+import hebrew_calendar
+import instrumentation
+
+try:
+    import fcntl
+except ImportError:  # Windows - fall back to in-process locking only
+    fcntl = None
+
+HEBCAL_URL = os.environ.get('SYLLABUS_HEBCAL_URL', "https://www.hebcal.com/hebcal")
+HEBCAL_TIMEOUT = 10
+
+# Where holiday items come from: 'hebcal' fetches them from hebcal.com through the
+# on-disk cache, 'local' computes them with hebrew_calendar (no network)
+HOLIDAY_SOURCES = ('hebcal', 'local')
+HOLIDAY_SOURCE = os.environ.get('SYLLABUS_HOLIDAY_SOURCE', 'hebcal')
+if HOLIDAY_SOURCE not in HOLIDAY_SOURCES:
+    raise ValueError(f"SYLLABUS_HOLIDAY_SOURCE must be one of: {', '.join(HOLIDAY_SOURCES)}")
+
+# Bump when the on-disk entry layout changes; old entries are then ignored
+CACHE_VERSION = 2
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache')),
+    'syllabus-calculator',
+    'holidays'
+)
+DEFAULT_CACHE_TTL = 30 * 24 * 60 * 60  # 30 days
+
+# Upper bound on concurrent hebcal.com requests when loading several years
+HOLIDAY_FETCH_WORKERS = int(os.environ.get('SYLLABUS_HOLIDAY_FETCH_WORKERS', 4))
+
+
+def fetch_hebcal_items(year):
+    """Fetch the raw hebcal.com items for a calendar year"""
+    params = {
+        'v': 1,
+        'cfg': 'json',
+        'maj': 'on',
+        'mod': 'on',
+        'nh': 'on',
+        'd': 'on',
+        'lg': 's',
+        'year': year,
+        'start': f"{year}-01-01",
+        'end': f"{year}-12-31"
+    }
+
+    response = requests.get(HEBCAL_URL, params=params, timeout=HEBCAL_TIMEOUT)
+    response.raise_for_status()
+
+    return response.json().get('items', [])
+
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'holiday_rules.json')
+
+
+def _any_of(words):
+    return '|'.join(re.escape(word) for word in words)
+
+
+class HolidayRuleSet:
+    """A declarative holiday rule set compiled into one precompiled regex.
+
+    The regex runs over "<category>\t<title>": exclusions are a negative
+    lookahead, and each include rule is a named alternative made of lookaheads
+    for its categories and keywords. Results are memoized per (category, title).
+    """
+
+    def __init__(self, name, rules):
+        self.name = name
+        self.rules = rules
+        self.rule_names = []
+
+        # The description does not affect matching, so it is not part of the cache key
+        canonical = {key: value for key, value in rules.items() if key != 'description'}
+        self.fingerprint = hashlib.sha256(json.dumps(canonical, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+        self.pattern = re.compile(self._build_pattern(rules))
+        self.classify = functools.lru_cache(maxsize=4096)(self._classify)
+
+    def _build_pattern(self, rules):
+        exclude = rules.get('exclude', {})
+        excluded = []
+        if exclude.get('contains'):
+            excluded.append(f".*(?i:{_any_of(exclude['contains'])})")
+        if exclude.get('regex'):
+            # Regex rules are matched case sensitively, exactly as written
+            excluded.append(".*(?:" + '|'.join(exclude['regex']) + ")")
+        if exclude.get('equals'):
+            excluded.append(f"(?i:{_any_of(exclude['equals'])})\\Z")
+
+        pattern = '^'
+        if excluded:
+            pattern += '(?![^\\t]*\\t(?:' + '|'.join(excluded) + '))'
+
+        alternatives = []
+        for index, rule in enumerate(rules.get('include', [])):
+            conditions = []
+            if rule.get('categories'):
+                conditions.append(f"(?=(?:{_any_of(rule['categories'])})\\t)")
+            for word in rule.get('contains_all', []):
+                conditions.append(f"(?=[^\\t]*\\t.*(?i:{re.escape(word)}))")
+            if rule.get('contains_any'):
+                conditions.append(f"(?=[^\\t]*\\t.*(?i:{_any_of(rule['contains_any'])}))")
+            alternatives.append(f"(?P<r{index}>{''.join(conditions)})")
+            self.rule_names.append(rule.get('name', f"rule {index}"))
+
+        if not alternatives:
+            # Nothing is included - a pattern that never matches
+            return '(?!)'
+        return pattern + '(?:' + '|'.join(alternatives) + ')'
+
+    def _classify(self, category, title):
+        match = self.pattern.match(f"{category}\t{title}")
+        if match is None:
+            return None
+        return self.rule_names[int(match.lastgroup[1:])]
+
+
+def load_holiday_rules(path=DEFAULT_RULES_PATH):
+    """Load and compile the holiday rule sets from a JSON rule table"""
+    with open(path, 'r', encoding='utf-8') as f:
+        table = json.load(f)
+    return {name: HolidayRuleSet(name, rules) for name, rules in table.items()}
+
+
+# Rule sets by name; point SYLLABUS_HOLIDAY_RULES at another JSON file to change them
+HOLIDAY_RULE_SETS = load_holiday_rules(os.environ.get('SYLLABUS_HOLIDAY_RULES', DEFAULT_RULES_PATH))
+
+
+def filter_holiday_names(items, filter_name):
+    """Apply a named holiday filter to hebcal items and return a date -> holiday name mapping"""
+    rule_set = HOLIDAY_RULE_SETS[filter_name]
+
+    holiday_names = {}
+    for item in items:
+        date_str = item.get('date')
+        if date_str and rule_set.classify(item.get('category', ''), item.get('title', '')):
+            # Timed items carry a full timestamp, the date is the first 10 characters
+            holiday_date = date.fromisoformat(date_str[:10])
+            holiday_names[holiday_date] = item.get('title', 'Unknown Holiday')
+    return holiday_names
+
+
+class HolidayCache:
+    """Versioned on-disk cache of filtered holidays (date -> name), keyed by year and filter rules.
+
+    Entries are written atomically (temp file + rename) so several processes can
+    share one cache directory. Expired entries are served immediately while a
+    background refresh runs when stale_while_revalidate is on, and any cached
+    entry is used as an offline fallback when hebcal.com cannot be reached.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl=DEFAULT_CACHE_TTL,
+                 stale_while_revalidate=True, fetch_items=fetch_hebcal_items):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self.fetch_items = fetch_items
+        self._memory = {}
+        self._lock = threading.Lock()
+        self._refreshing = set()
+
+    def _entry_path(self, year, filter_name):
+        fingerprint = HOLIDAY_RULE_SETS[filter_name].fingerprint
+        return os.path.join(self.cache_dir, f"v{CACHE_VERSION}", f"{filter_name}-{fingerprint}-{year}.json")
+
+    def _read_entry(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if entry.get('version') != CACHE_VERSION:
+            return None
+
+        holiday_names = {
+            date.fromisoformat(d): name
+            for d, name in entry.get('holidays', {}).items()
+        }
+        return entry.get('fetched_at', 0), holiday_names
+
+    def _write_entry(self, path, year, filter_name, fetched_at, holiday_names):
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        entry = {
+            'version': CACHE_VERSION,
+            'year': year,
+            'filter': filter_name,
+            'fetched_at': fetched_at,
+            'holidays': {d.strftime('%Y-%m-%d'): name for d, name in sorted(holiday_names.items())}
+        }
+
+        # Write to a temp file in the same directory, then rename over the target
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.json')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _lock_file(self, path, blocking):
+        """Take an inter-process lock for an entry; returns the open lock file or None"""
+        if fcntl is None:
+            return None
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            lock_file = open(path + '.lock', 'a')
+        except OSError:
+            return None
+        try:
+            flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+            fcntl.flock(lock_file, flags)
+        except OSError:
+            lock_file.close()
+            return None
+        return lock_file
+
+    def _unlock_file(self, lock_file):
+        if lock_file is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+    def _is_fresh(self, fetched_at):
+        return time.time() - fetched_at < self.ttl
+
+    def _fetch_and_store(self, year, filter_name, path):
+        try:
+            items = self.fetch_items(year)
+        except Exception:
+            instrumentation.increment('holiday_fetch_errors')
+            raise
+        instrumentation.increment('holiday_fetches')
+        holiday_names = filter_holiday_names(items, filter_name)
+        fetched_at = time.time()
+
+        try:
+            self._write_entry(path, year, filter_name, fetched_at, holiday_names)
+        except OSError as e:
+            # A read-only cache directory should not break schedule generation
+            print(f"Warning: Could not write holiday cache {path}: {e}")
+
+        with self._lock:
+            self._memory[path] = (fetched_at, holiday_names)
+        return holiday_names
+
+    def _refresh_in_background(self, year, filter_name, path):
+        with self._lock:
+            if path in self._refreshing:
+                return
+            self._refreshing.add(path)
+
+        def refresh():
+            # Another process already refreshing this entry is good enough
+            lock_file = self._lock_file(path, blocking=False)
+            try:
+                if fcntl is None or lock_file is not None:
+                    self._fetch_and_store(year, filter_name, path)
+            except Exception as e:
+                print(f"Warning: Background holiday refresh for {year} failed: {e}")
+            finally:
+                self._unlock_file(lock_file)
+                with self._lock:
+                    self._refreshing.discard(path)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def get(self, year, filter_name='free_days'):
+        """Return the filtered date -> holiday name mapping for a year, fetching from hebcal.com only when needed"""
+        path = self._entry_path(year, filter_name)
+
+        with self._lock:
+            cached = self._memory.get(path)
+        if cached is None or not self._is_fresh(cached[0]):
+            cached = self._read_entry(path) or cached
+            if cached is not None:
+                with self._lock:
+                    self._memory[path] = cached
+
+        if cached is not None:
+            fetched_at, holiday_names = cached
+            if self._is_fresh(fetched_at):
+                instrumentation.increment('holiday_cache_hits')
+                return dict(holiday_names)
+            if self.stale_while_revalidate:
+                instrumentation.increment('holiday_cache_hits')
+                self._refresh_in_background(year, filter_name, path)
+                return dict(holiday_names)
+
+        # Cold (or expired without stale-while-revalidate): fetch while holding the
+        # entry lock so concurrent processes do not all hit hebcal.com at once
+        lock_file = self._lock_file(path, blocking=True)
+        try:
+            fresh = self._read_entry(path)
+            if fresh is not None and self._is_fresh(fresh[0]):
+                instrumentation.increment('holiday_cache_hits')
+                with self._lock:
+                    self._memory[path] = fresh
+                return dict(fresh[1])
+
+            try:
+                return dict(self._fetch_and_store(year, filter_name, path))
+            except Exception:
+                # Offline fallback: an expired entry beats an empty holiday set
+                if cached is not None:
+                    print(f"Warning: Using cached holidays for {year}, hebcal.com is unavailable")
+                    return dict(cached[1])
+                raise
+        finally:
+            self._unlock_file(lock_file)
+
+
+def _env_flag(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ['1', 'true', 'yes', 'on']
+
+
+holiday_cache = HolidayCache(
+    cache_dir=os.environ.get('SYLLABUS_HOLIDAY_CACHE_DIR', DEFAULT_CACHE_DIR),
+    ttl=int(os.environ.get('SYLLABUS_HOLIDAY_CACHE_TTL', DEFAULT_CACHE_TTL)),
+    stale_while_revalidate=_env_flag('SYLLABUS_HOLIDAY_CACHE_SWR', True)
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def _local_holiday_names(year, filter_name):
+    instrumentation.increment('holiday_local_years')
+    return filter_holiday_names(hebrew_calendar.hebcal_items(year), filter_name)
+
+
+def get_holiday_names(year, filter_name='free_days', source=None):
+    """Get the filtered date -> holiday name mapping for a year from the local calendar or hebcal.com
+
+    source defaults to HOLIDAY_SOURCE. hebcal.com years go through the shared on-disk
+    cache, and a year hebcal.com cannot deliver (nothing cached) is computed locally.
+    """
+    if (source or HOLIDAY_SOURCE) == 'local':
+        return dict(_local_holiday_names(year, filter_name))
+    try:
+        return holiday_cache.get(year, filter_name)
+    except Exception as e:
+        print(f"Warning: Using the local Hebrew calendar for {year}, hebcal.com is unavailable: {e}")
+        return dict(_local_holiday_names(year, filter_name))
+
+
+def get_hebrew_holidays(year, filter_name='free_days', source=None):
+    """Get the filtered Hebrew holiday dates for a year"""
+    return set(get_holiday_names(year, filter_name, source))
+
+
+def cross_check(years, filter_name='free_days'):
+    """Compare the local calendar with hebcal.com for some years
+
+    Returns {year: (dates only hebcal.com has, dates only the local calendar has)}
+    for the years whose filtered holiday dates differ; fetch errors are raised.
+    """
+    differences = {}
+    for year in sorted(set(years)):
+        local = set(get_holiday_names(year, filter_name, 'local'))
+        remote = set(filter_holiday_names(fetch_hebcal_items(year), filter_name))
+        if local != remote:
+            differences[year] = (sorted(remote - local), sorted(local - remote))
+    return differences
+
+
+def load_holiday_names(years, filter_name='free_days', on_error=None, source=None):
+    """Load several years and merge them into one date -> holiday name mapping
+
+    Local years are computed in place; hebcal.com years are fetched concurrently.
+    Years that fail are reported through on_error(year, error) and skipped when a
+    callback is given; otherwise the first failure is raised.
+    """
+    years = sorted(set(years))
+    holiday_names = {}
+    if not years:
+        return holiday_names
+
+    if (source or HOLIDAY_SOURCE) == 'local':
+        with instrumentation.span('holidays'):
+            for year in years:
+                holiday_names.update(_local_holiday_names(year, filter_name))
+        return holiday_names
+
+    with instrumentation.span('holidays'):
+        with ThreadPoolExecutor(max_workers=max(1, min(HOLIDAY_FETCH_WORKERS, len(years)))) as executor:
+            # Fetches run in this context so their counters reach the caller's trace
+            futures = [(year, executor.submit(instrumentation.run_in_context(get_holiday_names), year, filter_name, 'hebcal'))
+                       for year in years]
+
+            # Merge in year order so the result does not depend on completion order
+            for year, future in futures:
+                try:
+                    holiday_names.update(future.result())
+                except Exception as e:
+                    if on_error is None:
+                        raise
+                    on_error(year, e)
+
+    return holiday_names
+
+
+def schedule_years(start_date, working_days, free_days=0):
+    """Estimate the calendar years a schedule of working_days starting at start_date can touch"""
+    # Sunday-Thursday gives 5 working days a week; leave ~45 days of slack per
+    # 200 working days for holidays, plus room for extra free days
+    working_days = max(0, working_days)
+    calendar_days = working_days * 7 // 5 + (working_days // 200 + 1) * 45 + free_days
+    end_date = start_date + timedelta(days=calendar_days)
+    return list(range(start_date.year, end_date.year + 1))
@@ -0,0 +1,176 @@
+import io
+import os
+import time
+import pstats
+import cProfile
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# Help text for the counters exported on /metrics; other names get a generic line
+COUNTER_HELP = {
+    'syllabus_rows': "Syllabus rows read from uploads",
+    'schedule_rows': "Schedule rows produced (lessons and breaks)",
+    'schedule_working_days': "Working days placed on the calendar (lesson and break days)",
+    'holiday_cache_hits': "Holiday years served from the memory or disk cache",
+    'holiday_fetches': "Holiday years fetched from hebcal.com",
+    'holiday_fetch_errors': "Holiday years that could not be fetched",
+    'holiday_local_years': "Holiday years computed by the local Hebrew calendar"
+}
+
+# Trace collecting the spans and counters of the schedule generation running in this context
+_current_trace = contextvars.ContextVar('syllabus_trace', default=None)
+
+
+class Trace:
+    """Timing breakdown and counters of one schedule generation
+
+    spans is a list of [name, depth, seconds] in the order the spans started;
+    profile holds the cProfile report when the trace was started with profiling.
+    """
+
+    def __init__(self):
+        self.spans = []
+        self.counters = {}
+        self.profile = None
+        self.depth = 0
+        self.started_at = time.time()
+        self.seconds = 0.0
+
+    def stage_seconds(self):
+        """Total seconds per span name, in first-seen order"""
+        totals = {}
+        for name, _, seconds in self.spans:
+            totals[name] = totals.get(name, 0.0) + seconds
+        return totals
+
+
+class Metrics:
+    """Process-wide span timings and counters, exported in Prometheus text format.
+
+    Spans are meant for whole stages (parsing, holidays, scheduling, styling),
+    not per-row work, so the lock and two clock reads per span are negligible.
+    """
+
+    def __init__(self, prefix='syllabus'):
+        self.prefix = prefix
+        self._spans = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name):
+        """Time the enclosed block as stage `name`"""
+        trace = _current_trace.get()
+        if trace is not None:
+            entry = [name, trace.depth, 0.0]
+            trace.spans.append(entry)
+            trace.depth += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            with self._lock:
+                count, total, longest = self._spans.get(name, (0, 0.0, 0.0))
+                self._spans[name] = (count + 1, total + seconds, max(longest, seconds))
+            if trace is not None:
+                trace.depth -= 1
+                entry[2] = seconds
+
+    def increment(self, name, value=1):
+        """Add value to counter `name`"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.counters[name] = trace.counters.get(name, 0) + value
+
+    @contextmanager
+    def trace(self, profile=False):
+        """Collect the spans and counters of the enclosed block into a Trace
+
+        Work handed to other threads is included when it is submitted through
+        run_in_context. With profile=True the block runs under cProfile and the
+        top functions by cumulative time are kept in trace.profile.
+        """
+        trace = Trace()
+        token = _current_trace.set(trace)
+        profiler = cProfile.Profile() if profile else None
+        started = time.perf_counter()
+        if profiler is not None:
+            try:
+                profiler.enable()
+            except ValueError:  # another profile is running (one per process)
+                profiler = None
+        try:
+            yield trace
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                report = io.StringIO()
+                pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+                trace.profile = report.getvalue()
+            trace.seconds = time.perf_counter() - started
+            _current_trace.reset(token)
+
+    def snapshot(self):
+        """Return ({stage: (count, total seconds, max seconds)}, {counter: value})"""
+        with self._lock:
+            return dict(self._spans), dict(self._counters)
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+            self._counters.clear()
+
+    def to_prometheus(self):
+        """Render all spans and counters in the Prometheus text exposition format"""
+        spans, counters = self.snapshot()
+        lines = []
+
+        metric = f"{self.prefix}_stage_seconds"
+        lines.append(f"# HELP {metric} Time spent in each schedule generation stage")
+        lines.append(f"# TYPE {metric} summary")
+        for name, (count, total, _) in sorted(spans.items()):
+            lines.append(f'{metric}_count{{stage="{name}"}} {count}')
+            lines.append(f'{metric}_sum{{stage="{name}"}} {total:.6f}')
+
+        metric = f"{self.prefix}_stage_max_seconds"
+        lines.append(f"# HELP {metric} Longest single run of each stage since start")
+        lines.append(f"# TYPE {metric} gauge")
+        for name, (_, _, longest) in sorted(spans.items()):
+            lines.append(f'{metric}{{stage="{name}"}} {longest:.6f}')
+
+        for name, value in sorted(counters.items()):
+            metric = f"{self.prefix}_{name}_total"
+            lines.append(f"# HELP {metric} {COUNTER_HELP.get(name, name.replace('_', ' ').capitalize())}")
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def run_in_context(fn):
+    """Wrap fn so it runs in a copy of the caller's context (and its trace) when called on another thread"""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(fn, *args, **kwargs)
+
+
+def _env_flag(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ['1', 'true', 'yes', 'on']
+
+
+# Functions listed in a cProfile report
+PROFILE_TOP_FUNCTIONS = int(os.environ.get('SYLLABUS_PROFILE_TOP', 25))
+
+# Profile every schedule generation (Flask prints the report; Streamlit shows it in the Performance panel)
+PROFILE_ENABLED = _env_flag('SYLLABUS_PROFILE', False)
+
+metrics = Metrics()
+span = metrics.span
+increment = metrics.increment
+trace = metrics.trace
@@ -0,0 +1,91 @@
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity"""
+
+
+class Job:
+    """A unit of work submitted to the JobQueue and its outcome"""
+
+    def __init__(self, job_id):
+        self.id = job_id
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    def to_dict(self):
+        data = {'job_id': self.id, 'status': self.status}
+        if self.status == 'failed':
+            data['error'] = str(self.error)
+        return data
+
+
+class JobQueue:
+    """Local worker pool for background jobs (threads, no external broker).
+
+    At most max_workers jobs run at once and at most max_pending jobs are
+    queued or running; submitting beyond that raises QueueFullError so bursts
+    are rejected quickly instead of piling up. Finished jobs are kept for
+    job_ttl seconds so clients can collect their results.
+    """
+
+    def __init__(self, max_workers=4, max_pending=64, job_ttl=3600):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.job_ttl = job_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='schedule-job')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs) and return its Job without waiting for it"""
+        self._expire_finished()
+
+        if not self._slots.acquire(blocking=False):
+            raise QueueFullError(f"Too many pending jobs (limit {self.max_pending})")
+
+        job = Job(uuid.uuid4().hex)
+        with self._lock:
+            self._jobs[job.id] = job
+
+        try:
+            self._executor.submit(self._run, job, fn, args, kwargs)
+        except Exception:
+            self._slots.release()
+            with self._lock:
+                del self._jobs[job.id]
+            raise
+        return job
+
+    def get(self, job_id):
+        """Return the Job with this id, or None if it is unknown or expired"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = 'running'
+        try:
+            job.result = fn(*args, **kwargs)
+            job.status = 'done'
+        except Exception as e:
+            job.error = e
+            job.status = 'failed'
+        finally:
+            # Free the slot before the job counts as finished, so its pending place is reusable by then
+            self._slots.release()
+            job.finished_at = time.time()
+
+    def _expire_finished(self):
+        cutoff = time.time() - self.job_ttl
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.finished_at is not None and job.finished_at < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
@@ -0,0 +1,61 @@
+import time
+import secrets
+import threading
+from collections import OrderedDict
+
+
+class ResultStore:
+    """Bounded in-memory LRU store for generated results.
+
+    Entries are addressed by opaque random ids and evicted least recently used
+    first once either max_entries or max_bytes is exceeded; entries older than
+    ttl seconds are dropped as well.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024, ttl=3600):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def put(self, data):
+        """Store bytes and return the id to fetch them with"""
+        if len(data) > self.max_bytes:
+            raise ValueError(f"Result of {len(data)} bytes exceeds the result store limit of {self.max_bytes} bytes")
+
+        result_id = secrets.token_urlsafe(16)
+        with self._lock:
+            self._entries[result_id] = (time.time(), data)
+            self._size += len(data)
+            self._evict()
+        return result_id
+
+    def get(self, result_id):
+        """Return the stored bytes, or None if the id is unknown, evicted or expired"""
+        with self._lock:
+            entry = self._entries.get(result_id)
+            if entry is None:
+                return None
+            if time.time() - entry[0] >= self.ttl:
+                self._remove(result_id)
+                return None
+            self._entries.move_to_end(result_id)
+            return entry[1]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, result_id):
+        _, data = self._entries.pop(result_id)
+        self._size -= len(data)
+
+    def _evict(self):
+        cutoff = time.time() - self.ttl
+        expired = [result_id for result_id, (stored_at, _) in self._entries.items() if stored_at < cutoff]
+        for result_id in expired:
+            self._remove(result_id)
+
+        while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+            self._remove(next(iter(self._entries)))
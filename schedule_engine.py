@@ -0,0 +1,794 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import hebrew_holidays
+import instrumentation
+from work_calendar import FreeDays, WorkingCalendar, to_date, to_datetime64
+
+SCHEDULE_COLUMNS = ['Main Topic', 'Subtopic', 'Start Date', 'End Date', 'Duration (Days)']
+DATE_COLUMNS = ['Start Date', 'End Date']
+DATE_FORMAT = '%Y-%m-%d'
+
+# Subtopic of the break rows the engine inserts after each main topic
+BREAK_SUBTOPIC = 'Break Period'
+
+# Typed row classification carried next to the exported columns; consumers
+# filter on Kind instead of matching 'Break' in topic names
+ROW_KINDS = ['lesson', 'break', 'exam', 'holiday']
+KIND_DTYPE = pd.CategoricalDtype(ROW_KINDS)
+KIND_COLUMNS = ['Kind', 'Topic Id']
+SCHEDULE_FRAME_COLUMNS = SCHEDULE_COLUMNS + KIND_COLUMNS
+
+# Main topics whose names contain one of these are exams (case insensitive)
+EXAM_KEYWORDS = ('exam', 'milestone')
+
+# Exams sit this many working days after their topic's last lesson (1 = the next working day)
+EXAM_OFFSET_DAYS = int(os.environ.get('SYLLABUS_EXAM_OFFSET_DAYS', 1))
+
+
+def _days_array(syllabus_df):
+    """Whole days per row as int64; raises ValueError naming the first row whose Days is not a number"""
+    days_values = pd.to_numeric(syllabus_df['Days'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+
+    invalid = np.isnan(days_values)
+    if invalid.any():
+        subtopic = syllabus_df['Subtopic'].iloc[int(np.argmax(invalid))]
+        raise ValueError(f"Invalid value in 'Days' column for subtopic '{subtopic}'. Please ensure all days values are numbers.")
+
+    return np.trunc(days_values).astype(np.int64)
+
+
+def working_day_offsets(syllabus_df, add_break, break_days):
+    """Compute each row's working-day consumption and its cumulative offset from the course start
+
+    Returns (days, lesson_days, row_break_days, offsets, is_new_topic), one entry per row,
+    where offsets[i] is the number of working days consumed before row i.
+    """
+    main_topics = syllabus_df['Main Topic']
+    days = _days_array(syllabus_df)
+    lesson_days = np.maximum(days, 0)
+
+    # First and last occurrence of each main topic; a break follows the last one
+    is_new_topic = (~main_topics.duplicated(keep='first')).to_numpy()
+    row_break_days = np.zeros(len(days), dtype=np.int64)
+    if add_break and break_days > 0:
+        row_break_days[(~main_topics.duplicated(keep='last')).to_numpy()] = break_days
+
+    consumed = lesson_days + row_break_days
+    offsets = np.cumsum(consumed) - consumed
+
+    return days, lesson_days, row_break_days, offsets, is_new_topic
+
+
+def is_exam_topic(topic):
+    """Whether a main topic is an exam or milestone"""
+    topic = str(topic).lower()
+    return any(keyword in topic for keyword in EXAM_KEYWORDS)
+
+
+def topic_codes(main_topics, topics=None):
+    """Topic Id per row and whether each row belongs to an exam topic
+
+    Main topics are numbered in order of first appearance, or by their position
+    in `topics` when the full list of topics is known up front (streaming).
+    """
+    if topics is None:
+        topic_ids, topics = pd.factorize(np.asarray(main_topics, dtype=object))
+    else:
+        topics = pd.Index(topics)
+        topic_ids = topics.get_indexer(np.asarray(main_topics, dtype=object))
+
+    # Rows without a topic (-1) pick up the trailing False
+    exam_topics = np.array([is_exam_topic(topic) for topic in topics] + [False], dtype=bool)
+    return topic_ids.astype(np.int64), exam_topics[topic_ids]
+
+
+def _row_dates(lesson_days, row_break_days, is_new_topic, cursor, working_calendar):
+    """Lay out the dates of a run of syllabus rows starting at a calendar cursor
+
+    cursor is a datetime64 date or a column of them (shape (cohorts, 1)); every
+    date array then gets a leading cohort axis. Returns (lesson_position,
+    break_index, break_position, start_column, end_column, checkpoints, extents):
+    output positions of each row and break, the output Start/End dates, the
+    cursor after each row and its break, and the last date each row looked at.
+    """
+    consumed = lesson_days + row_break_days
+    offsets = np.cumsum(consumed) - consumed
+
+    def working_day(offset):
+        return working_calendar.offset(cursor, offset)
+
+    # A new topic starts on the next working day. A continuing subtopic starts the
+    # calendar day after the previous allocation, unless nothing was consumed since
+    # the topic start rolled the cursor forward. A run resumed mid-topic starts a
+    # continuing subtopic on the cursor itself until something is consumed.
+    row_index = np.arange(len(lesson_days))
+    last_topic_row = np.maximum.accumulate(np.where(is_new_topic, row_index, -1))
+    has_topic_row = last_topic_row >= 0
+    rolled = has_topic_row & (offsets[np.maximum(last_topic_row, 0)] == offsets)
+    lesson_start = np.where(
+        rolled,
+        working_day(offsets),
+        working_day(np.maximum(offsets - 1, 0)) + np.timedelta64(1, 'D')
+    )
+    lesson_start = np.where(~has_topic_row & (offsets == 0), cursor, lesson_start)
+    has_days = lesson_days > 0
+    lesson_end = np.where(has_days, working_day(offsets + np.maximum(lesson_days - 1, 0)), lesson_start)
+
+    # Interleave each break right after the lesson row that closes its topic
+    has_break = row_break_days > 0
+    break_index = np.flatnonzero(has_break)
+    lesson_position = row_index + np.cumsum(has_break) - has_break
+    break_position = lesson_position[break_index] + 1
+    total_rows = len(lesson_days) + len(break_index)
+
+    break_offsets = offsets[break_index] + lesson_days[break_index]
+    break_start = working_day(break_offsets)
+    break_end = working_day(break_offsets + row_break_days[break_index] - 1)
+
+    # Checkpoints: where the cursor stands after each row and its break
+    extents = lesson_end.copy()
+    extents[..., break_index] = break_end
+    checkpoints = np.where(has_days, lesson_end + np.timedelta64(1, 'D'), lesson_start)
+    checkpoints[..., break_index] = break_end + np.timedelta64(1, 'D')
+
+    date_shape = lesson_start.shape[:-1] + (total_rows,)
+    start_column = np.empty(date_shape, dtype='datetime64[D]')
+    start_column[..., lesson_position] = lesson_start
+    start_column[..., break_position] = break_start
+
+    end_column = np.empty(date_shape, dtype='datetime64[D]')
+    end_column[..., lesson_position] = lesson_end
+    end_column[..., break_position] = break_end
+
+    return lesson_position, break_index, break_position, start_column, end_column, checkpoints, extents
+
+
+def _label_columns(main_topics, subtopics, days, row_break_days, topic_ids, is_exam,
+                   lesson_position, break_index, break_position):
+    """Main Topic, Subtopic, Duration, Kind and Topic Id output columns with break rows interleaved"""
+    total_rows = len(days) + len(break_index)
+
+    main_topic_column = np.empty(total_rows, dtype=object)
+    main_topic_column[lesson_position] = main_topics
+    main_topic_column[break_position] = [f"{topic} - Break" for topic in main_topics[break_index]]
+
+    subtopic_column = np.empty(total_rows, dtype=object)
+    subtopic_column[lesson_position] = subtopics
+    subtopic_column[break_position] = BREAK_SUBTOPIC
+
+    duration_column = np.empty(total_rows, dtype=np.int64)
+    duration_column[lesson_position] = days
+    duration_column[break_position] = row_break_days[break_index]
+
+    kind_codes = np.empty(total_rows, dtype=np.int8)
+    kind_codes[lesson_position] = np.where(is_exam, ROW_KINDS.index('exam'), ROW_KINDS.index('lesson'))
+    kind_codes[break_position] = ROW_KINDS.index('break')
+    kind_column = pd.Categorical.from_codes(kind_codes, dtype=KIND_DTYPE)
+
+    # A break keeps the Topic Id of the topic it closes
+    topic_id_column = np.empty(total_rows, dtype=np.int64)
+    topic_id_column[lesson_position] = topic_ids
+    topic_id_column[break_position] = topic_ids[break_index]
+
+    return main_topic_column, subtopic_column, duration_column, kind_column, topic_id_column
+
+
+def _schedule_rows(main_topics, subtopics, days, lesson_days, row_break_days, is_new_topic, topic_ids, is_exam,
+                   cursor, working_calendar):
+    """Lay out a run of syllabus rows starting at a calendar cursor
+
+    Returns (schedule_df, lesson_position, checkpoints, extents): the output frame,
+    each input row's position in it, the cursor date after each row and its break,
+    and the last date each row (with its break) looked at.
+    """
+    lesson_position, break_index, break_position, start_column, end_column, checkpoints, extents = _row_dates(
+        lesson_days, row_break_days, is_new_topic, cursor, working_calendar
+    )
+    main_topic_column, subtopic_column, duration_column, kind_column, topic_id_column = _label_columns(
+        main_topics, subtopics, days, row_break_days, topic_ids, is_exam, lesson_position, break_index, break_position
+    )
+
+    schedule_df = pd.DataFrame({
+        'Main Topic': main_topic_column,
+        'Subtopic': subtopic_column,
+        'Start Date': start_column,
+        'End Date': end_column,
+        'Duration (Days)': duration_column,
+        'Kind': kind_column,
+        'Topic Id': topic_id_column
+    })
+    return schedule_df, lesson_position, checkpoints, extents
+
+
+def build_schedule(syllabus_df, start_date, add_break, break_days, working_calendar):
+    """Compute the course schedule in CSV order with vectorized working-day arithmetic
+
+    Every row consumes a run of consecutive working days, so the n-th working day
+    of the course is the calendar's n-th working day on or after start_date and
+    all dates come from a single working-day offset call over cumulative offsets.
+    Start Date / End Date are returned as datetime64 columns, followed by the
+    Kind and Topic Id columns.
+    """
+    if syllabus_df.empty:
+        return pd.DataFrame(columns=SCHEDULE_FRAME_COLUMNS)
+
+    days, lesson_days, row_break_days, _, is_new_topic = working_day_offsets(
+        syllabus_df, add_break, break_days
+    )
+    main_topics = syllabus_df['Main Topic'].to_numpy(dtype=object)
+    topic_ids, is_exam = topic_codes(main_topics)
+    schedule_df, _, _, _ = _schedule_rows(
+        main_topics, syllabus_df['Subtopic'].to_numpy(dtype=object),
+        days, lesson_days, row_break_days, is_new_topic, topic_ids, is_exam,
+        to_datetime64(start_date), working_calendar
+    )
+    return schedule_df
+
+
+class IncrementalScheduler:
+    """Schedule builder that keeps per-row checkpoints of its previous result.
+
+    Nothing before the first affected row can change, so a rebuild after a
+    parameter, holiday or row edit resumes from the checkpoint in front of that
+    row and reuses the earlier part of the previous schedule. Drop-in for
+    build_schedule; one instance per interactive session.
+    """
+
+    def __init__(self):
+        self._state = None
+        self.resumed_from = None
+
+    def build(self, syllabus_df, start_date, add_break, break_days, working_calendar):
+        """Same result as build_schedule, recomputing only from the earliest affected row"""
+        if syllabus_df.empty:
+            self._state = None
+            return pd.DataFrame(columns=SCHEDULE_FRAME_COLUMNS)
+
+        days, lesson_days, row_break_days, _, is_new_topic = working_day_offsets(
+            syllabus_df, add_break, break_days
+        )
+        main_topics = syllabus_df['Main Topic'].to_numpy(dtype=object)
+        topic_ids, is_exam = topic_codes(main_topics)
+        rows = {
+            'main_topics': main_topics,
+            'subtopics': syllabus_df['Subtopic'].to_numpy(dtype=object),
+            'days': days,
+            'lesson_days': lesson_days,
+            'row_break_days': row_break_days,
+            'is_new_topic': is_new_topic,
+            'topic_ids': topic_ids,
+            'is_exam': is_exam
+        }
+        start = to_datetime64(start_date)
+
+        resume_row = self._first_affected_row(rows, start, working_calendar)
+        self.resumed_from = resume_row
+
+        state = self._state
+        if resume_row == 0:
+            cursor = start
+        else:
+            cursor = state['checkpoints'][resume_row - 1]
+
+        if resume_row < len(days):
+            suffix = {key: values[resume_row:] for key, values in rows.items()}
+            suffix_df, suffix_position, suffix_checkpoints, suffix_extents = _schedule_rows(
+                **suffix, cursor=cursor, working_calendar=working_calendar
+            )
+        else:
+            suffix_df = pd.DataFrame(columns=SCHEDULE_FRAME_COLUMNS)
+            suffix_position = np.empty(0, dtype=np.int64)
+            suffix_checkpoints = suffix_extents = np.empty(0, dtype='datetime64[D]')
+
+        if resume_row == 0:
+            schedule_df = suffix_df
+            lesson_position, checkpoints, extents = suffix_position, suffix_checkpoints, suffix_extents
+        else:
+            # Reuse everything the previous schedule produced before the resumed row
+            prefix_rows = state['lesson_position'][resume_row - 1] + 1 + int(state['rows']['row_break_days'][resume_row - 1] > 0)
+            schedule_df = state['schedule_df'].iloc[:prefix_rows]
+            if len(suffix_df):
+                schedule_df = pd.concat([schedule_df, suffix_df], ignore_index=True)
+            lesson_position = np.concatenate([state['lesson_position'][:resume_row], suffix_position + prefix_rows])
+            checkpoints = np.concatenate([state['checkpoints'][:resume_row], suffix_checkpoints])
+            extents = np.concatenate([state['extents'][:resume_row], suffix_extents])
+
+        self._state = {
+            'rows': rows,
+            'start': start,
+            'holidays': working_calendar.holidays,
+            'free_days': working_calendar.free_days,
+            'schedule_df': schedule_df,
+            'lesson_position': lesson_position.astype(np.int64),
+            'checkpoints': checkpoints.astype('datetime64[D]'),
+            'extents': extents.astype('datetime64[D]')
+        }
+        return schedule_df.copy()
+
+    def _first_affected_row(self, rows, start, working_calendar):
+        """Index of the first row whose dates may differ from the previous result"""
+        state = self._state
+        if state is None or state['start'] != start:
+            return 0
+
+        previous = state['rows']
+        common = min(len(rows['days']), len(previous['days']))
+        first_row = common
+        for key, values in rows.items():
+            changed = np.flatnonzero(values[:common] != previous[key][:common])
+            if len(changed):
+                first_row = min(first_row, int(changed[0]))
+        if first_row == common and len(rows['days']) == len(previous['days']):
+            first_row = len(rows['days'])
+
+        # A holiday or free day only moves rows that reach its date
+        changed_days = []
+        changed_holidays = working_calendar.holidays.symmetric_difference(state['holidays'])
+        if changed_holidays:
+            changed_days.append(min(changed_holidays))
+        changed_free_day = working_calendar.free_days.first_difference(state['free_days'])
+        if changed_free_day is not None:
+            changed_days.append(changed_free_day)
+        if changed_days:
+            earliest = to_datetime64(min(changed_days))
+            first_row = min(first_row, int(np.searchsorted(state['extents'], earliest, side='left')))
+
+        return first_row
+
+
+def schedule_with_holidays(syllabus_df, start_date, add_break, break_days, load_holidays=None, free_days=(),
+                           scheduler=None):
+    """Build a schedule, loading holidays for every year it spans
+
+    load_holidays(years) returns the holiday dates for those years (None to skip
+    holidays). The span is estimated up front so all years can be fetched
+    concurrently; a schedule that runs past the estimate loads the missing years
+    and is computed again. Pass an IncrementalScheduler to reuse the unchanged
+    part of its previous schedule.
+    """
+    build = scheduler.build if scheduler is not None else build_schedule
+    free_days = FreeDays.coerce(free_days)
+
+    total_days = int(pd.to_numeric(syllabus_df['Days'], errors='coerce').sum())
+    if add_break and break_days > 0:
+        total_days += break_days * syllabus_df['Main Topic'].nunique()
+    years = hebrew_holidays.schedule_years(start_date, total_days, len(free_days))
+
+    holidays = set()
+    loaded_years = set()
+    with instrumentation.span('schedule'):
+        while True:
+            if load_holidays is not None:
+                missing_years = [year for year in years if year not in loaded_years]
+                holidays.update(load_holidays(missing_years))
+                loaded_years.update(missing_years)
+
+            # Build the working-day calendar once per pass
+            with instrumentation.span('build_schedule'):
+                schedule_df = build(syllabus_df, start_date, add_break, break_days, WorkingCalendar(holidays, free_days))
+            if load_holidays is None or schedule_df.empty:
+                break
+
+            end_year = schedule_df['End Date'].max().year
+            if end_year <= years[-1]:
+                break
+            years = list(range(start_date.year, end_year + 1))
+
+    count_schedule(schedule_df)
+    return schedule_df
+
+
+def count_schedule(schedule_df):
+    """Add a generated schedule to the schedule_rows and schedule_working_days counters"""
+    instrumentation.increment('schedule_rows', len(schedule_df))
+    if len(schedule_df):
+        instrumentation.increment('schedule_working_days', int(schedule_df['Duration (Days)'].sum()))
+
+
+def _cohort_free_days(value):
+    """Normalize a cohort's additional free days (FreeDays, iterable of dates and (start, end) ranges, or empty)"""
+    if isinstance(value, FreeDays):
+        return value
+    if isinstance(value, (set, frozenset, list, tuple, np.ndarray, pd.Series)) and len(value):
+        return FreeDays(
+            tuple(pd.to_datetime(list(item)).date) if isinstance(item, (tuple, list)) else pd.Timestamp(item).date()
+            for item in value
+        )
+    return FreeDays()
+
+
+def schedule_cohorts(syllabus_df, cohorts_df, add_break=False, break_days=2, load_holidays=None):
+    """Schedule one syllabus for many cohorts against a shared holiday calendar
+
+    cohorts_df has a 'Start Date' column and optional 'Cohort', 'Additional Free
+    Days' (FreeDays, or an iterable of dates and (start, end) ranges per cohort), 'Add Break' and 'Break Days' columns;
+    missing break settings fall back to add_break / break_days. Holidays are
+    loaded once for all cohorts and each cohort's free days are an overlay on that
+    base calendar. Cohorts sharing break settings and free days are laid out in a
+    single broadcast pass. Returns one long-format frame with a leading Cohort
+    column, cohorts in input order.
+    """
+    if syllabus_df.empty or cohorts_df.empty:
+        return pd.DataFrame(columns=['Cohort'] + SCHEDULE_FRAME_COLUMNS)
+
+    count = len(cohorts_df)
+    names = cohorts_df['Cohort'].tolist() if 'Cohort' in cohorts_df else [f"Cohort {i + 1}" for i in range(count)]
+    starts = [pd.Timestamp(value).date() for value in cohorts_df['Start Date']]
+    free_days = [_cohort_free_days(value) for value in cohorts_df.get('Additional Free Days', [None] * count)]
+    add_breaks = [bool(value) for value in cohorts_df.get('Add Break', [add_break] * count)]
+    break_lengths = [int(value) for value in cohorts_df.get('Break Days', [break_days] * count)]
+
+    # Cohorts that share break settings and free days share one layout pass
+    groups = {}
+    for position, key in enumerate(zip(add_breaks, break_lengths, free_days)):
+        groups.setdefault(key, []).append(position)
+
+    total_days = int(pd.to_numeric(syllabus_df['Days'], errors='coerce').sum())
+    used_breaks = [length for flag, length in zip(add_breaks, break_lengths) if flag and length > 0]
+    if used_breaks:
+        total_days += max(used_breaks) * syllabus_df['Main Topic'].nunique()
+    first_year = min(starts).year
+    years = list(range(first_year, hebrew_holidays.schedule_years(
+        max(starts), total_days, max(map(len, free_days))
+    )[-1] + 1))
+
+    main_topics = syllabus_df['Main Topic'].to_numpy(dtype=object)
+    subtopics = syllabus_df['Subtopic'].to_numpy(dtype=object)
+    topic_ids, is_exam = topic_codes(main_topics)
+
+    # Row layout depends only on the break settings
+    layouts = {}
+    for flag, length, _ in groups:
+        if (flag, length) not in layouts:
+            days, lesson_days, row_break_days, _, is_new_topic = working_day_offsets(syllabus_df, flag, length)
+            layouts[(flag, length)] = (days, lesson_days, row_break_days, is_new_topic)
+
+    base_holidays = set()
+    loaded_years = set()
+    while True:
+        if load_holidays is not None:
+            missing_years = [year for year in years if year not in loaded_years]
+            base_holidays.update(load_holidays(missing_years))
+            loaded_years.update(missing_years)
+
+        base_calendar = WorkingCalendar(base_holidays)
+        frames = []
+        for (flag, length, extra_days), positions in groups.items():
+            days, lesson_days, row_break_days, is_new_topic = layouts[(flag, length)]
+            working_calendar = WorkingCalendar(base_holidays, extra_days) if extra_days else base_calendar
+
+            cursor = np.array([starts[position] for position in positions], dtype='datetime64[D]')[:, None]
+            lesson_position, break_index, break_position, start_column, end_column, _, _ = _row_dates(
+                lesson_days, row_break_days, is_new_topic, cursor, working_calendar
+            )
+            main_topic_column, subtopic_column, duration_column, kind_column, topic_id_column = _label_columns(
+                main_topics, subtopics, days, row_break_days, topic_ids, is_exam,
+                lesson_position, break_index, break_position
+            )
+
+            rows_per_cohort = start_column.shape[1]
+            frames.append(pd.DataFrame({
+                'position': np.repeat(positions, rows_per_cohort),
+                'Cohort': np.repeat(np.array([names[position] for position in positions], dtype=object), rows_per_cohort),
+                'Main Topic': np.tile(main_topic_column, len(positions)),
+                'Subtopic': np.tile(subtopic_column, len(positions)),
+                'Start Date': start_column.ravel(),
+                'End Date': end_column.ravel(),
+                'Duration (Days)': np.tile(duration_column, len(positions)),
+                'Kind': pd.Categorical.from_codes(np.tile(kind_column.codes, len(positions)), dtype=KIND_DTYPE),
+                'Topic Id': np.tile(topic_id_column, len(positions))
+            }))
+
+        cohorts_schedule = pd.concat(frames, ignore_index=True)
+        if load_holidays is None:
+            break
+        end_year = cohorts_schedule['End Date'].max().year
+        if end_year <= years[-1]:
+            break
+        years = list(range(first_year, end_year + 1))
+
+    cohorts_schedule = cohorts_schedule.sort_values('position', kind='stable', ignore_index=True)
+    return cohorts_schedule.drop(columns='position')
+
+
+SWEEP_RANKINGS = {
+    'earliest_finish': ['End Date', 'Holiday Days'],
+    'fewest_holidays': ['Holiday Days', 'End Date'],
+    'shortest': ['Calendar Days', 'Holiday Days']
+}
+
+
+def evaluate_start_dates(syllabus_df, candidate_starts, add_break, break_days, working_calendar):
+    """Evaluate many candidate start dates against one working-day calendar
+
+    A schedule only depends on its start through the first working day, so the
+    row offsets are computed once and every candidate's dates come from one
+    broadcast working-day offset call. Returns one row per candidate with the first
+    lesson, end date, calendar length, holidays in the period and first break.
+    """
+    candidates = np.unique(np.array(candidate_starts, dtype='datetime64[D]'))
+    if syllabus_df.empty or not len(candidates):
+        return pd.DataFrame(columns=['Start Date', 'First Lesson', 'End Date', 'Calendar Days',
+                                     'Holiday Days', 'First Break'])
+
+    days, lesson_days, row_break_days, offsets, is_new_topic = working_day_offsets(
+        syllabus_df, add_break, break_days
+    )
+
+    def working_day(offset):
+        return working_calendar.offset(candidates, offset)
+
+    first_lesson = working_day(0)
+
+    # The schedule ends on the last working day consumed; a trailing zero-day row
+    # ends where it starts instead
+    total = int(offsets[-1] + lesson_days[-1] + row_break_days[-1])
+    if total > offsets[-1]:
+        end_date = working_day(total - 1)
+    else:
+        last_topic_row = np.flatnonzero(is_new_topic)[-1]
+        if offsets[last_topic_row] == offsets[-1]:
+            end_date = working_day(offsets[-1])
+        else:
+            end_date = working_day(offsets[-1] - 1) + np.timedelta64(1, 'D')
+
+    # Holidays and free days falling anywhere between the first lesson and the end date
+    holiday_days = working_calendar.count_closed_days(first_lesson, end_date)
+
+    break_index = np.flatnonzero(row_break_days > 0)
+    if len(break_index):
+        first_break = working_day(offsets[break_index[0]] + lesson_days[break_index[0]])
+    else:
+        first_break = np.full(len(candidates), np.datetime64('NaT'), dtype='datetime64[D]')
+
+    return pd.DataFrame({
+        'Start Date': candidates,
+        'First Lesson': first_lesson,
+        'End Date': end_date,
+        'Calendar Days': (end_date - first_lesson).astype(np.int64) + 1,
+        'Holiday Days': holiday_days.astype(np.int64),
+        'First Break': first_break
+    })
+
+
+def sweep_start_dates(syllabus_df, candidate_starts, add_break, break_days, load_holidays=None, free_days=(),
+                      rank_by='earliest_finish'):
+    """Rank candidate start dates, loading holidays for every year the candidates span
+
+    rank_by is one of SWEEP_RANKINGS; ties fall back to the earlier start date.
+    Returns the evaluate_start_dates table sorted best first with a Rank column.
+    """
+    if rank_by not in SWEEP_RANKINGS:
+        raise ValueError(f"Unknown ranking '{rank_by}'. Choose one of: {', '.join(SWEEP_RANKINGS)}")
+
+    candidate_starts = sorted(set(candidate_starts))
+    if not candidate_starts:
+        raise ValueError("No candidate start dates to compare")
+    free_days = FreeDays.coerce(free_days)
+
+    total_days = int(pd.to_numeric(syllabus_df['Days'], errors='coerce').sum())
+    if add_break and break_days > 0:
+        total_days += break_days * syllabus_df['Main Topic'].nunique()
+    first_year = candidate_starts[0].year
+    years = list(range(first_year, hebrew_holidays.schedule_years(candidate_starts[-1], total_days, len(free_days))[-1] + 1))
+
+    holidays = set()
+    loaded_years = set()
+    while True:
+        if load_holidays is not None:
+            missing_years = [year for year in years if year not in loaded_years]
+            holidays.update(load_holidays(missing_years))
+            loaded_years.update(missing_years)
+
+        sweep_df = evaluate_start_dates(syllabus_df, candidate_starts, add_break, break_days, WorkingCalendar(holidays, free_days))
+        if load_holidays is None or sweep_df.empty:
+            break
+
+        end_year = sweep_df['End Date'].max().year
+        if end_year <= years[-1]:
+            break
+        years = list(range(first_year, end_year + 1))
+
+    sweep_df = sweep_df.sort_values(SWEEP_RANKINGS[rank_by] + ['Start Date'], kind='stable', ignore_index=True)
+    sweep_df.insert(0, 'Rank', np.arange(1, len(sweep_df) + 1))
+    return sweep_df
+
+
+class SyllabusScan:
+    """What a streamed schedule needs from a first pass over the syllabus.
+
+    Holds the global row index of each main topic's last occurrence (where its
+    break goes), keyed in order of first appearance, the row count and total lesson days, and whether the rows are
+    already sorted by Main Topic. Memory grows with the number of topics, not rows.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.lesson_days = 0
+        self.last_rows = {}
+        self.sorted_by_topic = True
+        self._last_topic = None
+
+    def add(self, chunk):
+        """Account for the next chunk of syllabus rows"""
+        days = _days_array(chunk)
+        main_topics = chunk['Main Topic'].to_numpy(dtype=object)
+
+        # New topics are added in order of first appearance, which numbers them (Topic Id)
+        self.last_rows.update((topic, None) for topic in pd.unique(main_topics) if topic not in self.last_rows)
+        row_numbers = pd.Series(self.rows + np.arange(len(chunk)), index=main_topics)
+        self.last_rows.update(row_numbers[~row_numbers.index.duplicated(keep='last')].to_dict())
+
+        if self.sorted_by_topic and len(chunk):
+            topics = main_topics if self._last_topic is None else np.concatenate([[self._last_topic], main_topics])
+            try:
+                self.sorted_by_topic = bool((topics[:-1] <= topics[1:]).all())
+            except TypeError:
+                self.sorted_by_topic = False
+            self._last_topic = main_topics[-1]
+
+        self.rows += len(chunk)
+        self.lesson_days += int(np.maximum(days, 0).sum())
+
+
+def scan_syllabus(chunks):
+    """First pass of a streamed schedule: scan an iterable of syllabus chunks"""
+    scan = SyllabusScan()
+    for chunk in chunks:
+        scan.add(chunk)
+    return scan
+
+
+def stream_schedule(chunks, scan, start_date, add_break, break_days, load_holidays=None, free_days=()):
+    """Second pass: yield the schedule chunk by chunk, in syllabus order
+
+    chunks must yield the same rows the scan saw, without rows missing a Main
+    Topic. Only the date cursor, the set of topics already started and the scan
+    are carried from one chunk to the next, so memory stays flat in the number
+    of rows. Holiday years are loaded as the schedule reaches them.
+    """
+    total_days = scan.lesson_days
+    if add_break and break_days > 0:
+        total_days += break_days * len(scan.last_rows)
+    free_days = FreeDays.coerce(free_days)
+    years = hebrew_holidays.schedule_years(start_date, total_days, len(free_days))
+
+    holidays = set()
+    loaded_years = set()
+
+    def calendar_for(years):
+        if load_holidays is not None:
+            missing_years = [year for year in years if year not in loaded_years]
+            if missing_years:
+                holidays.update(load_holidays(missing_years))
+                loaded_years.update(missing_years)
+        return WorkingCalendar(holidays, free_days)
+
+    working_calendar = calendar_for(years)
+    cursor = to_datetime64(start_date)
+    topics = list(scan.last_rows)
+    started_topics = set()
+    first_row = 0
+
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        days = _days_array(chunk)
+        main_topics = chunk['Main Topic'].to_numpy(dtype=object)
+
+        first_in_chunk = ~pd.Series(main_topics).duplicated(keep='first').to_numpy()
+        is_new_topic = first_in_chunk & ~pd.Series(main_topics).isin(started_topics).to_numpy()
+        started_topics.update(main_topics[first_in_chunk])
+        topic_ids, is_exam = topic_codes(main_topics, topics)
+
+        row_break_days = np.zeros(len(days), dtype=np.int64)
+        if add_break and break_days > 0:
+            row_numbers = first_row + np.arange(len(days))
+            last_rows = np.array([scan.last_rows[topic] for topic in main_topics])
+            row_break_days[last_rows == row_numbers] = break_days
+
+        # A chunk that runs past the loaded years is laid out again once they are loaded
+        while True:
+            chunk_df, _, checkpoints, extents = _schedule_rows(
+                main_topics, chunk['Subtopic'].to_numpy(dtype=object), days, np.maximum(days, 0),
+                row_break_days, is_new_topic, topic_ids, is_exam, cursor, working_calendar
+            )
+            end_year = to_date(extents.max()).year
+            if load_holidays is None or end_year <= years[-1]:
+                break
+            years = list(range(start_date.year, end_year + 1))
+            working_calendar = calendar_for(years)
+
+        cursor = checkpoints[-1]
+        first_row += len(days)
+        count_schedule(chunk_df)
+        yield chunk_df
+
+
+def stream_schedule_csv(chunks, scan, start_date, add_break, break_days, load_holidays=None, free_days=()):
+    """Yield the streamed schedule as CSV text, header first"""
+    yield ','.join(SCHEDULE_COLUMNS) + '\n'
+    for chunk_df in stream_schedule(chunks, scan, start_date, add_break, break_days, load_holidays, free_days):
+        yield chunk_df.to_csv(index=False, header=False, columns=SCHEDULE_COLUMNS, date_format=DATE_FORMAT)
+
+
+def exam_topic_ends(schedule_df):
+    """Main Topic and last End Date of every exam topic, in order of first appearance
+
+    One groupby over the exam rows instead of a filter per topic.
+    """
+    if schedule_df.empty:
+        return pd.DataFrame({'Main Topic': pd.Series(dtype=object), 'End Date': pd.Series(dtype='datetime64[s]')})
+    exam_rows = schedule_df.loc[kind_mask(schedule_df, 'exam'), ['Topic Id', 'Main Topic', 'End Date']]
+    return exam_rows.groupby('Topic Id', sort=True).last().reset_index(drop=True)
+
+
+def exam_dates(topics_df, working_calendar, offset_days=EXAM_OFFSET_DAYS):
+    """Place exams offset_days working days after their topic ends (exam_topic_ends rows)
+
+    All exams come from a single working-day offset call on the same calendar
+    the schedule was built with. Returns Main Topic and Exam Date columns.
+    """
+    day_after = topics_df['End Date'].to_numpy(dtype='datetime64[D]') + np.timedelta64(1, 'D')
+    return pd.DataFrame({
+        'Main Topic': topics_df['Main Topic'].to_numpy(dtype=object),
+        'Exam Date': working_calendar.offset(day_after, max(offset_days, 1) - 1) if len(day_after) else day_after
+    })
+
+
+def schedule_exam_dates(schedule_df, load_holidays=None, free_days=(), offset_days=EXAM_OFFSET_DAYS):
+    """Place the exams of a schedule, loading holidays for the years they span
+
+    Same calendar as schedule_with_holidays: weekends, the loaded holidays and
+    the additional free days are skipped. An exam pushed into a later year
+    loads that year and is placed again.
+    """
+    topics_df = exam_topic_ends(schedule_df)
+    free_days = FreeDays.coerce(free_days)
+    if topics_df.empty:
+        return exam_dates(topics_df, WorkingCalendar(), offset_days)
+
+    first_year = topics_df['End Date'].min().year
+    years = list(range(first_year, topics_df['End Date'].max().year + 1))
+    holidays = set()
+    loaded_years = set()
+    while True:
+        if load_holidays is not None:
+            missing_years = [year for year in years if year not in loaded_years]
+            holidays.update(load_holidays(missing_years))
+            loaded_years.update(missing_years)
+
+        exams_df = exam_dates(topics_df, WorkingCalendar(holidays, free_days), offset_days)
+        end_year = exams_df['Exam Date'].max().year
+        if load_holidays is None or end_year <= years[-1]:
+            break
+        years = list(range(first_year, end_year + 1))
+
+    return exams_df
+
+
+def kind_mask(schedule_df, kind):
+    """Boolean array flagging the schedule rows of one Kind ('lesson', 'break', 'exam' or 'holiday')"""
+    return (schedule_df['Kind'].cat.codes == ROW_KINDS.index(kind)).to_numpy()
+
+
+def break_mask(schedule_df):
+    """Boolean array flagging the break rows of a schedule"""
+    return kind_mask(schedule_df, 'break')
+
+
+def format_schedule_dates(schedule_df):
+    """Return a copy of the schedule with Start Date / End Date formatted as YYYY-MM-DD strings"""
+    formatted = schedule_df.copy()
+    for column in DATE_COLUMNS:
+        formatted[column] = formatted[column].dt.strftime(DATE_FORMAT)
+    return formatted
+
+
+def schedule_to_csv(schedule_df, path_or_buffer=None):
+    """Export the schedule as CSV without the Kind / Topic Id columns, formatting dates only at this point"""
+    columns = [column for column in schedule_df.columns if column not in KIND_COLUMNS]
+    return schedule_df.to_csv(path_or_buffer, index=False, columns=columns, date_format=DATE_FORMAT)
@@ -1,12 +1,34 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-import requests
-import re
 from datetime import datetime, timedelta
 import calendar
 import tempfile
 import json
-import io
+import hashlib
+
+import hebrew_holidays
+import instrumentation
+import schedule_engine
+import syllabus_io
+from work_calendar import FreeDays, to_datetime64
+
+# Bounds for the st.cache_data memoization of parsing, holidays, schedules and summaries
+CACHE_TTL = 60 * 60  # 1 hour
+CACHE_MAX_ENTRIES = 32
+
+# Page sizes offered by the schedule table; every page is styled with topic colors
+SCHEDULE_PAGE_SIZES = [25, 50, 100, 250, 500, 1000]
+
+# Exam dates are shown as metric cards up to this many, as a table beyond
+EXAM_METRICS_MAX = 8
+
+# Rankings offered by the start date comparison
+SWEEP_RANK_LABELS = {
+    'earliest_finish': "Earliest finish",
+    'fewest_holidays': "Fewest holiday interruptions",
+    'shortest': "Shortest calendar span"
+}
 
 # Page configuration
 st.set_page_config(
@@ -508,312 +530,93 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def get_hebrew_holidays(year):
-    """Fetch Hebrew holidays from hebcal.com API - only free days and Erev holidays that are free days"""
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _cached_holiday_names(years):
+    # Raises when any year fails, so failures are never cached
+    return hebrew_holidays.load_holiday_names(years, 'free_days')
 
+def load_holiday_names(years):
+    """Fetch Hebrew holiday names for several years concurrently"""
     try:
-        url = "https://www.hebcal.com/hebcal"
-        params = {
-            'v': 1,
-            'cfg': 'json',
-            'maj': 'on',
-            'mod': 'on',
-            'nh': 'on',
-            'd': 'on',
-            'lg': 's',
-            'year': year,
-            'start': f"{year}-01-01",
-            'end': f"{year}-12-31"
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        holidays = set()
-        
-        for item in data.get('items', []):
-            # Only include holidays that are free days or Erev holidays that are free days
-            category = item.get('category', '')
-            title = item.get('title', '')
-            title_lower = title.lower()
-            
-
-            
-            # Check if it's a free day holiday or Erev holiday that is a free day
-            # First exclude non-free days (case insensitive)
-            is_excluded = (
-                'rosh hashana labehemot' in title_lower or
-                'hol hamoed' in title_lower or
-                'chol hamoed' in title_lower or
-                'pesach sheni' in title_lower or
-                'lag baomer' in title_lower or
-                'yom yerushalayim' in title_lower or
-                'chanukah' in title_lower or
-                'tu bishvat' in title_lower
-            )
-            
-            # Exclude all items with *(CH*2M) pattern using regex
-            if re.search(r'.*\(CH.*M\)', title):
-                is_excluded = True
-            
-            # Also exclude Sukkot II (intermediate day without CH''M)
-            if title_lower == 'sukkot ii':
-                is_excluded = True
-            
-            # Also exclude Erev Purim
-            if title_lower == 'erev purim':
-                is_excluded = True
-            
-            # Also exclude Shushan Purim
-            if title_lower == 'shushan purim':
-                is_excluded = True
-            
-            # Also exclude Pesach II
-            if title_lower == 'pesach ii':
-                is_excluded = True
-            
-            # Also exclude Pesach VIII
-            if title_lower == 'pesach viii':
-                is_excluded = True
-            
-            # Also exclude Shavuot II
-            if title_lower == 'shavuot ii':
-                is_excluded = True
-            
-            # If excluded, skip this holiday entirely
-            if is_excluded:
-                continue
-            
-            # Then check if it's a free day holiday
-            is_free_day = (
-                category in ['holiday'] and 
-                any(keyword in title_lower for keyword in [
-                    'rosh hashana', 'yom kippur', 'sukkot', 'simchat torah', 
-                    'pesach i', 'pesach vi', 'pesach vii', 'shavuot i', 'purim', 'tisha b\'av', 'yom haatzmaut'
-                ])
-            )
-            
-            # Check if it's Erev (eve) of a major holiday that is typically a free day
-            is_erev_free_day = (
-                'erev' in title_lower and 
-                any(keyword in title_lower for keyword in [
-                    'rosh hashana', 'yom kippur', 'sukkot', 'pesach'
-                ])
-            )
-            
-            if is_free_day or is_erev_free_day:
-                date_str = item.get('date')
-                if date_str:
-                    holiday_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-                    holidays.add(holiday_date)
-        
-        return holidays
-    except Exception as e:
-        st.warning(f"Warning: Could not fetch Hebrew holidays: {e}")
-        return set()
+        return _cached_holiday_names(tuple(sorted(set(years))))
+    except Exception:
+        pass
 
-def is_working_day(date, holidays):
-    """Check if a date is a working day (Sunday-Thursday, not a holiday)"""
-    weekday = date.weekday()
-    
-    # Friday (4) and Saturday (5) are non-working days
-    if weekday in [4, 5]:
-        return False
-    
-    # Check if it's a holiday
-    if date in holidays:
-        return False
-    
-    return True
+    def warn(year, e):
+        st.warning(f"Warning: Could not fetch Hebrew holidays for {year}: {e}")
 
-def get_next_working_day(date, holidays):
-    """Get the next working day from a given date"""
-    current_date = date
-    while not is_working_day(current_date, holidays):
-        current_date += timedelta(days=1)
-    return current_date
+    return hebrew_holidays.load_holiday_names(years, 'free_days', on_error=warn)
 
 def calculate_schedule_stats(schedule_df, start_date, end_date, consider_holidays, additional_free_days=None):
     """Calculate additional statistics for the schedule"""
 
     stats = {}
     
-    # Calculate break days
-    break_days = schedule_df[schedule_df['Main Topic'].str.contains('Break')]['Duration (Days)'].sum()
-    stats['break_days'] = break_days
+    # Calculate break days from the break rows the engine inserted
+    stats['break_days'] = schedule_df['Duration (Days)'].to_numpy()[schedule_engine.break_mask(schedule_df)].sum()
     
     # Calculate holiday days and get holiday list
     holiday_days = 0
     holiday_list = []
     if consider_holidays:
-        # Get Hebrew holidays for the schedule period
-        holidays = set()
-        holiday_names = {}
+        # One provider call per year returns both the dates and their names,
+        # and the years are fetched concurrently
+        holiday_names = load_holiday_names(range(start_date.year, end_date.year + 1))
+        free_days = FreeDays.coerce(additional_free_days)
         
-        for year in range(start_date.year, end_date.year + 1):
-            year_holidays = get_hebrew_holidays(year)
-            holidays.update(year_holidays)
-            
-            # Get holiday names for this year using the same API call as get_hebrew_holidays
-            try:
-                url = "https://www.hebcal.com/hebcal"
-                params = {
-                    'v': 1,
-                    'cfg': 'json',
-                    'maj': 'on',
-                    'mod': 'on',
-                    'nh': 'on',
-                    'd': 'on',
-                    'lg': 's',
-                    'year': year,
-                    'start': f"{year}-01-01",
-                    'end': f"{year}-12-31"
-                }
-                
-                response = requests.get(url, params=params, timeout=10)
-                response.raise_for_status()
-                
-                data = response.json()
-                for item in data.get('items', []):
-                    # Only include holidays that are free days or Erev holidays that are free days
-                    category = item.get('category', '')
-                    title = item.get('title', '')
-                    title_lower = title.lower()
-                    
-
-                    
-                    # Check if it's a free day holiday or Erev holiday that is a free day
-                    # First exclude non-free days (case insensitive)
-                    is_excluded = (
-                        'rosh hashana labehemot' in title_lower or
-                        'hol hamoed' in title_lower or
-                        'chol hamoed' in title_lower or
-                        'pesach sheni' in title_lower or
-                        'lag baomer' in title_lower or
-                        'yom yerushalayim' in title_lower or
-                        'chanukah' in title_lower or
-                        'tu bishvat' in title_lower
-                    )
-                    
-                    # Exclude all items with *(CH*2M) pattern using regex
-                    if re.search(r'.*\(CH.*M\)', title):
-                        is_excluded = True
-                    
-                    # Also exclude Sukkot II (intermediate day without CH''M)
-                    if title_lower == 'sukkot ii':
-                        is_excluded = True
-                    
-                    # Also exclude Erev Purim
-                    if title_lower == 'erev purim':
-                        is_excluded = True
-                    
-                    # Also exclude Shushan Purim
-                    if title_lower == 'shushan purim':
-                        is_excluded = True
-                    
-                    # Also exclude Pesach II
-                    if title_lower == 'pesach ii':
-                        is_excluded = True
-                    
-                    # Also exclude Pesach VIII
-                    if title_lower == 'pesach viii':
-                        is_excluded = True
-                    
-                    # Also exclude Shavuot II
-                    if title_lower == 'shavuot ii':
-                        is_excluded = True
-                    
-                    # If excluded, skip this holiday entirely
-                    if is_excluded:
-                        continue
-                    
-                    # Then check if it's a free day holiday
-                    is_free_day = (
-                        category in ['holiday'] and 
-                        any(keyword in title_lower for keyword in [
-                            'rosh hashana', 'yom kippur', 'sukkot', 'simchat torah', 
-                            'pesach i', 'pesach vi', 'pesach vii', 'shavuot i', 'purim', 'tisha b\'av', 'yom haatzmaut'
-                        ])
-                    )
-                    
-                    # Check if it's Erev (eve) of a major holiday that is typically a free day
-                    is_erev_free_day = (
-                        'erev' in title_lower and 
-                        any(keyword in title_lower for keyword in [
-                            'rosh hashana', 'yom kippur', 'sukkot', 'pesach'
-                        ])
-                    )
-                    
-                    if is_free_day or is_erev_free_day:
-                        date_str = item.get('date')
-                        if date_str:
-                            holiday_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-                            holiday_names[holiday_date] = item.get('title', 'Unknown Holiday')
-            except:
-                pass
+        # Range search over the sorted holiday dates instead of walking every day;
+        # holidays inside the additional free days are counted with those
+        holiday_dates = sorted(holiday_names)
+        dates = np.array(holiday_dates, dtype='datetime64[D]')
+        first = np.searchsorted(dates, to_datetime64(start_date))
+        last = max(first, np.searchsorted(dates, to_datetime64(end_date), side='right'))
+        outside_free_days = ~free_days.contains(dates[first:last])
+        holiday_entries = [
+            (date, f"{holiday_names[date]} - {date.strftime('%Y-%m-%d')}")
+            for date, keep in zip(holiday_dates[first:last], outside_free_days) if keep
+        ]
         
-        # Add additional free days
-        if additional_free_days:
-            holidays.update(additional_free_days)
-            for date in additional_free_days:
-                holiday_names[date] = "Additional Free Day"
+        # Additional free days stay one entry per range, however long it is
+        holiday_days = len(holiday_entries) + int(free_days.count_between(start_date, end_date))
+        for range_start, range_end in free_days.clipped(start_date, end_date):
+            if range_start == range_end:
+                label = f"Additional Free Day - {range_start.strftime('%Y-%m-%d')}"
+            else:
+                label = (f"Additional Free Days - {range_start.strftime('%Y-%m-%d')} to "
+                         f"{range_end.strftime('%Y-%m-%d')} ({(range_end - range_start).days + 1} days)")
+            holiday_entries.append((range_start, label))
         
-        # Count holidays and build list
-        current_date = start_date
-        while current_date <= end_date:
-            if current_date in holidays:
-                holiday_days += 1
-                holiday_name = holiday_names.get(current_date, "Unknown Holiday")
-                holiday_list.append(f"{holiday_name} - {current_date.strftime('%Y-%m-%d')}")
-            current_date += timedelta(days=1)
+        holiday_list = [label for _, label in sorted(holiday_entries, key=lambda entry: entry[0])]
     
     stats['holiday_days'] = holiday_days
     stats['holiday_list'] = holiday_list
     
-    # Calculate Fridays and Saturdays
-    friday_saturday_days = 0
-    current_date = start_date
-    while current_date <= end_date:
-        if current_date.weekday() in [4, 5]:  # Friday = 4, Saturday = 5
-            friday_saturday_days += 1
-        current_date += timedelta(days=1)
-    
-    stats['friday_saturday_days'] = friday_saturday_days
+    # Calculate Fridays and Saturdays (Friday = 4, Saturday = 5) with a weekday mask count
+    stats['friday_saturday_days'] = max(0, int(np.busday_count(
+        to_datetime64(start_date), to_datetime64(end_date) + np.timedelta64(1, 'D'), weekmask='0000110'
+    )))
     
     return stats
 
-def calculate_exam_dates(schedule_df, syllabus_df):
+def calculate_exam_dates(schedule_df, consider_holidays=True, additional_free_days=None):
     """Calculate exam dates for each main topic that contains 'exam' or 'milestone'"""
-    exam_dates = []
-    
-    # Get unique main topics from syllabus (excluding breaks)
-    main_topics = syllabus_df['Main Topic'].unique()
-    
-    for topic in main_topics:
-        # Only include topics that contain 'exam' or 'milestone' (case insensitive)
-        if 'exam' in topic.lower() or 'milestone' in topic.lower():
-            # Find the last subtopic for this main topic in the schedule
-            topic_schedule = schedule_df[schedule_df['Main Topic'] == topic]
-            
-            if not topic_schedule.empty:
-                # Get the end date of the last subtopic for this topic
-                last_row = topic_schedule.iloc[-1]
-                end_date = datetime.strptime(last_row['End Date'], '%Y-%m-%d').date()
-                
-                # Exam is typically 1-2 working days after the topic ends
-                exam_date = get_next_working_day(end_date + timedelta(days=1), set())
-                
-                exam_dates.append({
-                    'Main Topic': topic,
-                    'Exam Date': exam_date.strftime('%Y-%m-%d'),
-                    'Day of Week': exam_date.strftime('%A')
-                })
+    # Exams land on the same working-day calendar as the schedule: holidays and
+    # additional free days are skipped, not only weekends
+    exams_df = schedule_engine.schedule_exam_dates(
+        schedule_df,
+        load_holiday_names if consider_holidays else None,
+        additional_free_days or ()
+    )
     
-    return exam_dates
-
-def add_colors_to_schedule(schedule_df):
-    """Add light background colors to schedule dataframe based on main topics"""
+    exam_dates = exams_df['Exam Date']
+    return pd.DataFrame({
+        'Main Topic': exams_df['Main Topic'],
+        'Exam Date': exam_dates.dt.strftime('%Y-%m-%d'),
+        'Day of Week': exam_dates.dt.day_name()
+    }).to_dict('records')
+
+def schedule_styles(schedule_df):
+    """CSS for every cell of the schedule: a light background per main topic, bold Main Topic"""
     # Define light colors for different topics
     light_colors = [
         '#f0f8ff',  # Light blue
@@ -828,42 +631,29 @@ def add_colors_to_schedule(schedule_df):
         '#fff0f8',  # Light pink
     ]
     
-    # Get unique main topics (excluding breaks)
-    main_topics = []
-    for topic in schedule_df['Main Topic']:
-        if 'Break' not in topic and topic not in main_topics:
-            main_topics.append(topic)
-    
-    # Create color mapping
-    color_mapping = {}
-    for i, topic in enumerate(main_topics):
-        color_mapping[topic] = light_colors[i % len(light_colors)]
+    # Topic Id numbers topics in order of first appearance (one factorize pass in the
+    # engine) and a break shares its topic's id, so it also picks the row color
+    color_index = schedule_df['Topic Id'].to_numpy() % len(light_colors)
+    cell_styles = np.array([f'background-color: {color};' for color in light_colors], dtype=object)
+    topic_styles = np.array([f'background-color: {color}; font-weight: bold;' for color in light_colors], dtype=object)
     
-    # Apply colors and formatting to dataframe
-    def format_rows(row):
-        topic = row['Main Topic']
-        if 'Break' in topic:
-            # For breaks, use the same color as the main topic
-            base_topic = topic.replace(' - Break', '')
-            color = color_mapping.get(base_topic, '#f5f5f5')
-        else:
-            color = color_mapping.get(topic, '#f5f5f5')
-        
-        # Create styling for each column
-        styles = []
-        for col in row.index:
-            if col == 'Main Topic':
-                # Bold text for Main Topic column
-                styles.append(f'background-color: {color}; font-weight: bold;')
-            else:
-                # Regular styling for other columns
-                styles.append(f'background-color: {color};')
-        
-        return styles
+    return pd.DataFrame({
+        column: (topic_styles if column == 'Main Topic' else cell_styles)[color_index]
+        for column in schedule_df.columns
+    }, index=schedule_df.index)
+
+def add_colors_to_schedule(schedule_df, styles=None):
+    """Add light background colors to schedule dataframe based on main topics"""
+    if styles is None:
+        styles = schedule_styles(schedule_df)
     
-    return schedule_df.style.apply(format_rows, axis=1)
+    # One call styles the whole frame; dates stay datetime64 and are only formatted for display
+    return schedule_df.style.apply(lambda _: styles, axis=None).format(
+        '{:%Y-%m-%d}', subset=schedule_engine.DATE_COLUMNS
+    )
 
-def calculate_schedule(syllabus_df, start_date, add_break, break_days, consider_holidays, additional_free_days=None):
+def calculate_schedule(syllabus_df, start_date, add_break, break_days, consider_holidays, additional_free_days=None,
+                       scheduler=None):
     """Calculate the course schedule based on the syllabus"""
     
     # Validate data before processing
@@ -882,94 +672,269 @@ def calculate_schedule(syllabus_df, start_date, add_break, break_days, consider_
     if syllabus_df['Days'].isna().any():
         syllabus_df['Days'] = syllabus_df['Days'].fillna(0)
     
-    # Get holidays if needed
-    holidays = set()
-    if consider_holidays:
-        current_year = start_date.year
-        holidays = get_hebrew_holidays(current_year)
-        holidays.update(get_hebrew_holidays(current_year + 1))
+    # Compute the schedule; holidays for every year it spans are fetched concurrently
+    try:
+        return schedule_engine.schedule_with_holidays(
+            syllabus_df, start_date, add_break, break_days,
+            load_holiday_names if consider_holidays else None,
+            additional_free_days or (),
+            scheduler
+        )
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        return pd.DataFrame()
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def read_syllabus(file_digest, _file_bytes):
+    """Parse an uploaded syllabus (CSV, Parquet or Arrow), cached by the file's content digest"""
+    return syllabus_io.read_syllabus(_file_bytes)
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def compute_schedule(file_digest, schedule_params, _syllabus_df, _scheduler=None):
+    """Calculate the schedule, cached by file digest and normalized parameters"""
+    start_date, add_break, break_days, consider_holidays, free_days = schedule_params
+    return calculate_schedule(
+        _syllabus_df.copy(), start_date, add_break, break_days, consider_holidays,
+        FreeDays(free_days), _scheduler
+    )
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def compute_start_date_sweep(file_digest, schedule_params, sweep_params, _syllabus_df):
+    """Rank candidate start dates for the current settings, cached like compute_schedule"""
+    _, add_break, break_days, consider_holidays, free_days = schedule_params
+    sweep_from, sweep_to, rank_by = sweep_params
     
-    # Add additional free days
-    if additional_free_days:
-        holidays.update(additional_free_days)
+    syllabus_df = _syllabus_df.copy()
+    syllabus_df['Days'] = pd.to_numeric(syllabus_df['Days'], errors='coerce').fillna(0)
+    candidate_starts = [sweep_from + timedelta(days=i) for i in range((sweep_to - sweep_from).days + 1)]
     
-    schedule_data = []
-    current_date = start_date
+    try:
+        return schedule_engine.sweep_start_dates(
+            syllabus_df, candidate_starts, add_break, break_days,
+            load_holiday_names if consider_holidays else None,
+            free_days, rank_by
+        )
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        return pd.DataFrame()
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def compute_summary(file_digest, schedule_params, _schedule_df):
+    """Calculate schedule statistics and exam dates, cached like compute_schedule"""
+    _, _, _, consider_holidays, free_days = schedule_params
+    start_date_schedule = _schedule_df.iloc[0]['Start Date'].date()
+    end_date_schedule = _schedule_df.iloc[-1]['End Date'].date()
     
-    # Process rows in original order from CSV file
-    for index, row in syllabus_df.iterrows():
-        main_topic = row['Main Topic']
-        subtopic = row['Subtopic']
-        
-        # Check if this is a new main topic (first occurrence)
-        is_new_main_topic = True
-        for prev_row in schedule_data:
-            if prev_row['Main Topic'] == main_topic:
-                is_new_main_topic = False
-                break
-        
-        # Handle NaN values and convert to integer
-        days_value = row['Days']
-        if pd.isna(days_value):
-            st.error(f"❌ Invalid value in 'Days' column for subtopic '{subtopic}'. Please ensure all days values are numbers.")
-            return pd.DataFrame()
-        days_needed = int(days_value)
-        
-        # Find the next working day to start
-        if is_new_main_topic:
-            current_date = get_next_working_day(current_date, holidays)
-            topic_start_date = current_date
+    with instrumentation.span('schedule_stats'):
+        additional_stats = calculate_schedule_stats(
+            _schedule_df, start_date_schedule, end_date_schedule,
+            consider_holidays, FreeDays(free_days)
+        )
+    with instrumentation.span('exam_dates'):
+        exam_dates = calculate_exam_dates(_schedule_df, consider_holidays, FreeDays(free_days))
+    return additional_stats, exam_dates
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def compute_schedule_csv(file_digest, schedule_params, _schedule_df):
+    """The schedule as downloadable CSV text, cached like compute_schedule"""
+    with instrumentation.span('export_csv'):
+        return schedule_engine.schedule_to_csv(_schedule_df)
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def compute_schedule_topics(file_digest, schedule_params, _schedule_df):
+    """Main topic names by Topic Id, for the schedule table's topic filter"""
+    lessons = _schedule_df.loc[~schedule_engine.break_mask(_schedule_df), ['Topic Id', 'Main Topic']]
+    lessons = lessons.drop_duplicates('Topic Id')
+    return dict(zip(lessons['Main Topic'], lessons['Topic Id']))
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def filter_schedule_rows(file_digest, schedule_params, topic_ids, query, _schedule_df):
+    """Positions of the schedule rows in the selected topics whose topic or subtopic contains query"""
+    keep = np.ones(len(_schedule_df), dtype=bool)
+    if topic_ids:
+        keep &= np.isin(_schedule_df['Topic Id'].to_numpy(), topic_ids)
+    if query:
+        matches = _schedule_df['Main Topic'].str.contains(query, case=False, regex=False)
+        matches |= _schedule_df['Subtopic'].astype(str).str.contains(query, case=False, regex=False)
+        keep &= matches.to_numpy(dtype=bool, na_value=False)
+    return np.flatnonzero(keep)
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def compute_page_styles(file_digest, schedule_params, page_key, _window_df):
+    """Cell styles of one page of the schedule table, cached by the page's filters and position"""
+    return schedule_styles(_window_df)
+
+def show_schedule_table(schedule_df, file_digest, schedule_params):
+    """Show one page of the schedule, filtered by topic and search text
+
+    Filtering runs server side on the full schedule; only the visible page is
+    styled and sent to the browser.
+    """
+    topics = compute_schedule_topics(file_digest, schedule_params, schedule_df)
+    col_topics, col_search = st.columns(2)
+    with col_topics:
+        selected_topics = st.multiselect("Filter topics", list(topics), key="schedule_topics",
+                                         placeholder="All topics")
+    with col_search:
+        query = st.text_input("Search", key="schedule_search", placeholder="Topic or subtopic text")
+    
+    topic_ids = tuple(topics[topic] for topic in selected_topics if topic in topics)
+    positions = filter_schedule_rows(file_digest, schedule_params, topic_ids, query.strip(), schedule_df)
+    
+    col_size, col_page, col_rows = st.columns(3)
+    with col_size:
+        page_size = st.selectbox("Rows per page", SCHEDULE_PAGE_SIZES, index=SCHEDULE_PAGE_SIZES.index(100),
+                                 key="schedule_page_size")
+    page_count = max(1, -(-len(positions) // page_size))
+    
+    # Filters can shrink the page count below the page the user was on
+    if st.session_state.get('schedule_page', 1) > page_count:
+        st.session_state.schedule_page = page_count
+    with col_page:
+        page = st.number_input(f"Page (of {page_count:,})", min_value=1, max_value=page_count, step=1,
+                               key="schedule_page")
+    
+    first_row = (page - 1) * page_size
+    window_df = schedule_df.iloc[positions[first_row:first_row + page_size]]
+    with col_rows:
+        st.metric("Rows shown", f"{len(window_df):,} of {len(positions):,}")
+    
+    if window_df.empty:
+        st.info("No schedule rows match these filters")
+        return
+    
+    with instrumentation.span('render_schedule'):
+        page_key = (topic_ids, query.strip(), page_size, page)
+        styles = compute_page_styles(file_digest, schedule_params, page_key, window_df)
+        st.dataframe(
+            add_colors_to_schedule(window_df, styles),
+            use_container_width=True,
+            column_order=schedule_engine.SCHEDULE_COLUMNS
+        )
+
+def show_summary(schedule_df, syllabus_df, file_digest, schedule_params):
+    """Summary metrics, exam dates, the schedule table and the download button"""
+    # Summary section - combined statistics
+    st.header("📊 Summary")
+    
+    # Calculate all statistics
+    start_date_schedule = schedule_df.iloc[0]['Start Date'].date()
+    end_date_schedule = schedule_df.iloc[-1]['End Date'].date()
+    total_calendar_days = (end_date_schedule - start_date_schedule).days + 1
+    
+    # Get additional stats and exam dates
+    additional_stats, exam_dates = compute_summary(file_digest, schedule_params, schedule_df)
+    
+    # Display combined statistics in landscape layout
+    st.markdown('<div class="summary-metrics">', unsafe_allow_html=True)
+    col1, col2, col3, col4, col5, col6, col7, col8 = st.columns(8)
+    
+    with col1:
+        st.metric("📅 Start Date", start_date_schedule.strftime('%Y-%m-%d'))
+    
+    with col2:
+        st.metric("📅 End Date", end_date_schedule.strftime('%Y-%m-%d'))
+    
+    with col3:
+        st.metric("📅 Calendar Days", total_calendar_days)
+    
+    with col4:
+        st.metric("⏱️ Total Days", pd.to_numeric(syllabus_df['Days'], errors='coerce').sum(skipna=True))
+    
+    with col5:
+        st.metric("⏸️ Break Days", additional_stats['break_days'])
+    
+    with col6:
+        # Holiday Days with tooltip
+        holiday_tooltip = ""
+        if additional_stats.get('holiday_list'):
+            holiday_tooltip = "\n".join(additional_stats['holiday_list'])
+        else:
+            holiday_tooltip = "No holidays in this period"
+    
+        st.metric(
+            "🎉 Holiday Days", 
+            additional_stats['holiday_days'],
+            help=holiday_tooltip
+        )
+    
+    with col7:
+        st.metric("📅 Fridays/Saturdays", additional_stats['friday_saturday_days'])
+    
+    with col8:
+        st.metric("📚 Main Topics", len(syllabus_df['Main Topic'].unique()))
+    st.markdown('</div>', unsafe_allow_html=True)
+    
+    # Display exam dates if available; long exam lists go in a table instead of one metric each
+    if exam_dates:
+        st.subheader("📝 Exam Schedule")
+        if len(exam_dates) <= EXAM_METRICS_MAX:
+            st.markdown('<div class="summary-metrics">', unsafe_allow_html=True)
+            exam_cols = st.columns(len(exam_dates))
+            
+            for i, exam in enumerate(exam_dates):
+                with exam_cols[i]:
+                    st.metric(
+                        exam['Main Topic'],
+                        exam['Exam Date'],
+                        exam['Day of Week']
+                    )
+            st.markdown('</div>', unsafe_allow_html=True)
+        else:
+            st.dataframe(pd.DataFrame(exam_dates), use_container_width=True, hide_index=True)
+    
+    # Show schedule with colors
+    st.subheader("📋 Generated Schedule")
+    show_schedule_table(schedule_df, file_digest, schedule_params)
+    
+    # Download button
+    st.download_button(
+        label="⬇️ Download course_schedule.csv",
+        data=compute_schedule_csv(file_digest, schedule_params, schedule_df),
+        file_name="course_schedule.csv",
+        mime="text/csv",
+        type="primary"
+    )
+
+def show_performance_panel(trace):
+    """Collapsible timing breakdown of this run, with totals since the app started"""
+    with st.expander("⏱️ Performance"):
+        st.checkbox(
+            "Profile the next run with cProfile",
+            value=instrumentation.PROFILE_ENABLED,
+            key="perf_profile",
+            help="Cached stages are skipped on reruns, so change a setting or upload to profile a full generation"
+        )
         
-        start_date_for_subtopic = current_date
-        days_allocated = 0
-        end_date = start_date_for_subtopic
+        if trace.spans:
+            st.markdown(f"**This run:** {trace.seconds * 1000:.1f} ms")
+            stages_df = pd.DataFrame({
+                'Stage': ['\u2003' * depth + name for name, depth, _ in trace.spans],
+                'Time (ms)': [round(seconds * 1000, 1) for _, _, seconds in trace.spans]
+            })
+            st.dataframe(stages_df, use_container_width=True, hide_index=True)
+        else:
+            st.info("Every stage of this run was served from the cache")
         
-        # Allocate working days for this subtopic
-        while days_allocated < days_needed:
-            if is_working_day(current_date, holidays):
-                days_allocated += 1
-            end_date = current_date
-            current_date += timedelta(days=1)
+        if trace.counters:
+            st.caption(" · ".join(f"{name.replace('_', ' ')}: {value:,}" for name, value in trace.counters.items()))
         
-        schedule_data.append({
-            'Main Topic': main_topic,
-            'Subtopic': subtopic,
-            'Start Date': start_date_for_subtopic.strftime('%Y-%m-%d'),
-            'End Date': end_date.strftime('%Y-%m-%d'),
-            'Duration (Days)': days_needed
-        })
+        if trace.profile:
+            st.subheader("cProfile")
+            st.code(trace.profile, language=None)
         
-        # Add break after each main topic if enabled (only after the last subtopic of the topic)
-        if add_break and break_days > 0:
-            # Check if this is the last subtopic of the current main topic
-            is_last_subtopic = True
-            for next_index in range(index + 1, len(syllabus_df)):
-                if syllabus_df.iloc[next_index]['Main Topic'] == main_topic:
-                    is_last_subtopic = False
-                    break
-            
-            if is_last_subtopic:
-                current_date = get_next_working_day(current_date, holidays)
-                break_start = current_date
-                
-                # Skip break_days working days
-                break_days_allocated = 0
-                while break_days_allocated < break_days:
-                    if is_working_day(current_date, holidays):
-                        break_days_allocated += 1
-                    current_date += timedelta(days=1)
-                
-                break_end = current_date - timedelta(days=1)
-                
-                schedule_data.append({
-                    'Main Topic': f"{main_topic} - Break",
-                    'Subtopic': 'Break Period',
-                    'Start Date': break_start.strftime('%Y-%m-%d'),
-                    'End Date': break_end.strftime('%Y-%m-%d'),
-                    'Duration (Days)': break_days
-                })
-    
-    return pd.DataFrame(schedule_data)
+        # Totals for this server process, as exported on the Flask /metrics endpoint
+        spans, counters = instrumentation.metrics.snapshot()
+        if spans:
+            st.markdown("**Since start**")
+            totals_df = pd.DataFrame([
+                {'Stage': name, 'Runs': count, 'Total (ms)': round(total * 1000, 1),
+                 'Mean (ms)': round(total / count * 1000, 1), 'Max (ms)': round(longest * 1000, 1)}
+                for name, (count, total, longest) in sorted(spans.items())
+            ])
+            st.dataframe(totals_df, use_container_width=True, hide_index=True)
+        if counters:
+            st.caption(" · ".join(f"{name.replace('_', ' ')}: {value:,}" for name, value in sorted(counters.items())))
 
 def main():
     # Header
@@ -984,8 +949,8 @@ def main():
         # File upload with full width
         uploaded_file = st.file_uploader(
             "Upload Your Syllabus",
-            type=['csv'],
-            help="Upload a CSV file with Main Topic, Subtopic, and Days columns.",
+            type=[extension.lstrip('.') for extension in syllabus_io.SUPPORTED_EXTENSIONS],
+            help="Upload a CSV, Parquet or Arrow file with Main Topic, Subtopic, and Days columns.",
             label_visibility="collapsed"
         )
         
@@ -1081,36 +1046,52 @@ def main():
         
 
     
-    # Main content area
-    with st.container():
+    # Main content area; its stages are timed for the Performance panel
+    profile_run = st.session_state.get('perf_profile', instrumentation.PROFILE_ENABLED)
+    with st.container(), instrumentation.trace(profile=profile_run) as trace:
         
         if uploaded_file is not None:
             try:
-                # Read and display the uploaded CSV
-                syllabus_df = pd.read_csv(uploaded_file)
-                
-                # Validate required columns
-                required_columns = ['Main Topic', 'Subtopic', 'Days']
-                missing_columns = [col for col in required_columns if col not in syllabus_df.columns]
+                # Read the upload; parsing is cached by the file's content digest and the
+                # required columns are validated on the header/schema before rows are read
+                file_bytes = uploaded_file.getvalue()
+                file_digest = hashlib.sha256(file_bytes).hexdigest()
+                try:
+                    syllabus_df = read_syllabus(file_digest, file_bytes)
+                    format_error = None
+                except syllabus_io.SyllabusFormatError as e:
+                    format_error = e
                 
-                if missing_columns:
-                    st.error(f"❌ Missing required columns: {', '.join(missing_columns)}")
-                    st.info("Please ensure your CSV file contains: Main Topic, Subtopic, and Days columns")
+                if format_error:
+                    st.error(f"❌ {format_error}")
+                    st.info("Please ensure your file contains: Main Topic, Subtopic, and Days columns")
                 else:
-                    st.success("✅ CSV file loaded successfully!")
+                    st.success("✅ Syllabus file loaded successfully!")
                     
-                    # Create a hash of current parameters to detect changes
-                    current_params_hash = hash((
-                        str(start_date),
-                        str(add_break),
-                        str(break_days),
-                        str(consider_holidays),
-                        str(use_date_range),
-                        str(date_range_start),
-                        str(date_range_end),
-                        str(use_single_dates),
-                        str(single_dates)
-                    ))
+                    # Prepare additional free days as merged date ranges
+                    free_day_ranges = []
+                    
+                    # Add date range if specified
+                    if use_date_range and date_range_start and date_range_end:
+                        free_day_ranges.append((date_range_start, date_range_end))
+                    
+                    # Add single dates if specified
+                    if use_single_dates and single_dates:
+                        free_day_ranges.extend(single_date for single_date in single_dates if single_date)
+                    
+                    additional_free_days = FreeDays(free_day_ranges)
+                    
+                    # Normalized parameters; with the file digest they key every cached computation
+                    schedule_params = (
+                        start_date,
+                        bool(add_break),
+                        int(break_days),
+                        bool(consider_holidays),
+                        additional_free_days.ranges()
+                    )
+                    
+                    # Create a hash of the file and current parameters to detect changes
+                    current_params_hash = hash((file_digest, schedule_params))
                     
                     # Check if we need to regenerate schedule
                     regenerate_needed = (
@@ -1123,26 +1104,11 @@ def main():
                         # Generate schedule automatically
                         with st.spinner("🔄 Generating schedule..."):
                             try:
-                                # Prepare additional free days
-                                additional_free_days = set()
-                                
-                                # Add date range if specified
-                                if use_date_range and date_range_start and date_range_end:
-                                    current_date_range = date_range_start
-                                    while current_date_range <= date_range_end:
-                                        additional_free_days.add(current_date_range)
-                                        current_date_range += timedelta(days=1)
-                                
-                                # Add single dates if specified
-                                if use_single_dates and single_dates:
-                                    for single_date in single_dates:
-                                        if single_date:
-                                            additional_free_days.add(single_date)
-                                
-                                # Calculate schedule
-                                schedule_df = calculate_schedule(
-                                    syllabus_df, start_date, add_break, break_days, consider_holidays, 
-                                    additional_free_days if additional_free_days else None
+                                # Calculate schedule, resuming from the session's previous result where possible
+                                if 'scheduler' not in st.session_state:
+                                    st.session_state.scheduler = schedule_engine.IncrementalScheduler()
+                                schedule_df = compute_schedule(
+                                    file_digest, schedule_params, syllabus_df, st.session_state.scheduler
                                 )
                                 
                                 # Check if schedule was generated successfully
@@ -1160,211 +1126,49 @@ def main():
                                     if additional_free_days:
                                         st.info(f"🏖️ Excluded {len(additional_free_days)} additional free day(s) from the schedule")
                                     
-                                    # Summary section - combined statistics
-                                    st.header("📊 Summary")
-                                    
-                                    # Calculate all statistics
-                                    start_date_schedule = datetime.strptime(schedule_df.iloc[0]['Start Date'], '%Y-%m-%d').date()
-                                    end_date_schedule = datetime.strptime(schedule_df.iloc[-1]['End Date'], '%Y-%m-%d').date()
-                                    total_calendar_days = (end_date_schedule - start_date_schedule).days + 1
-                                    working_days = schedule_df[~schedule_df['Main Topic'].str.contains('Break')]['Duration (Days)'].sum()
-                                    
-                                    # Get additional stats
-                                    additional_stats = calculate_schedule_stats(
-                                        schedule_df, start_date_schedule, end_date_schedule, 
-                                        consider_holidays, additional_free_days if additional_free_days else None
-                                    )
-                                    
-                                    # Calculate exam dates
-                                    exam_dates = calculate_exam_dates(schedule_df, syllabus_df)
-                                    
-                                    # Display combined statistics in landscape layout
-                                    st.markdown('<div class="summary-metrics">', unsafe_allow_html=True)
-                                    col1, col2, col3, col4, col5, col6, col7, col8 = st.columns(8)
-                                    
-                                    with col1:
-                                        st.metric("📅 Start Date", start_date_schedule.strftime('%Y-%m-%d'))
-                                    
-                                    with col2:
-                                        st.metric("📅 End Date", end_date_schedule.strftime('%Y-%m-%d'))
-                                    
-                                    with col3:
-                                        st.metric("📅 Calendar Days", total_calendar_days)
-                                    
-                                    with col4:
-                                        st.metric("⏱️ Total Days", syllabus_df['Days'].sum(skipna=True))
-                                    
-                                    with col5:
-                                        st.metric("⏸️ Break Days", additional_stats['break_days'])
-                                    
-                                    with col6:
-                                        # Holiday Days with tooltip
-                                        holiday_tooltip = ""
-                                        if additional_stats.get('holiday_list'):
-                                            holiday_tooltip = "\n".join(additional_stats['holiday_list'])
-                                        else:
-                                            holiday_tooltip = "No holidays in this period"
-                                        
-                                        st.metric(
-                                            "🎉 Holiday Days", 
-                                            additional_stats['holiday_days'],
-                                            help=holiday_tooltip
-                                        )
-                                    
-                                    with col7:
-                                        st.metric("📅 Fridays/Saturdays", additional_stats['friday_saturday_days'])
-                                    
-                                    with col8:
-                                        st.metric("📚 Main Topics", len(syllabus_df['Main Topic'].unique()))
-                                    st.markdown('</div>', unsafe_allow_html=True)
-                                    
-                                    # Display exam dates if available
-                                    if exam_dates:
-                                        st.subheader("📝 Exam Schedule")
-                                        st.markdown('<div class="summary-metrics">', unsafe_allow_html=True)
-                                        exam_cols = st.columns(len(exam_dates))
-                                        
-                                        for i, exam in enumerate(exam_dates):
-                                            with exam_cols[i]:
-                                                st.metric(
-                                                    exam['Main Topic'],
-                                                    exam['Exam Date'],
-                                                    exam['Day of Week']
-                                                )
-                                        st.markdown('</div>', unsafe_allow_html=True)
-                                    
-                                    # Show schedule with colors
-                                    st.subheader("📋 Generated Schedule")
-                                    colored_schedule = add_colors_to_schedule(schedule_df)
-                                    st.dataframe(colored_schedule, use_container_width=True)
-                                    
-                                    # Download button
-                                    csv_buffer = io.StringIO()
-                                    schedule_df.to_csv(csv_buffer, index=False)
-                                    csv_str = csv_buffer.getvalue()
-                                    
-                                    st.download_button(
-                                        label="⬇️ Download course_schedule.csv",
-                                        data=csv_str,
-                                        file_name="course_schedule.csv",
-                                        mime="text/csv",
-                                        type="primary"
-                                    )
-                                    
-
+                                    show_summary(schedule_df, syllabus_df, file_digest, schedule_params)
                                 
                             except Exception as e:
                                 st.error(f"⚠️ Error generating schedule: {str(e)}")
                     
                     # Display existing schedule if available
                     elif 'schedule_df' in st.session_state and st.session_state.schedule_df is not None:
-                        schedule_df = st.session_state.schedule_df
-                        
-                        # Summary section - combined statistics
-                        st.header("📊 Summary")
-                        
-                        # Calculate all statistics
-                        start_date_schedule = datetime.strptime(schedule_df.iloc[0]['Start Date'], '%Y-%m-%d').date()
-                        end_date_schedule = datetime.strptime(schedule_df.iloc[-1]['End Date'], '%Y-%m-%d').date()
-                        total_calendar_days = (end_date_schedule - start_date_schedule).days + 1
-                        working_days = schedule_df[~schedule_df['Main Topic'].str.contains('Break')]['Duration (Days)'].sum()
-                        
-                        # Get additional stats
-                        additional_free_days = set()
-                        
-                        # Add date range if specified
-                        if use_date_range and date_range_start and date_range_end:
-                            current_date_range = date_range_start
-                            while current_date_range <= date_range_end:
-                                additional_free_days.add(current_date_range)
-                                current_date_range += timedelta(days=1)
-                        
-                        # Add single dates if specified
-                        if use_single_dates and single_dates:
-                            for single_date in single_dates:
-                                if single_date:
-                                    additional_free_days.add(single_date)
-                        
-                        additional_stats = calculate_schedule_stats(
-                            schedule_df, start_date_schedule, end_date_schedule, 
-                            consider_holidays, additional_free_days if additional_free_days else None
-                        )
-                        
-                        # Calculate exam dates
-                        exam_dates = calculate_exam_dates(schedule_df, syllabus_df)
-                        
-                        # Display combined statistics in landscape layout
-                        st.markdown('<div class="summary-metrics">', unsafe_allow_html=True)
-                        col1, col2, col3, col4, col5, col6, col7, col8 = st.columns(8)
-                        
-                        with col1:
-                            st.metric("📅 Start Date", start_date_schedule.strftime('%Y-%m-%d'))
-                        
-                        with col2:
-                            st.metric("📅 End Date", end_date_schedule.strftime('%Y-%m-%d'))
-                        
-                        with col3:
-                            st.metric("📅 Calendar Days", total_calendar_days)
-                        
-                        with col4:
-                            st.metric("⏱️ Total Days", syllabus_df['Days'].sum(skipna=True))
-                        
-                        with col5:
-                            st.metric("⏸️ Break Days", additional_stats['break_days'])
-                        
-                        with col6:
-                            # Holiday Days with tooltip
-                            holiday_tooltip = ""
-                            if additional_stats.get('holiday_list'):
-                                holiday_tooltip = "\n".join(additional_stats['holiday_list'])
-                            else:
-                                holiday_tooltip = "No holidays in this period"
-                            
-                            st.metric(
-                                "🎉 Holiday Days", 
-                                additional_stats['holiday_days'],
-                                help=holiday_tooltip
+                        show_summary(st.session_state.schedule_df, syllabus_df, file_digest, schedule_params)
+                    
+                    # Start date what-if comparison over the current settings
+                    with st.expander("🔍 Compare Start Dates"):
+                        st.info("Evaluate a range of candidate start dates in one pass and rank them")
+                        col_sweep1, col_sweep2, col_sweep3 = st.columns(3)
+                        with col_sweep1:
+                            sweep_from = st.date_input("Earliest start", value=start_date, key="sweep_from")
+                        with col_sweep2:
+                            sweep_to = st.date_input("Latest start", value=start_date + timedelta(days=90), key="sweep_to")
+                        with col_sweep3:
+                            rank_by = st.selectbox(
+                                "Rank by",
+                                list(SWEEP_RANK_LABELS),
+                                format_func=SWEEP_RANK_LABELS.get,
+                                key="sweep_rank"
                             )
                         
-                        with col7:
-                            st.metric("📅 Fridays/Saturdays", additional_stats['friday_saturday_days'])
-                        
-                        with col8:
-                            st.metric("📚 Main Topics", len(syllabus_df['Main Topic'].unique()))
-                        st.markdown('</div>', unsafe_allow_html=True)
-                        
-                        # Display exam dates if available
-                        if exam_dates:
-                            st.subheader("📝 Exam Schedule")
-                            st.markdown('<div class="summary-metrics">', unsafe_allow_html=True)
-                            exam_cols = st.columns(len(exam_dates))
-                            
-                            for i, exam in enumerate(exam_dates):
-                                with exam_cols[i]:
-                                    st.metric(
-                                        exam['Main Topic'],
-                                        exam['Exam Date'],
-                                        exam['Day of Week']
+                        run_sweep = st.checkbox("Compare these start dates?", key="sweep_run")
+                        if run_sweep:
+                            if sweep_to < sweep_from:
+                                st.warning("⚠️ The latest start must not be before the earliest start.")
+                            else:
+                                with st.spinner("🔄 Comparing start dates..."):
+                                    sweep_df = compute_start_date_sweep(
+                                        file_digest, schedule_params, (sweep_from, sweep_to, rank_by), syllabus_df
+                                    )
+                                if not sweep_df.empty:
+                                    st.dataframe(
+                                        sweep_df.style.format(
+                                            '{:%Y-%m-%d}', subset=['Start Date', 'First Lesson', 'End Date', 'First Break'],
+                                            na_rep='-'
+                                        ),
+                                        use_container_width=True,
+                                        hide_index=True
                                     )
-                            st.markdown('</div>', unsafe_allow_html=True)
-                        
-                        # Show schedule with colors
-                        st.subheader("📋 Generated Schedule")
-                        colored_schedule = add_colors_to_schedule(schedule_df)
-                        st.dataframe(colored_schedule, use_container_width=True)
-                        
-                        # Download button
-                        csv_buffer = io.StringIO()
-                        schedule_df.to_csv(csv_buffer, index=False)
-                        csv_str = csv_buffer.getvalue()
-                        
-                        st.download_button(
-                            label="⬇️ Download course_schedule.csv",
-                            data=csv_str,
-                            file_name="course_schedule.csv",
-                            mime="text/csv",
-                            type="primary"
-                        )
                         
 
                 
@@ -1374,6 +1178,7 @@ def main():
         else:
             st.info("📁 Please upload a CSV file to get started")
     
+    show_performance_panel(trace)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,170 @@
+import io
+import os
+import csv
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # CSV still loads through the pandas C parser
+    pyarrow = None
+
+REQUIRED_COLUMNS = ['Main Topic', 'Subtopic', 'Days']
+SUPPORTED_EXTENSIONS = ('.csv', '.parquet', '.arrow', '.feather', '.ipc')
+
+# Dtypes applied while parsing CSV; Days is coerced afterwards so bad values become NaN
+CSV_DTYPES = {'Main Topic': 'category', 'Subtopic': str}
+
+PARQUET_MAGIC = b'PAR1'
+ARROW_FILE_MAGIC = b'ARROW1'
+ARROW_STREAM_MAGIC = b'\xff\xff\xff\xff'
+
+
+class SyllabusFormatError(ValueError):
+    """Raised when an upload cannot be read as a syllabus or lacks required columns"""
+
+
+def detect_format(data):
+    """Guess 'parquet', 'arrow' or 'csv' from the leading bytes of a file"""
+    if data.startswith(PARQUET_MAGIC):
+        return 'parquet'
+    if data.startswith(ARROW_FILE_MAGIC) or data.startswith(ARROW_STREAM_MAGIC):
+        return 'arrow'
+    return 'csv'
+
+
+def read_syllabus(source):
+    """Read a syllabus from CSV, Parquet or Arrow IPC bytes or a file path
+
+    Only the required columns are materialized: Main Topic as a category, Subtopic
+    as strings and Days as the smallest nullable integer that fits (float if some
+    values are fractional). Values in Days that are not numbers become NaN.
+    """
+    with instrumentation.span('read_syllabus'):
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as f:
+                data = f.read()
+        else:
+            data = bytes(source)
+
+        file_format = detect_format(data)
+        if file_format == 'csv':
+            syllabus_df = _read_csv(data)
+        else:
+            if pyarrow is None:
+                raise SyllabusFormatError("Reading Parquet or Arrow files requires pyarrow (pip install pyarrow)")
+            syllabus_df = _read_arrow_table(data, file_format)
+
+        syllabus_df = _normalize_columns(syllabus_df)
+
+    instrumentation.increment('syllabus_rows', len(syllabus_df))
+    return syllabus_df
+
+
+def validate_columns(columns):
+    """Raise SyllabusFormatError naming the required columns missing from a header or schema"""
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in columns]
+    if missing_columns:
+        raise SyllabusFormatError(f"Missing required columns: {', '.join(missing_columns)}")
+
+
+def read_csv_header(source):
+    """Column names from the first line of CSV bytes or a CSV file path, stripped of surrounding spaces"""
+    return [name.strip() for name in _raw_csv_header(source)]
+
+
+def csv_columns(source):
+    """Map the header names of the required columns to their stripped names
+
+    Raises SyllabusFormatError when a required column is missing. Reading with
+    usecols=list(columns) and renaming with the mapping gives the same columns
+    the header was validated on, even when the names are padded with spaces.
+    """
+    header = _raw_csv_header(source)
+    validate_columns([name.strip() for name in header])
+    columns = {}
+    for name in header:
+        if name.strip() in REQUIRED_COLUMNS and name.strip() not in columns.values():
+            columns[name] = name.strip()
+    return columns
+
+
+def _raw_csv_header(source):
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            first_line = f.readline()
+    else:
+        first_line = source.split(b'\n', 1)[0]
+
+    try:
+        header = next(csv.reader(io.StringIO(first_line.decode('utf-8-sig'))))
+    except (StopIteration, UnicodeDecodeError):
+        raise SyllabusFormatError("The file is empty or not a valid CSV file")
+    return header
+
+
+def _read_csv(data):
+    # Validate the header before parsing any rows
+    columns = csv_columns(data)
+    dtypes = {name: CSV_DTYPES[column] for name, column in columns.items() if column in CSV_DTYPES}
+
+    engine = 'pyarrow' if pyarrow is not None else 'c'
+    try:
+        try:
+            syllabus_df = pd.read_csv(io.BytesIO(data), engine=engine, usecols=list(columns), dtype=dtypes)
+        except ValueError:
+            if engine == 'c':
+                raise
+            # The pyarrow parser is stricter about ragged rows; let the C parser decide
+            syllabus_df = pd.read_csv(io.BytesIO(data), usecols=list(columns), dtype=dtypes)
+    except Exception as e:
+        raise SyllabusFormatError(f"Could not read CSV file: {e}")
+
+    return syllabus_df.rename(columns=columns)
+
+
+def _read_arrow_table(data, file_format):
+    buffer = pyarrow.py_buffer(data)
+    try:
+        if file_format == 'parquet':
+            parquet_file = pyarrow.parquet.ParquetFile(pyarrow.BufferReader(buffer))
+            validate_columns(parquet_file.schema_arrow.names)
+            table = parquet_file.read(columns=REQUIRED_COLUMNS)
+        else:
+            if data.startswith(ARROW_FILE_MAGIC):
+                reader = pyarrow.ipc.open_file(buffer)
+            else:
+                reader = pyarrow.ipc.open_stream(buffer)
+            validate_columns(reader.schema.names)
+            table = reader.read_all().select(REQUIRED_COLUMNS)
+    except pyarrow.ArrowInvalid as e:
+        raise SyllabusFormatError(f"Could not read {file_format} file: {e}")
+
+    return table.to_pandas()
+
+
+def _normalize_columns(syllabus_df):
+    # Categories sorted by value, so sorting by Main Topic stays alphabetical
+    main_topics = syllabus_df['Main Topic']
+    if isinstance(main_topics.dtype, pd.CategoricalDtype):
+        syllabus_df['Main Topic'] = main_topics.cat.reorder_categories(main_topics.cat.categories.sort_values())
+    else:
+        syllabus_df['Main Topic'] = main_topics.astype('category')
+
+    days = pd.to_numeric(syllabus_df['Days'], errors='coerce')
+    values = days.to_numpy(dtype=float, na_value=np.nan)
+    present = values[~np.isnan(values)]
+    if np.array_equal(present, np.trunc(present)):
+        low, high = (present.min(), present.max()) if len(present) else (0, 0)
+        for dtype, name in ((np.int16, 'Int16'), (np.int32, 'Int32'), (np.int64, 'Int64')):
+            if np.iinfo(dtype).min <= low and high <= np.iinfo(dtype).max:
+                days = days.astype(name)
+                break
+    syllabus_df['Days'] = days
+
+    return syllabus_df
@@ -0,0 +1,59 @@
+import os
+
+import batch_schedule
+
+SYLLABUS = b'Main Topic,Subtopic,Days\nMath,Algebra,2\nMath,Geometry,1\n'
+
+
+def write(path, data=SYLLABUS):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_output_collisions_across_directories_and_extensions(tmp_path):
+    files = [
+        write(tmp_path / 'a' / 'x.csv'), write(tmp_path / 'b' / 'x.csv'),
+        write(tmp_path / 'a' / 'y.csv'), write(tmp_path / 'a' / 'y.parquet'),
+        write(tmp_path / 'a' / 'z.csv'),
+    ]
+    out = str(tmp_path / 'out')
+
+    assert batch_schedule.output_collisions(files, out) == {
+        os.path.join(out, 'x_schedule.csv'): files[:2],
+        os.path.join(out, 'y_schedule.csv'): files[2:4],
+    }
+    assert os.path.join(out, 'x_cohorts.csv') in batch_schedule.output_collisions(files, out, cohorts=True)
+
+
+def test_the_same_file_through_two_inputs_is_scheduled_once(tmp_path):
+    path = write(tmp_path / 'syllabi' / 'x.csv')
+    files = batch_schedule.find_syllabus_files([str(tmp_path / 'syllabi'), path, str(tmp_path / 'syllabi' / '*.csv')])
+
+    assert files == [path]
+    assert batch_schedule.output_collisions(files, str(tmp_path)) == {}
+
+
+def test_colliding_inputs_fail_before_anything_is_written(tmp_path, capsys):
+    write(tmp_path / 'a' / 'x.csv')
+    write(tmp_path / 'b' / 'x.csv', b'Main Topic,Subtopic,Days\nArt,Drawing,5\n')
+    out = tmp_path / 'out'
+
+    status = batch_schedule.main([str(tmp_path / 'a'), str(tmp_path / 'b'), '--start-date', '2025-01-05',
+                                  '--no-holidays', '--output-dir', str(out), '--workers', '1'])
+
+    assert status == 1
+    assert 'x_schedule.csv' in capsys.readouterr().err
+    assert not out.exists() or os.listdir(out) == []
+
+
+def test_distinct_inputs_are_all_written(tmp_path):
+    write(tmp_path / 'a' / 'x.csv')
+    write(tmp_path / 'a' / 'y.csv')
+    out = tmp_path / 'out'
+
+    status = batch_schedule.main([str(tmp_path / 'a'), '--start-date', '2025-01-05', '--no-holidays',
+                                  '--output-dir', str(out), '--workers', '1'])
+
+    assert status == 0
+    assert sorted(os.listdir(out)) == ['x_schedule.csv', 'y_schedule.csv']
@@ -0,0 +1,76 @@
+import random
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from schedule_engine import schedule_cohorts, schedule_with_holidays
+
+TOPICS = 'ABCDE'
+DAYS = [0, 1, 1, 2, 3, 5, -1, 2.5]
+FIRST = date(2025, 1, 1)
+
+
+def random_syllabus(rnd):
+    count = rnd.randrange(1, 25)
+    return pd.DataFrame({
+        'Main Topic': [rnd.choice(TOPICS) for _ in range(count)],
+        'Subtopic': [f"Sub {i}" for i in range(count)],
+        'Days': [float(rnd.choice(DAYS)) for _ in range(count)]
+    })
+
+
+def random_free_days(rnd):
+    items = []
+    for _ in range(rnd.randrange(3)):
+        start = FIRST + timedelta(days=rnd.randrange(400))
+        items.append((start, start + timedelta(days=rnd.randrange(15))) if rnd.random() < 0.5 else start)
+    return items
+
+
+def year_holidays(years):
+    """Stub holiday loader: a fixed pseudo-random set of dates per year"""
+    holidays = set()
+    for year in years:
+        rnd = random.Random(year)
+        holidays.update(date(year, 1, 1) + timedelta(days=rnd.randrange(365)) for _ in range(15))
+    return holidays
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_schedule_cohorts_matches_one_schedule_per_cohort(seed):
+    rnd = random.Random(seed)
+    syllabus_df = random_syllabus(rnd)
+    count = rnd.randrange(1, 8)
+    shared_free_days = random_free_days(rnd)
+    cohorts_df = pd.DataFrame({
+        'Cohort': [f"Group {i}" for i in range(count)],
+        # Starts up to the end of the year, so some cohorts run into the next one
+        'Start Date': [FIRST + timedelta(days=rnd.randrange(365)) for _ in range(count)],
+        # Some cohorts share free days and break settings, so they are laid out together
+        'Additional Free Days': [shared_free_days if rnd.random() < 0.5 else random_free_days(rnd) for _ in range(count)],
+        'Add Break': [rnd.random() < 0.5 for _ in range(count)],
+        'Break Days': [rnd.choice([0, 2, 2, 3]) for _ in range(count)]
+    })
+
+    cohorts_schedule = schedule_cohorts(syllabus_df, cohorts_df, load_holidays=year_holidays)
+
+    assert list(cohorts_schedule['Cohort'].drop_duplicates()) == list(cohorts_df['Cohort'])
+    for name, start, free_days, add_break, break_days in zip(*(cohorts_df[column] for column in cohorts_df)):
+        expected = schedule_with_holidays(syllabus_df, start, add_break, break_days, year_holidays, free_days)
+        actual = cohorts_schedule[cohorts_schedule['Cohort'] == name].drop(columns='Cohort')
+        pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected)
+
+
+def test_schedule_cohorts_falls_back_to_the_default_break_settings():
+    rnd = random.Random(0)
+    syllabus_df = random_syllabus(rnd)
+    cohorts_df = pd.DataFrame({'Start Date': [date(2025, 3, 2), date(2025, 9, 7)]})
+
+    cohorts_schedule = schedule_cohorts(syllabus_df, cohorts_df, add_break=True, break_days=3)
+
+    assert list(cohorts_schedule['Cohort'].drop_duplicates()) == ['Cohort 1', 'Cohort 2']
+    for name, start in zip(['Cohort 1', 'Cohort 2'], cohorts_df['Start Date']):
+        expected = schedule_with_holidays(syllabus_df, start, True, 3)
+        actual = cohorts_schedule[cohorts_schedule['Cohort'] == name].drop(columns='Cohort')
+        pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected)
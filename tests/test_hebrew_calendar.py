@@ -0,0 +1,72 @@
+from datetime import date
+
+import pytest
+
+import hebrew_calendar
+
+# Published dates (diaspora), checked against printed calendars rather than this module
+PUBLISHED_DATES = [
+    ('Rosh Hashana 5781', date(2020, 9, 19)),
+    ('Rosh Hashana 5784', date(2023, 9, 16)),
+    ('Rosh Hashana 5785', date(2024, 10, 3)),
+    ('Rosh Hashana 5786', date(2025, 9, 23)),
+    ('Yom Kippur', date(2024, 10, 12)),
+    ('Purim', date(2024, 3, 24)),  # 14 Adar II of the leap year 5784
+    ('Purim', date(2025, 3, 14)),
+    ('Pesach I', date(2024, 4, 23)),
+    ('Pesach I', date(2025, 4, 13)),
+    ('Shavuot I', date(2025, 6, 2)),
+    ('Chanukah: 1 Candle', date(2024, 12, 25)),
+    ('Yom HaShoah', date(2025, 4, 24)),  # 27 Nisan was a Friday
+    ("Yom HaAtzma'ut", date(2024, 5, 14)),  # 5 Iyar was a Monday: postponed
+    ('Yom HaZikaron', date(2024, 5, 13)),
+    ("Yom HaAtzma'ut", date(2025, 5, 1)),  # 5 Iyar was Shabbat: advanced to Thursday
+    ('Yom HaZikaron', date(2025, 4, 30)),
+    ("Tish'a B'Av", date(2024, 8, 13)),
+    ("Tish'a B'Av (observed)", date(2022, 8, 7)),  # 9 Av was Shabbat
+]
+
+
+def molad_tishrei(year):
+    """(weekday with Sunday = 0, hours since 6pm) of the molad of Tishrei, from the mean lunation alone"""
+    months = 235 * ((year - 1) // 19) + 12 * ((year - 1) % 19) + (7 * ((year - 1) % 19) + 1) // 19
+    parts = (24 + 5) * 1080 + 204 + months * (29 * 24 * 1080 + 12 * 1080 + 793)
+    day, remainder = divmod(parts, 24 * 1080)
+    return day % 7, remainder // 1080
+
+
+@pytest.mark.parametrize('title, expected', PUBLISHED_DATES)
+def test_published_holiday_dates(title, expected):
+    items = hebrew_calendar.hebcal_items(expected.year)
+    dates = [item['date'] for item in items if item['title'] == title]
+    assert expected.isoformat() in dates
+
+
+@pytest.mark.parametrize('year, first_day', [
+    (5781, date(2020, 9, 19)),
+    (5784, date(2023, 9, 16)),
+    (5786, date(2025, 9, 23)),
+])
+def test_postponed_new_year(year, first_day):
+    # The molad falls on an earlier weekday; a postponement rule moves Rosh Hashana
+    assert hebrew_calendar.to_date(year, hebrew_calendar.TISHREI, 1) == first_day
+    molad_weekday, _ = molad_tishrei(year)
+    assert molad_weekday != (first_day.weekday() + 1) % 7
+
+
+def test_new_year_on_molad_day():
+    # Molad 5785 fell early on Thursday, so Rosh Hashana is on the molad day
+    assert molad_tishrei(5785) == (4, 9)
+    assert hebrew_calendar.to_date(5785, hebrew_calendar.TISHREI, 1) == date(2024, 10, 3)
+
+
+def test_leap_years():
+    assert [year for year in range(5780, 5790) if hebrew_calendar.is_leap_year(year)] == [5782, 5784, 5787]
+    assert hebrew_calendar.days_in_year(5784) == 383
+    assert hebrew_calendar.from_date(date(2024, 3, 24)) == (5784, hebrew_calendar.ADAR_II, 14)
+
+
+def test_round_trip():
+    for ordinal in range(date(2000, 1, 1).toordinal(), date(2040, 1, 1).toordinal(), 37):
+        day = date.fromordinal(ordinal)
+        assert hebrew_calendar.to_date(*hebrew_calendar.from_date(day)) == day
@@ -0,0 +1,130 @@
+import os
+import time
+import threading
+from datetime import date
+
+import pytest
+
+import hebrew_holidays
+from hebrew_holidays import HolidayCache
+
+
+class StubFetch:
+    """Counts calls; each call answers Pesach I on a day one later than the previous call"""
+
+    def __init__(self, delay=0.0, fail=False):
+        self.calls = 0
+        self.delay = delay
+        self.fail = fail
+        self._lock = threading.Lock()
+
+    def __call__(self, year):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("hebcal.com is unreachable")
+        return [{'title': 'Pesach I', 'date': f"{year}-04-{call:02d}", 'category': 'holiday'}]
+
+
+def expected(year, call):
+    return {date(year, 4, call): 'Pesach I'}
+
+
+def age_entry(cache, year, seconds, filter_name='free_days'):
+    """Rewrite a cached entry as if it had been fetched `seconds` ago"""
+    path = cache._entry_path(year, filter_name)
+    fetched_at, holiday_names = cache._read_entry(path)
+    cache._write_entry(path, year, filter_name, fetched_at - seconds, holiday_names)
+    cache._memory.pop(path, None)
+
+
+def wait_for_refresh(cache):
+    deadline = time.time() + 5
+    while cache._refreshing and time.time() < deadline:
+        time.sleep(0.01)
+    assert not cache._refreshing
+
+
+def test_fetches_once_then_serves_memory_and_disk(tmp_path):
+    fetch = StubFetch()
+    cache = HolidayCache(cache_dir=str(tmp_path), ttl=60, fetch_items=fetch)
+    assert cache.get(2025) == expected(2025, 1)
+    assert cache.get(2025) == expected(2025, 1)
+
+    # A new process sees the entry on disk
+    other = HolidayCache(cache_dir=str(tmp_path), ttl=60, fetch_items=fetch)
+    assert other.get(2025) == expected(2025, 1)
+    assert fetch.calls == 1
+
+
+def test_expired_entry_is_refetched_without_stale_while_revalidate(tmp_path):
+    fetch = StubFetch()
+    cache = HolidayCache(cache_dir=str(tmp_path), ttl=60, stale_while_revalidate=False, fetch_items=fetch)
+    cache.get(2025)
+    age_entry(cache, 2025, 120)
+    assert cache.get(2025) == expected(2025, 2)
+    assert fetch.calls == 2
+
+
+def test_stale_while_revalidate_serves_stale_and_refreshes(tmp_path):
+    fetch = StubFetch()
+    cache = HolidayCache(cache_dir=str(tmp_path), ttl=60, fetch_items=fetch)
+    cache.get(2025)
+    age_entry(cache, 2025, 120)
+
+    assert cache.get(2025) == expected(2025, 1)
+    wait_for_refresh(cache)
+    assert fetch.calls == 2
+    assert cache.get(2025) == expected(2025, 2)
+    assert HolidayCache(cache_dir=str(tmp_path), ttl=60, fetch_items=fetch).get(2025) == expected(2025, 2)
+
+
+def test_offline_falls_back_to_expired_entry(tmp_path):
+    cache = HolidayCache(cache_dir=str(tmp_path), ttl=60, stale_while_revalidate=False, fetch_items=StubFetch())
+    cache.get(2025)
+    age_entry(cache, 2025, 120)
+
+    cache.fetch_items = StubFetch(fail=True)
+    assert cache.get(2025) == expected(2025, 1)
+
+
+def test_offline_without_entry_raises(tmp_path):
+    cache = HolidayCache(cache_dir=str(tmp_path), ttl=60, fetch_items=StubFetch(fail=True))
+    with pytest.raises(ConnectionError):
+        cache.get(2025)
+
+
+def test_corrupt_entry_is_refetched(tmp_path):
+    fetch = StubFetch()
+    cache = HolidayCache(cache_dir=str(tmp_path), ttl=60, fetch_items=fetch)
+    path = cache._entry_path(2025, 'free_days')
+    os.makedirs(os.path.dirname(path))
+    with open(path, 'w') as f:
+        f.write('{"version": ')
+    assert cache.get(2025) == expected(2025, 1)
+    assert fetch.calls == 1
+
+
+@pytest.mark.skipif(hebrew_holidays.fcntl is None, reason="needs fcntl file locks")
+def test_concurrent_cold_caches_fetch_once(tmp_path):
+    # Separate cache instances stand in for separate processes sharing the directory
+    fetch = StubFetch(delay=0.05)
+    caches = [HolidayCache(cache_dir=str(tmp_path), ttl=60, fetch_items=fetch) for _ in range(8)]
+    results = [None] * len(caches)
+
+    def get(index):
+        results[index] = caches[index].get(2025)
+
+    threads = [threading.Thread(target=get, args=(index,)) for index in range(len(caches))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert fetch.calls == 1
+    assert results == [expected(2025, 1)] * len(caches)
+    # Entries are renamed into place; no temp files are left behind
+    entry_dir = os.path.dirname(caches[0]._entry_path(2025, 'free_days'))
+    assert not [name for name in os.listdir(entry_dir) if name.startswith('.tmp-')]
@@ -0,0 +1,95 @@
+import re
+from datetime import date
+
+import pytest
+
+import hebrew_calendar
+import hebrew_holidays
+
+RULE_SETS = hebrew_holidays.load_holiday_rules(hebrew_holidays.DEFAULT_RULES_PATH)
+
+
+# The hand-written filters the rule table replaced, kept verbatim as the reference
+def is_free_day_holiday(item):
+    category = item.get('category', '')
+    title = item.get('title', '')
+    title_lower = title.lower()
+
+    is_excluded = (
+        'rosh hashana labehemot' in title_lower or
+        'hol hamoed' in title_lower or
+        'chol hamoed' in title_lower or
+        'pesach sheni' in title_lower or
+        'lag baomer' in title_lower or
+        'yom yerushalayim' in title_lower or
+        'chanukah' in title_lower or
+        'tu bishvat' in title_lower
+    )
+    if re.search(r'.*\(CH.*M\)', title):
+        is_excluded = True
+    if title_lower in ['sukkot ii', 'erev purim', 'shushan purim', 'pesach ii', 'pesach viii', 'shavuot ii']:
+        is_excluded = True
+    if is_excluded:
+        return False
+
+    is_free_day = (
+        category in ['holiday'] and
+        any(keyword in title_lower for keyword in [
+            'rosh hashana', 'yom kippur', 'sukkot', 'simchat torah',
+            'pesach i', 'pesach vi', 'pesach vii', 'shavuot i', 'purim', 'tisha b\'av', 'yom haatzmaut'
+        ])
+    )
+    is_erev_free_day = (
+        'erev' in title_lower and
+        any(keyword in title_lower for keyword in [
+            'rosh hashana', 'yom kippur', 'sukkot', 'pesach'
+        ])
+    )
+    return is_free_day or is_erev_free_day
+
+
+def is_calendar_holiday(item):
+    return item.get('category') in ['holiday', 'roshchodesh']
+
+
+REFERENCE_FILTERS = {'free_days': is_free_day_holiday, 'all_holidays': is_calendar_holiday}
+
+# Every holiday title of a few years (leap and common, with the minor holidays),
+# plus other hebcal items, spelling variants and near misses of the keywords
+TITLES = sorted({
+    item['title']
+    for year in (2023, 2024, 2025, 2027)
+    for item in hebrew_calendar.hebcal_items(year, minor=True)
+} | {
+    'Rosh Chodesh Nisan', 'Rosh Chodesh Adar II', "Ta'anit Esther", "Tzom Gedaliah", 'Purim Katan',
+    'Shushan Purim Katan', 'Shabbat Zachor', 'Parashat Bereshit', 'Candle lighting: 16:32',
+    'Tisha B\'Av', 'Erev Tisha B\'Av', 'Yom HaAtzmaut', 'yom kippur', 'PESACH I', 'Pesach Sheni',
+    'Sukkot II', 'Sukkot II (CH\'\'M)', 'Pesach III (CH"M)', 'Chol HaMoed Pesach', 'Hol Hamoed Sukkot',
+    'Shavuot II', 'Shavuot', 'Erev Shavuot', 'Erev Simchat Torah', 'Erev Chanukah', 'Simchat Torah',
+    'Rosh Hashana LaBehemot', 'Rosh Hashana 5786', 'Lag B\'Omer', 'Lag BaOmer', 'Yom Yerushalayim',
+    'Tu BiShvat', 'Purim Meshulash', 'Erev Purim', 'erev purim ', 'Shushan Purim', 'Pesach VIII', '',
+})
+CATEGORIES = ['holiday', 'roshchodesh', 'hebdate', 'parashat', 'candles', '']
+
+
+@pytest.mark.parametrize('filter_name', sorted(REFERENCE_FILTERS))
+@pytest.mark.parametrize('category', CATEGORIES)
+def test_rule_table_matches_hand_written_filters(filter_name, category):
+    rule_set = RULE_SETS[filter_name]
+    reference = REFERENCE_FILTERS[filter_name]
+    mismatches = [
+        title for title in TITLES
+        if bool(rule_set.classify(category, title)) != reference({'category': category, 'title': title})
+    ]
+    assert mismatches == []
+
+
+def test_filter_holiday_names_keeps_the_dates_of_included_items():
+    items = [
+        {'title': 'Pesach I', 'date': '2025-04-13', 'category': 'holiday'},
+        {'title': 'Pesach II', 'date': '2025-04-14', 'category': 'holiday'},
+        {'title': 'Rosh Chodesh Iyyar', 'date': '2025-04-28T00:00:00-04:00', 'category': 'roshchodesh'},
+    ]
+    assert hebrew_holidays.filter_holiday_names(items, 'free_days') == {date(2025, 4, 13): 'Pesach I'}
+    assert sorted(hebrew_holidays.filter_holiday_names(items, 'all_holidays')) == [
+        date(2025, 4, 13), date(2025, 4, 14), date(2025, 4, 28)]
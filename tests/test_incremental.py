@@ -0,0 +1,71 @@
+import random
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from schedule_engine import IncrementalScheduler, build_schedule
+from work_calendar import FreeDays, WorkingCalendar
+
+TOPICS = 'ABCDEFG'
+DAYS = [0, 1, 1, 2, 3, 5, -1, 2.5]
+
+
+def random_rows(rnd, count):
+    return pd.DataFrame({
+        'Main Topic': [rnd.choice(TOPICS) for _ in range(count)],
+        'Subtopic': [f"Sub {rnd.randrange(1000)}" for _ in range(count)],
+        'Days': [float(rnd.choice(DAYS)) for _ in range(count)]
+    })
+
+
+def edit(rnd, syllabus_df):
+    """Apply one random edit, insert or delete to a copy of the syllabus"""
+    syllabus_df = syllabus_df.copy()
+    row = rnd.randrange(len(syllabus_df))
+    action = rnd.choice(['days', 'topic', 'subtopic', 'insert', 'delete'])
+    if action == 'days':
+        syllabus_df.loc[row, 'Days'] = rnd.choice(DAYS)
+    elif action == 'topic':
+        syllabus_df.loc[row, 'Main Topic'] = rnd.choice(TOPICS + 'H')
+    elif action == 'subtopic':
+        syllabus_df.loc[row, 'Subtopic'] = f"Edited {rnd.randrange(1000)}"
+    elif action == 'insert':
+        inserted = random_rows(rnd, rnd.randrange(1, 4))
+        syllabus_df = pd.concat([syllabus_df.iloc[:row], inserted, syllabus_df.iloc[row:]], ignore_index=True)
+    elif len(syllabus_df) > 1:
+        syllabus_df = syllabus_df.drop(index=row).reset_index(drop=True)
+    return syllabus_df
+
+
+@pytest.mark.parametrize('add_break', [False, True])
+@pytest.mark.parametrize('seed', range(20))
+def test_incremental_matches_full_recompute(seed, add_break):
+    rnd = random.Random(seed)
+    first = date(2025, 1, 1)
+    syllabus_df = random_rows(rnd, rnd.randrange(1, 40))
+    start_date = first + timedelta(days=rnd.randrange(30))
+    break_days = rnd.randrange(1, 4)
+    holidays = {first + timedelta(days=rnd.randrange(300)) for _ in range(10)}
+    free_days = FreeDays()
+    scheduler = IncrementalScheduler()
+
+    for step in range(15):
+        if step:
+            change = rnd.random()
+            if change < 0.6:
+                syllabus_df = edit(rnd, syllabus_df)
+            elif change < 0.7:
+                break_days = rnd.randrange(0, 4)
+            elif change < 0.8:
+                holidays = holidays ^ {first + timedelta(days=rnd.randrange(300))}
+            elif change < 0.9:
+                free_start = first + timedelta(days=rnd.randrange(300))
+                free_days = free_days | FreeDays([(free_start, free_start + timedelta(days=rnd.randrange(10)))])
+            else:
+                start_date += timedelta(days=rnd.randrange(-3, 4))
+
+        calendar = WorkingCalendar(holidays, free_days)
+        incremental = scheduler.build(syllabus_df, start_date, add_break, break_days, calendar)
+        full = build_schedule(syllabus_df, start_date, add_break, break_days, calendar)
+        pd.testing.assert_frame_equal(incremental, full)
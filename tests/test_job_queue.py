@@ -0,0 +1,106 @@
+import threading
+import time
+
+import pytest
+
+import job_queue
+from job_queue import JobQueue, QueueFullError
+
+
+def wait_for(job, timeout=5):
+    deadline = time.monotonic() + timeout
+    while job.finished_at is None:
+        assert time.monotonic() < deadline, f"job still {job.status}"
+        time.sleep(0.01)
+
+
+def test_job_runs_and_reports_its_result():
+    queue = JobQueue(max_workers=1, max_pending=2)
+    job = queue.submit(lambda a, b=0: a + b, 2, b=3)
+    wait_for(job)
+
+    assert job.status == 'done'
+    assert job.result == 5
+    assert job.finished_at is not None
+    assert queue.get(job.id) is job
+    assert job.to_dict() == {'job_id': job.id, 'status': 'done'}
+
+
+def test_job_status_moves_from_queued_to_running_to_done():
+    queue = JobQueue(max_workers=1, max_pending=2)
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocker():
+        started.set()
+        release.wait(5)
+        return 'ok'
+
+    first = queue.submit(blocker)
+    assert started.wait(5)
+    second = queue.submit(lambda: 'next')
+
+    assert first.status == 'running'
+    assert second.status == 'queued'
+
+    release.set()
+    wait_for(first)
+    wait_for(second)
+    assert (first.status, second.status) == ('done', 'done')
+
+
+def test_failed_job_keeps_its_error():
+    queue = JobQueue(max_workers=1, max_pending=1)
+
+    def fail():
+        raise ValueError('bad syllabus')
+
+    job = queue.submit(fail)
+    wait_for(job)
+
+    assert job.status == 'failed'
+    assert isinstance(job.error, ValueError)
+    assert job.to_dict() == {'job_id': job.id, 'status': 'failed', 'error': 'bad syllabus'}
+
+
+def test_saturated_queue_rejects_until_a_slot_frees_up():
+    queue = JobQueue(max_workers=1, max_pending=2)
+    release = threading.Event()
+    jobs = [queue.submit(release.wait, 5) for _ in range(2)]
+
+    with pytest.raises(QueueFullError):
+        queue.submit(lambda: None)
+
+    release.set()
+    for job in jobs:
+        wait_for(job)
+    job = queue.submit(lambda: 'again')
+    wait_for(job)
+    assert job.result == 'again'
+
+
+def test_failed_jobs_release_their_slot():
+    queue = JobQueue(max_workers=1, max_pending=1)
+    for _ in range(3):
+        job = queue.submit(int, 'not a number')
+        wait_for(job)
+        assert job.status == 'failed'
+
+
+def test_finished_jobs_expire_after_the_ttl(monkeypatch):
+    queue = JobQueue(max_workers=1, max_pending=2, job_ttl=60)
+    job = queue.submit(lambda: 1)
+    wait_for(job)
+
+    now = job.finished_at
+    monkeypatch.setattr(job_queue.time, 'time', lambda: now + 30)
+    queue.submit(lambda: 2)
+    assert queue.get(job.id) is job
+
+    monkeypatch.setattr(job_queue.time, 'time', lambda: now + 61)
+    queue.submit(lambda: 3)
+    assert queue.get(job.id) is None
+
+
+def test_unknown_job_is_none():
+    assert JobQueue(max_workers=1).get('missing') is None
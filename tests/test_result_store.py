@@ -0,0 +1,100 @@
+import pytest
+
+import result_store
+from result_store import ResultStore
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(result_store.time, 'time', clock)
+    return clock
+
+
+def test_put_and_get_round_trip(clock):
+    store = ResultStore()
+    result_id = store.put(b'schedule')
+
+    assert store.get(result_id) == b'schedule'
+    assert store.get('missing') is None
+    assert len(store) == 1
+
+
+def test_ids_are_unique_and_opaque(clock):
+    store = ResultStore()
+    ids = {store.put(b'x') for _ in range(50)}
+    assert len(ids) == 50
+    assert all(len(result_id) >= 16 for result_id in ids)
+
+
+def test_entry_limit_evicts_least_recently_used(clock):
+    store = ResultStore(max_entries=2)
+    first = store.put(b'1')
+    second = store.put(b'2')
+    assert store.get(first) == b'1'  # first is now the most recently used
+
+    third = store.put(b'3')
+
+    assert store.get(second) is None
+    assert store.get(first) == b'1'
+    assert store.get(third) == b'3'
+    assert len(store) == 2
+
+
+def test_byte_limit_evicts_until_the_total_fits(clock):
+    store = ResultStore(max_bytes=10)
+    first = store.put(b'aaaa')
+    second = store.put(b'bbbb')
+    third = store.put(b'cccccc')
+
+    assert store.get(first) is None
+    assert store.get(second) == b'bbbb'
+    assert store.get(third) == b'cccccc'
+
+    fourth = store.put(b'ddddddd')
+    assert store.get(second) is None
+    assert store.get(third) is None
+    assert store.get(fourth) == b'ddddddd'
+    assert len(store) == 1
+
+
+def test_result_larger_than_the_store_is_rejected(clock):
+    store = ResultStore(max_bytes=4)
+    kept = store.put(b'ok')
+
+    with pytest.raises(ValueError):
+        store.put(b'too large')
+
+    assert store.get(kept) == b'ok'
+
+
+def test_entries_expire_after_the_ttl(clock):
+    store = ResultStore(ttl=60)
+    old = store.put(b'old')
+
+    clock.now += 59
+    assert store.get(old) == b'old'
+
+    clock.now += 1
+    assert store.get(old) is None
+    assert len(store) == 0
+
+
+def test_put_drops_expired_entries_and_their_bytes(clock):
+    store = ResultStore(max_bytes=8, ttl=60)
+    store.put(b'aaaa')
+    store.put(b'bbbb')
+
+    clock.now += 61
+    fresh = store.put(b'cccccccc')
+
+    assert len(store) == 1
+    assert store.get(fresh) == b'cccccccc'
@@ -0,0 +1,118 @@
+import random
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from schedule_engine import SWEEP_RANKINGS, build_schedule, evaluate_start_dates, schedule_with_holidays, sweep_start_dates
+from work_calendar import FreeDays, WorkingCalendar
+
+TOPICS = 'ABCDE'
+DAYS = [0, 1, 1, 2, 3, 5, -1, 2.5]
+FIRST = date(2025, 1, 1)
+
+
+def random_syllabus(rnd):
+    count = rnd.randrange(1, 25)
+    return pd.DataFrame({
+        'Main Topic': [rnd.choice(TOPICS) for _ in range(count)],
+        'Subtopic': [f"Sub {i}" for i in range(count)],
+        'Days': [float(rnd.choice(DAYS)) for _ in range(count)]
+    })
+
+
+def random_free_days(rnd):
+    ranges = []
+    for _ in range(rnd.randrange(3)):
+        start = FIRST + timedelta(days=rnd.randrange(200))
+        ranges.append((start, start + timedelta(days=rnd.randrange(15))))
+    return FreeDays(ranges)
+
+
+def year_holidays(years):
+    """Stub holiday loader: a fixed pseudo-random set of dates per year"""
+    holidays = set()
+    for year in years:
+        rnd = random.Random(year)
+        holidays.update(date(year, 1, 1) + timedelta(days=rnd.randrange(365)) for _ in range(15))
+    return holidays
+
+
+def expected_row(syllabus_df, start, add_break, break_days, calendar):
+    """What evaluate_start_dates should report, read off the full schedule for one start"""
+    schedule_df = build_schedule(syllabus_df, start, add_break, break_days, calendar)
+    first_lesson = calendar.next_working_day(start)
+    end_date = schedule_df['End Date'].iloc[-1].date()
+    closed = [
+        first_lesson + timedelta(days=i) for i in range((end_date - first_lesson).days + 1)
+        if first_lesson + timedelta(days=i) in calendar.holidays
+        or calendar.free_days.contains(np.datetime64(first_lesson + timedelta(days=i)))
+    ]
+    breaks = schedule_df[schedule_df['Kind'] == 'break']
+    return {
+        'First Lesson': first_lesson,
+        'End Date': end_date,
+        'Calendar Days': (end_date - first_lesson).days + 1,
+        'Holiday Days': len(closed),
+        'First Break': breaks['Start Date'].iloc[0].date() if len(breaks) else None
+    }
+
+
+def sweep_row(row):
+    return {
+        'First Lesson': row['First Lesson'].date(),
+        'End Date': row['End Date'].date(),
+        'Calendar Days': row['Calendar Days'],
+        'Holiday Days': row['Holiday Days'],
+        'First Break': None if pd.isna(row['First Break']) else row['First Break'].date()
+    }
+
+
+@pytest.mark.parametrize('add_break', [False, True])
+@pytest.mark.parametrize('seed', range(20))
+def test_evaluate_start_dates_matches_build_schedule(seed, add_break):
+    rnd = random.Random(seed)
+    syllabus_df = random_syllabus(rnd)
+    break_days = rnd.randrange(0, 4)
+    calendar = WorkingCalendar(year_holidays([2025, 2026]), random_free_days(rnd))
+    starts = [FIRST + timedelta(days=rnd.randrange(120)) for _ in range(12)]
+
+    sweep_df = evaluate_start_dates(syllabus_df, starts, add_break, break_days, calendar)
+
+    assert [d.date() for d in sweep_df['Start Date']] == sorted(set(starts))
+    for _, row in sweep_df.iterrows():
+        start = row['Start Date'].date()
+        assert sweep_row(row) == expected_row(syllabus_df, start, add_break, break_days, calendar), start
+
+
+@pytest.mark.parametrize('rank_by', sorted(SWEEP_RANKINGS))
+@pytest.mark.parametrize('seed', range(8))
+def test_sweep_start_dates_matches_schedule_with_holidays(seed, rank_by):
+    rnd = random.Random(seed)
+    syllabus_df = random_syllabus(rnd)
+    add_break = rnd.random() < 0.5
+    break_days = rnd.randrange(1, 4)
+    free_days = random_free_days(rnd)
+    # Late starts make the schedule run into a year the span estimate may not cover
+    starts = [date(2025, 12, 1) + timedelta(days=rnd.randrange(60)) for _ in range(8)]
+
+    sweep_df = sweep_start_dates(syllabus_df, starts, add_break, break_days, year_holidays, free_days, rank_by)
+
+    assert list(sweep_df['Rank']) == list(range(1, len(sweep_df) + 1))
+    keys = SWEEP_RANKINGS[rank_by] + ['Start Date']
+    ordered = sweep_df.sort_values(keys, kind='stable', ignore_index=True)
+    pd.testing.assert_frame_equal(sweep_df, ordered)
+
+    for _, row in sweep_df.iterrows():
+        schedule_df = schedule_with_holidays(syllabus_df, row['Start Date'].date(), add_break, break_days,
+                                             year_holidays, free_days)
+        assert row['End Date'] == schedule_df['End Date'].iloc[-1]
+
+
+def test_sweep_start_dates_rejects_unknown_ranking_and_no_candidates():
+    syllabus_df = pd.DataFrame({'Main Topic': ['A'], 'Subtopic': ['a'], 'Days': [1.0]})
+    with pytest.raises(ValueError):
+        sweep_start_dates(syllabus_df, [FIRST], False, 0, rank_by='latest')
+    with pytest.raises(ValueError):
+        sweep_start_dates(syllabus_df, [], False, 0)
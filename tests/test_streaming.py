@@ -0,0 +1,97 @@
+import io
+import os
+import random
+import tempfile
+
+import pytest
+
+import app as flask_app
+
+FORM = {'start_date': '2025-01-05', 'add_break': 'true', 'break_days': '2', 'consider_holidays': 'false'}
+
+
+@pytest.fixture
+def client():
+    flask_app.app.config['TESTING'] = True
+    return flask_app.app.test_client()
+
+
+def sorted_syllabus(seed, rows=400, header='Main Topic,Subtopic,Days'):
+    rnd = random.Random(seed)
+    topics = sorted(rnd.sample([f"Topic {i:02d}" for i in range(60)], 12) + ['Final Exam'])
+    lines = [header]
+    for topic in topics:
+        for i in range(rnd.randrange(1, rows // len(topics) * 2)):
+            lines.append(f"{topic},Part {i},{rnd.choice(['1', '2', '3', '0', '2.5', ''])}")
+    return ('\n'.join(lines) + '\n').encode()
+
+
+def upload(client, data, mode, filename='syllabus.csv', **form):
+    return client.post('/upload', data={
+        **FORM, 'handle_empty_days': 'true', 'default_days': '1', **form, 'mode': mode,
+        'file': (io.BytesIO(data), filename)
+    })
+
+
+@pytest.mark.parametrize('chunk_rows', [7, 50000])
+@pytest.mark.parametrize('seed', range(5))
+def test_stream_mode_matches_direct_mode_byte_for_byte(client, monkeypatch, seed, chunk_rows):
+    monkeypatch.setattr(flask_app, 'STREAM_CHUNK_ROWS', chunk_rows)
+    data = sorted_syllabus(seed)
+    options = {'add_break': 'true' if seed % 2 else 'false'}
+
+    direct = upload(client, data, 'direct', **options)
+    stream = upload(client, data, 'stream', **options)
+
+    assert direct.status_code == 200
+    assert stream.status_code == 200
+    assert stream.mimetype == 'text/csv'
+    assert stream.get_data() == direct.get_data()
+
+
+def test_stream_mode_reads_space_padded_headers(client):
+    data = sorted_syllabus(1)
+    padded = sorted_syllabus(1, header=' Main Topic ,Subtopic , Days')
+
+    assert upload(client, padded, 'stream').get_data() == upload(client, data, 'direct').get_data()
+
+
+@pytest.mark.parametrize('data, filename, message', [
+    (b'Main Topic,Subtopic,Days\nB,b,1\nA,a,1\n', 'syllabus.csv', 'sorted by Main Topic'),
+    (b'Main Topic,Subtopic\nA,a\n', 'syllabus.csv', 'Missing required columns'),
+    (b'Main Topic,Subtopic,Days\n', 'syllabus.csv', 'empty'),
+    (b'Main Topic,Subtopic,Days\nA,a,1\n', 'syllabus.parquet', 'CSV files only'),
+])
+def test_stream_mode_rejects_bad_uploads_before_streaming(client, data, filename, message):
+    response = upload(client, data, 'stream', filename=filename)
+
+    assert response.status_code == 400
+    assert message in response.get_json()['error']
+
+
+def test_stream_mode_reports_empty_days_when_not_filled(client):
+    response = upload(client, b'Main Topic,Subtopic,Days\nA,a,1\nA,b,\n', 'stream', handle_empty_days='false')
+
+    assert response.status_code == 400
+    assert 'empty values' in response.get_json()['error']
+
+
+def test_stream_mode_removes_the_spooled_upload(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+
+    # The server closes a streamed response once it is sent, or when the client goes away unread
+    with upload(client, sorted_syllabus(2), 'stream') as response:
+        assert response.get_data()
+    with upload(client, sorted_syllabus(3), 'stream') as response:
+        assert response.status_code == 200
+    assert upload(client, b'Main Topic,Subtopic,Days\nB,b,1\nA,a,1\n', 'stream').status_code == 400
+    assert os.listdir(tmp_path) == []
+
+
+def test_only_stream_mode_accepts_files_over_the_in_memory_cap(client, monkeypatch):
+    data = sorted_syllabus(4)
+    monkeypatch.setattr(flask_app, 'MAX_UPLOAD_BYTES', len(data) - 1)
+
+    assert upload(client, data, 'direct').status_code == 413
+    assert upload(client, data, 'async').status_code == 413
+    assert upload(client, data, 'stream').status_code == 200
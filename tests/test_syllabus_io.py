@@ -0,0 +1,134 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import syllabus_io
+
+pyarrow = pytest.importorskip('pyarrow')
+import pyarrow.feather  # noqa: E402
+import pyarrow.ipc  # noqa: E402
+import pyarrow.parquet  # noqa: E402
+
+SYLLABUS_CSV = (
+    b'Main Topic,Subtopic,Days,Notes\n'
+    b'Math,Algebra,3,x\n'
+    b'Art,Drawing,2,y\n'
+    b'Math,Geometry,,z\n'
+)
+
+
+def syllabus_table():
+    return pyarrow.table({
+        'Notes': ['x', 'y', 'z'],
+        'Main Topic': ['Math', 'Art', 'Math'],
+        'Subtopic': ['Algebra', 'Drawing', 'Geometry'],
+        'Days': [3, 2, None],
+    })
+
+
+def parquet_bytes(table):
+    sink = io.BytesIO()
+    pyarrow.parquet.write_table(table, sink)
+    return sink.getvalue()
+
+
+def arrow_file_bytes(table):
+    sink = io.BytesIO()
+    with pyarrow.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def arrow_stream_bytes(table):
+    sink = io.BytesIO()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def feather_bytes(table):
+    sink = io.BytesIO()
+    pyarrow.feather.write_feather(table, sink)
+    return sink.getvalue()
+
+
+def assert_syllabus(syllabus_df):
+    assert list(syllabus_df.columns) == syllabus_io.REQUIRED_COLUMNS
+    assert list(syllabus_df['Main Topic']) == ['Math', 'Art', 'Math']
+    assert list(syllabus_df['Main Topic'].cat.categories) == ['Art', 'Math']
+    assert list(syllabus_df['Subtopic']) == ['Algebra', 'Drawing', 'Geometry']
+    assert syllabus_df['Days'].dtype == 'Int16'
+    assert syllabus_df['Days'].tolist()[:2] == [3, 2]
+    assert pd.isna(syllabus_df['Days'].iloc[2])
+
+
+def test_space_padded_csv_headers_map_to_the_required_columns():
+    data = b' Main Topic , Subtopic,Days ,Notes\nMath,Algebra,3,x\n'
+    assert syllabus_io.csv_columns(data) == {' Main Topic ': 'Main Topic', ' Subtopic': 'Subtopic', 'Days ': 'Days'}
+    assert syllabus_io.read_csv_header(data) == ['Main Topic', 'Subtopic', 'Days', 'Notes']
+
+
+def test_space_padded_csv_reads_like_the_plain_csv():
+    padded = SYLLABUS_CSV.replace(b'Main Topic,Subtopic,Days', b' Main Topic ,Subtopic , Days', 1)
+    assert_syllabus(syllabus_io.read_syllabus(padded))
+    pd.testing.assert_frame_equal(syllabus_io.read_syllabus(padded), syllabus_io.read_syllabus(SYLLABUS_CSV))
+
+
+def test_missing_columns_are_reported_before_parsing():
+    with pytest.raises(syllabus_io.SyllabusFormatError, match='Days'):
+        syllabus_io.read_syllabus(b'Main Topic,Subtopic,Length\nMath,Algebra,3\n')
+
+
+@pytest.mark.parametrize('encode', [parquet_bytes, arrow_file_bytes, arrow_stream_bytes, feather_bytes])
+def test_columnar_input_reads_like_csv(encode):
+    data = encode(syllabus_table())
+    syllabus_df = syllabus_io.read_syllabus(data)
+
+    assert_syllabus(syllabus_df)
+    pd.testing.assert_frame_equal(syllabus_df, syllabus_io.read_syllabus(SYLLABUS_CSV))
+
+
+@pytest.mark.parametrize('encode', [parquet_bytes, arrow_file_bytes])
+def test_columnar_input_without_required_columns_is_rejected(encode):
+    table = syllabus_table().drop_columns(['Subtopic'])
+    with pytest.raises(syllabus_io.SyllabusFormatError, match='Subtopic'):
+        syllabus_io.read_syllabus(encode(table))
+
+
+def test_corrupt_parquet_is_a_format_error():
+    data = parquet_bytes(syllabus_table())
+    with pytest.raises(syllabus_io.SyllabusFormatError):
+        syllabus_io.read_syllabus(data[:len(data) // 2])
+
+
+def test_read_syllabus_accepts_a_path(tmp_path):
+    path = tmp_path / 'syllabus.parquet'
+    path.write_bytes(parquet_bytes(syllabus_table()))
+    assert_syllabus(syllabus_io.read_syllabus(str(path)))
+
+
+@pytest.mark.parametrize('values, dtype', [
+    ([1, -5, 32767], 'Int16'),
+    ([1, -32768], 'Int16'),
+    ([1, 40000], 'Int32'),
+    ([1, -(2 ** 31 - 1)], 'Int32'),
+    ([1, 2 ** 31], 'Int64'),
+    ([1, 2.5], 'float64'),
+    ([None, None], 'Int16'),
+])
+def test_days_are_downcast_to_the_smallest_fitting_type(values, dtype):
+    rows = ''.join(f"T,S{i},{'' if value is None else value}\n" for i, value in enumerate(values))
+    syllabus_df = syllabus_io.read_syllabus(('Main Topic,Subtopic,Days\n' + rows).encode())
+
+    assert syllabus_df['Days'].dtype == dtype
+    expected = np.array([np.nan if value is None else value for value in values], dtype=float)
+    np.testing.assert_array_equal(syllabus_df['Days'].to_numpy(dtype=float, na_value=np.nan), expected)
+
+
+def test_non_numeric_days_become_missing():
+    syllabus_df = syllabus_io.read_syllabus(b'Main Topic,Subtopic,Days\nT,a,2\nT,b,two\n')
+    assert syllabus_df['Days'].dtype == 'Int16'
+    assert syllabus_df['Days'].iloc[0] == 2
+    assert pd.isna(syllabus_df['Days'].iloc[1])
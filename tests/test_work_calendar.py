@@ -0,0 +1,57 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from work_calendar import FreeDays, WorkingCalendar
+
+
+def naive_is_working_day(day, holidays, free_days):
+    return day.weekday() not in (4, 5) and day not in holidays and day not in free_days
+
+
+def naive_add_working_days(day, days, holidays, free_days):
+    while not naive_is_working_day(day, holidays, free_days):
+        day += timedelta(days=1)
+    for _ in range(days - 1):
+        day += timedelta(days=1)
+        while not naive_is_working_day(day, holidays, free_days):
+            day += timedelta(days=1)
+    return day
+
+
+def random_days(rnd, first, span, count):
+    return {first + timedelta(days=rnd.randrange(span)) for _ in range(count)}
+
+
+def test_pre_epoch_offset_skips_free_days():
+    calendar = WorkingCalendar(free_days=[(date(1999, 7, 14), date(1999, 7, 15))])
+    assert calendar.add_working_days(date(1999, 7, 11), 10) == date(1999, 7, 26)
+
+
+def test_pre_epoch_count_working_days():
+    assert WorkingCalendar().count_working_days(date(1999, 12, 29), date(1999, 12, 30)) == 2
+
+
+@pytest.mark.parametrize('first', [date(1890, 3, 1), date(1999, 6, 1), date(2024, 9, 1)])
+def test_matches_day_walk(first):
+    rnd = random.Random(first.toordinal())
+    for _ in range(200):
+        holidays = random_days(rnd, first, 400, rnd.randrange(0, 20))
+        ranges = []
+        for _ in range(rnd.randrange(0, 6)):
+            start = first + timedelta(days=rnd.randrange(400))
+            ranges.append((start, start + timedelta(days=rnd.randrange(0, 12))))
+        free_days = FreeDays(ranges)
+        free_set = {start + timedelta(days=i) for start, end in ranges for i in range((end - start).days + 1)}
+        calendar = WorkingCalendar(holidays, free_days)
+
+        start = first + timedelta(days=rnd.randrange(300))
+        end = start + timedelta(days=rnd.randrange(0, 60))
+        days = rnd.randrange(1, 40)
+
+        assert calendar.is_working_day(start) == naive_is_working_day(start, holidays, free_set)
+        assert calendar.add_working_days(start, days) == naive_add_working_days(start, days, holidays, free_set)
+        assert calendar.count_working_days(start, end) == sum(
+            naive_is_working_day(start + timedelta(days=i), holidays, free_set) for i in range((end - start).days + 1)
+        )
@@ -0,0 +1,214 @@
+from datetime import timedelta
+
+import numpy as np
+
+# Sunday-Thursday are working days; numpy weekmasks run Monday..Sunday
+WORKING_WEEKMASK = '1111001'
+
+# Origin of the working-day ranks used to skip free-day intervals. It must not be
+# later than any date ranked: np.busday_count over a reversed range counts the
+# half-open interval from the other end, which shifts earlier ranks by a day.
+RANK_EPOCH = np.datetime64('0001-01-01', 'D')
+
+
+def to_datetime64(value):
+    """Convert a date (or date-like) to numpy datetime64[D]"""
+    return np.datetime64(value, 'D')
+
+
+def to_date(value):
+    """Convert a numpy datetime64 back to a datetime.date"""
+    return value.astype('datetime64[D]').astype(object)
+
+
+class FreeDays:
+    """Additional free days as a sorted list of merged, inclusive date intervals.
+
+    Built from single dates and (start, end) ranges in any order; overlapping
+    and touching ranges are merged, so a closure of several months is one
+    interval no matter how many days it spans.
+    """
+
+    def __init__(self, items=()):
+        starts, ends = [], []
+        for item in items or ():
+            start, end = item if isinstance(item, (tuple, list)) else (item, item)
+            starts.append(to_datetime64(start))
+            ends.append(to_datetime64(end))
+
+        starts = np.array(starts, dtype='datetime64[D]')
+        ends = np.array(ends, dtype='datetime64[D]')
+        keep = ends >= starts
+        starts, ends = starts[keep], ends[keep]
+        order = np.argsort(starts, kind='stable')
+        starts, ends = starts[order], ends[order]
+
+        # An interval opens a new group unless it starts within (or right after) the ones before it
+        reach = np.maximum.accumulate(ends) if len(ends) else ends
+        opens = np.ones(len(starts), dtype=bool)
+        opens[1:] = starts[1:] > reach[:-1] + 1
+        first = np.flatnonzero(opens)
+        self.starts = starts[first]
+        self.ends = np.maximum.reduceat(ends, first) if len(first) else ends
+
+        # Free days in the intervals before each one (and in all of them, at the end)
+        self._days_before = np.concatenate([[0], np.cumsum((self.ends - self.starts).astype(np.int64) + 1)])
+
+    @classmethod
+    def coerce(cls, value):
+        """Return value as FreeDays (accepts FreeDays, None, or an iterable of dates and (start, end) ranges)"""
+        if isinstance(value, cls):
+            return value
+        return cls(value or ())
+
+    def ranges(self):
+        """The merged intervals as a tuple of (start, end) dates; FreeDays(ranges) rebuilds the same set"""
+        return tuple((to_date(start), to_date(end)) for start, end in zip(self.starts, self.ends))
+
+    def __len__(self):
+        return int(self._days_before[-1])
+
+    def __bool__(self):
+        return len(self.starts) > 0
+
+    def __eq__(self, other):
+        if not isinstance(other, FreeDays):
+            return NotImplemented
+        return np.array_equal(self.starts, other.starts) and np.array_equal(self.ends, other.ends)
+
+    def __hash__(self):
+        return hash(self.ranges())
+
+    def __or__(self, other):
+        return FreeDays(self.ranges() + FreeDays.coerce(other).ranges())
+
+    def __repr__(self):
+        return f"FreeDays({self.ranges()!r})"
+
+    def contains(self, dates):
+        """Which of dates (datetime64 scalar or array) fall on a free day"""
+        dates = np.asarray(dates, dtype='datetime64[D]')
+        index = np.searchsorted(self.starts, dates, side='right') - 1
+        return (index >= 0) & (dates <= self.ends[np.maximum(index, 0)]) if len(self.starts) else np.zeros(dates.shape, dtype=bool)
+
+    def days_before(self, dates):
+        """Count the free days strictly before each of dates"""
+        dates = np.asarray(dates, dtype='datetime64[D]')
+        index = np.searchsorted(self.starts, dates, side='left')
+        if not len(self.starts):
+            return np.zeros(dates.shape, dtype=np.int64)
+        # The last interval starting before a date may run past it
+        overshoot = (self.ends[np.maximum(index - 1, 0)] + 1 - dates).astype(np.int64)
+        return self._days_before[index] - np.where(index > 0, np.maximum(overshoot, 0), 0)
+
+    def count_between(self, start_date, end_date):
+        """Count the free days in [start_date, end_date] (dates or datetime64 arrays)"""
+        start_date = np.asarray(start_date, dtype='datetime64[D]')
+        end_date = np.asarray(end_date, dtype='datetime64[D]')
+        return np.maximum(self.days_before(end_date + 1) - self.days_before(start_date), 0)
+
+    def clipped(self, start_date, end_date):
+        """The (start, end) intervals that overlap [start_date, end_date], cut to it"""
+        start_date, end_date = to_datetime64(start_date), to_datetime64(end_date)
+        keep = (self.ends >= start_date) & (self.starts <= end_date)
+        return [
+            (to_date(max(start, start_date)), to_date(min(end, end_date)))
+            for start, end in zip(self.starts[keep], self.ends[keep])
+        ]
+
+    def first_difference(self, other):
+        """Earliest date that is free in exactly one of self and other, or None if they match"""
+        other = FreeDays.coerce(other)
+        if self == other:
+            return None
+        # Membership can only change at an interval boundary
+        bounds = np.unique(np.concatenate([self.starts, self.ends + 1, other.starts, other.ends + 1]))
+        changed = self.contains(bounds) != other.contains(bounds)
+        return to_date(bounds[np.argmax(changed)]) if changed.any() else None
+
+
+class WorkingCalendar:
+    """Sunday-Thursday working-day calendar built once from a holiday set and free days.
+
+    Lookups go through numpy's busdaycalendar, so "next working day" and
+    "N working days from a date" are computed directly instead of walking
+    one day at a time. Free days are never expanded into the holiday list:
+    each interval removes one run of working-day ranks, which offsets step
+    over, so a closure of several months costs the same as a single day.
+    """
+
+    def __init__(self, holidays=(), free_days=None):
+        self.holidays = frozenset(holidays)
+        self.free_days = FreeDays.coerce(free_days)
+        holiday_dates = np.array(sorted(self.holidays), dtype='datetime64[D]')
+        self.busdaycal = np.busdaycalendar(weekmask=WORKING_WEEKMASK, holidays=holiday_dates)
+
+        # Holidays that are not already counted as free days
+        self._closed_holidays = holiday_dates[~self.free_days.contains(holiday_dates)]
+
+        # Each free interval removes the working days ranked [_free_first[i], _free_first[i] + _free_length[i])
+        first = self._rank(self.free_days.starts)
+        length = self._rank(self.free_days.ends + 1) - first
+        keep = length > 0
+        self._free_first = first[keep]
+        self._free_length = length[keep]
+        self._removed_before = np.concatenate([[0], np.cumsum(self._free_length)])
+        # Where each interval starts once the removed ranks are closed up
+        self._free_first_remaining = self._free_first - self._removed_before[:-1]
+
+    def _rank(self, dates):
+        """Working days, ignoring free days, from RANK_EPOCH up to each date (exclusive)"""
+        return np.busday_count(RANK_EPOCH, dates, busdaycal=self.busdaycal)
+
+    def _remaining_rank(self, ranks):
+        """Drop the free working days ranked below each rank"""
+        index = np.searchsorted(self._free_first, ranks, side='left')
+        previous = np.maximum(index - 1, 0)
+        # The last interval starting below a rank may reach past it
+        overshoot = np.maximum(self._free_first[previous] + self._free_length[previous] - ranks, 0)
+        return ranks - self._removed_before[index] + np.where(index > 0, overshoot, 0)
+
+    def offset(self, dates, offsets):
+        """The offsets-th working day after each date, rolling a non-working date forward first
+
+        Same as np.busday_offset(dates, offsets, roll='forward') with the same
+        broadcasting, except that free days are skipped too.
+        """
+        if not len(self._free_first):
+            return np.busday_offset(dates, offsets, roll='forward', busdaycal=self.busdaycal)
+
+        remaining = self._remaining_rank(self._rank(dates)) + offsets
+        # Map back past the intervals that start at or before the remaining rank
+        ranks = remaining + self._removed_before[np.searchsorted(self._free_first_remaining, remaining, side='right')]
+        return np.busday_offset(RANK_EPOCH, ranks, roll='forward', busdaycal=self.busdaycal)
+
+    def is_working_day(self, date):
+        """Check if a date is a working day (Sunday-Thursday, not a holiday or free day)"""
+        date = to_datetime64(date)
+        return bool(np.is_busday(date, busdaycal=self.busdaycal)) and not self.free_days.contains(date)
+
+    def next_working_day(self, date):
+        """Get the first working day on or after a date"""
+        return to_date(self.offset(to_datetime64(date), 0))
+
+    def add_working_days(self, date, days):
+        """Get the date of the days-th working day counting from a date (inclusive, days >= 1)"""
+        return to_date(self.offset(to_datetime64(date), days - 1))
+
+    def count_working_days(self, start_date, end_date):
+        """Count the working days in [start_date, end_date]"""
+        start = self._rank(to_datetime64(start_date))
+        end = self._rank(to_datetime64(end_date + timedelta(days=1)))
+        if not len(self._free_first):
+            return int(end - start)
+        return int(self._remaining_rank(end) - self._remaining_rank(start))
+
+    def count_closed_days(self, start_dates, end_dates):
+        """Count the holidays and free days in [start, end] (dates or datetime64 arrays)"""
+        start_dates = np.asarray(start_dates, dtype='datetime64[D]')
+        end_dates = np.asarray(end_dates, dtype='datetime64[D]')
+        holidays = (
+            np.searchsorted(self._closed_holidays, end_dates, side='right')
+            - np.searchsorted(self._closed_holidays, start_dates, side='left')
+        )
+        return np.maximum(holidays, 0) + self.free_days.count_between(start_dates, end_dates)